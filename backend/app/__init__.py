@@ -1,8 +1,17 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from .models.models import db
+from .services.clip_registry import clip_registry
+from .services.inference_batcher import batcher_stats
+from .services.wardrobe_cache import wardrobe_cache
+from .services.style_vocabulary import preference_cache
+from .services.result_cache import result_cache
+from .services.weather_client import weather_client
+from .services.weather_prefetcher import weather_prefetcher
+from .services.hashtags import hashtag_autocomplete
+from .commands import register_commands
 from datetime import timedelta
 import os
 
@@ -21,6 +30,19 @@ def create_app():
     JWTManager(app)
     db.init_app(app)
     migrate = Migrate(app, db)
+    register_commands(app)
+
+    # CLIP_WARMUP=1 이면 첫 요청 전에 모델을 미리 로드합니다.
+    if os.environ.get('CLIP_WARMUP') == '1':
+        clip_registry.warmup()
+
+    # WEATHER_PREFETCH=1 이면 최근 요청된 도시/타일의 날씨를 백그라운드에서 미리 갱신합니다.
+    # fork 된 워커마다 스레드가 필요하므로 첫 요청에서 시작합니다.
+    if os.environ.get('WEATHER_PREFETCH') == '1':
+        @app.before_request
+        def ensure_weather_prefetcher():
+            if not weather_prefetcher.running:
+                weather_prefetcher.start(app)
     
     # 블루프린트 등록
     from .routes.auth import auth_bp
@@ -37,5 +59,28 @@ def create_app():
     @app.route('/')
     def index():
         return 'Hello, Flask!'
+
+    @app.route('/health/clip')
+    def clip_health():
+        stats = clip_registry.stats()
+        stats['batchers'] = batcher_stats()
+        return jsonify(stats)
+
+    @app.route('/health/weather')
+    def weather_health():
+        return jsonify({
+            'client': weather_client.stats(),
+            'prefetcher': weather_prefetcher.stats(),
+        })
+
+    @app.route('/health/caches')
+    def cache_health():
+        return jsonify({
+            'wardrobe': wardrobe_cache.stats(),
+            'preferences': preference_cache.stats(),
+            'recommendations': result_cache.stats(),
+            'weather': weather_client.stats(),
+            'hashtags': hashtag_autocomplete.stats(),
+        })
     
     return app 
\ No newline at end of file
@@ -0,0 +1,145 @@
+import click
+from flask.cli import AppGroup
+from .models.models import db
+
+styles_cli = AppGroup('styles', help='스타일 어휘 관리 명령')
+
+
+@styles_cli.command('refresh-embeddings')
+@click.option('--force', is_flag=True, help='최신 임베딩도 모두 다시 계산합니다.')
+def refresh_embeddings(force):
+    """Style 테이블의 임베딩을 계산해 저장합니다."""
+    from .services.style_vocabulary import refresh_style_embeddings, preference_cache
+    count = refresh_style_embeddings(force=force)
+    db.session.commit()
+    preference_cache.invalidate()
+    click.echo(f'{count}개 스타일 임베딩 갱신 완료')
+
+
+uploads_cli = AppGroup('uploads', help='옷장 업로드 작업 관리 명령')
+
+
+@uploads_cli.command('resume')
+def resume_uploads():
+    """대기 중이거나 임대 시간(UPLOAD_LEASE_SECONDS) 이 지난 처리 중 업로드 작업을 이 프로세스에서 다시 실행합니다.
+
+    아직 다른 워커가 처리 중인 작업은 건너뛰며, 재시도도 타이머 대신 이 명령 안에서 기다렸다가 수행합니다.
+    """
+    from flask import current_app
+    from .models.models import UploadJob
+    from .services.upload_jobs import upload_job_runner
+    job_ids = [job_id for (job_id,) in db.session.query(UploadJob.job_id).filter(
+        upload_job_runner.resumable()
+    ).order_by(UploadJob.created_at).all()]
+    for job_id in job_ids:
+        upload_job_runner.run_now(current_app._get_current_object(), job_id)
+    click.echo(f'{len(job_ids)}개 업로드 작업 재실행 완료')
+
+
+embeddings_cli = AppGroup('embeddings', help='옷장 임베딩 관리 명령')
+
+
+@embeddings_cli.command('backfill')
+@click.option('--batch-size', default=64, show_default=True, help='한 번의 forward 에 넣을 아이템 수')
+@click.option('--workers', default=None, type=int, help='이미지 디코드/전처리 프로세스 수 (기본: CPU 수)')
+@click.option('--limit', default=None, type=int, help='이번 실행에서 처리할 최대 아이템 수')
+@click.option('--checkpoint', 'checkpoint_path', default='embedding_backfill.checkpoint.json',
+              show_default=True, help='재시작용 체크포인트 파일')
+@click.option('--reset', is_flag=True, help='체크포인트를 지우고 처음부터 진행합니다.')
+def backfill_embeddings(batch_size, workers, limit, checkpoint_path, reset):
+    """임베딩이 없거나 구버전인 WardrobeItem 을 다시 임베딩합니다."""
+    from .services.embedding_backfill import BackfillCheckpoint, run_backfill
+    checkpoint = BackfillCheckpoint(checkpoint_path)
+    if reset:
+        checkpoint.reset()
+    checkpoint.load()
+    if checkpoint.last_item_id:
+        click.echo(f'체크포인트에서 재개: item {checkpoint.last_item_id} 이후')
+    result = run_backfill(checkpoint, batch_size=batch_size, workers=workers, limit=limit, report=click.echo)
+    click.echo(f"완료: {result['processed']}개 갱신, {result['failed']}개 실패, "
+               f"{result['seconds']:.1f}s ({result['items_per_second']:.1f} items/s)")
+
+
+clip_cli = AppGroup('clip', help='CLIP 추론 백엔드 관리 명령')
+
+
+@clip_cli.command('parity')
+@click.option('--backend', 'backends', multiple=True, default=('int8', 'onnx'), show_default=True,
+              help='torch 대비 비교할 백엔드')
+@click.option('--tolerance', default=0.01, show_default=True, help='허용하는 최대 (1 - 코사인 유사도)')
+@click.option('--batch-size', default=8, show_default=True)
+def clip_parity(backends, tolerance, batch_size):
+    """백엔드 간 임베딩이 허용 오차 내에서 일치하는지 확인합니다."""
+    from .services.clip_registry import clip_registry
+    from .services.clip_backends import check_parity, sample_inputs
+    pixel_values, text_inputs = sample_inputs(clip_registry.processor, batch_size)
+    reference = clip_registry.get_backend('torch')
+    results = check_parity(reference, [clip_registry.get_backend(name) for name in backends],
+                           pixel_values, text_inputs, tolerance=tolerance)
+    for r in results:
+        click.echo(f"{r['backend']}: image cos {r['min_image_cosine']:.5f}, text cos {r['min_text_cosine']:.5f}, "
+                   f"편차 {r['max_deviation']:.5f} -> {'PASS' if r['passed'] else 'FAIL'}")
+    if not all(r['passed'] for r in results):
+        raise SystemExit(1)
+
+
+@clip_cli.command('benchmark')
+@click.option('--backend', 'backends', multiple=True, default=('torch', 'int8', 'onnx'), show_default=True)
+@click.option('--batch-size', default=16, show_default=True)
+@click.option('--iterations', default=20, show_default=True)
+def clip_benchmark(backends, batch_size, iterations):
+    """백엔드별 배치 지연시간과 처리량을 측정합니다."""
+    from .services.clip_registry import clip_registry
+    from .services.clip_backends import benchmark, sample_inputs
+    pixel_values, text_inputs = sample_inputs(clip_registry.processor, batch_size)
+    for name in backends:
+        r = benchmark(clip_registry.get_backend(name), pixel_values, text_inputs, iterations=iterations)
+        for kind in ('image', 'text'):
+            k = r[kind]
+            click.echo(f"{name:5s} {kind:5s} batch={batch_size}: p50 {k['p50_ms']:.1f}ms, "
+                       f"p95 {k['p95_ms']:.1f}ms, {k['items_per_second']:.1f} items/s")
+
+
+recommendations_cli = AppGroup('recommendations', help='추천 결과 사전 계산 명령')
+
+
+@recommendations_cli.command('precompute')
+@click.option('--batch-size', default=256, show_default=True, help='한 번에 로드/계산할 사용자 수')
+@click.option('--top-n', default=None, type=int, help='기온 구간별로 저장할 순위 길이 (기본: RECOMMENDATION_PRECOMPUTE_TOP_N)')
+@click.option('--user-id', 'user_ids', multiple=True, type=int, help='특정 사용자만 계산합니다.')
+def precompute(batch_size, top_n, user_ids):
+    """활성 사용자의 기온 구간별 추천 순위를 미리 계산합니다. 매일 아침 cron 등으로 실행합니다."""
+    from .services.daily_recommendations import precompute_recommendations, PRECOMPUTE_TOP_N
+    result = precompute_recommendations(user_ids=user_ids or None, batch_size=batch_size,
+                                        top_n=top_n or PRECOMPUTE_TOP_N, report=click.echo)
+    click.echo(f"완료: 사용자 {result['users']}명, {result['rows']}개 순위, {result['seconds']:.1f}s")
+
+
+community_cli = AppGroup('community', help='커뮤니티 게시글 관리 명령')
+
+
+@community_cli.command('reindex')
+@click.option('--batch-size', default=500, show_default=True, help='한 번에 색인할 게시글 수')
+def reindex(batch_size):
+    """모든 게시글의 검색 색인(본문 토큰, 해시태그 연결)을 다시 만듭니다."""
+    from .services.post_search import reindex_posts
+    result = reindex_posts(batch_size=batch_size, report=click.echo)
+    click.echo(f"완료: 게시글 {result['posts']}개, {result['seconds']:.1f}s")
+
+
+@community_cli.command('reconcile-counts')
+@click.option('--batch-size', default=1000, show_default=True, help='한 번에 확인할 게시글 수')
+def reconcile_counts(batch_size):
+    """게시글의 좋아요/댓글 카운터를 실제 행 수와 맞춥니다."""
+    from .services.post_counters import reconcile_counts as reconcile
+    result = reconcile(batch_size=batch_size, report=click.echo)
+    click.echo(f"완료: 게시글 {result['checked']}개 확인, {result['repaired']}개 수정, {result['seconds']:.1f}s")
+
+
+def register_commands(app):
+    app.cli.add_command(styles_cli)
+    app.cli.add_command(uploads_cli)
+    app.cli.add_command(embeddings_cli)
+    app.cli.add_command(clip_cli)
+    app.cli.add_command(recommendations_cli)
+    app.cli.add_command(community_cli)
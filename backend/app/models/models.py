@@ -1,9 +1,14 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import mysql
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+def binary_string(length):
+    """MySQL 에서 대소문자/악센트를 구분해 비교하는 (utf8mb4_bin) 문자열 컬럼 타입"""
+    return db.String(length).with_variant(mysql.VARCHAR(length, collation='utf8mb4_bin'), 'mysql')
+
 # User & Profile
 class User(db.Model):
     __tablename__ = 'users'
@@ -41,6 +46,8 @@ class Style(db.Model):
     __tablename__ = 'style'
     style_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), unique=True)
+    embedding = db.Column(db.LargeBinary)  # 스타일 이름의 CLIP 텍스트 임베딩
+    embedding_model = db.Column(db.String(100))
     wardrobes = db.relationship('WardrobeStyle', backref='style', cascade='all, delete-orphan')
     preferred_users = db.relationship('PreferredStyle', backref='style', cascade='all, delete-orphan')
 
@@ -104,8 +111,13 @@ class Weather(db.Model):
     city_name = db.Column(db.String(50))
     temperature = db.Column(db.Float)
     description = db.Column(db.String(100))
+    observed_at = db.Column(db.DateTime, default=datetime.utcnow)  # 날씨 API 에서 받아온 시각
     recommendations = db.relationship('Recommendation', backref='weather', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_weather_city_observed_at', 'city_name', 'observed_at'),
+    )
+
 # CommunityPost, Like, Comment, Hashtag
 class CommunityPost(db.Model):
     __tablename__ = 'community_post'
@@ -115,10 +127,19 @@ class CommunityPost(db.Model):
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     hashtag = db.Column(db.String(255))
+    # 좋아요/댓글 쓰기와 같은 트랜잭션에서 갱신되는 비정규화 카운터 (post_counters 참고)
+    like_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     likes = db.relationship('Like', backref='community_post', cascade='all, delete-orphan')
     comments = db.relationship('Comment', backref='community_post', cascade='all, delete-orphan')
     post_hashtags = db.relationship('PostHashtag', backref='community_post', cascade='all, delete-orphan')
 
+    # 피드 커서 페이지네이션 (created_at DESC, post_id DESC) 용 인덱스
+    __table_args__ = (
+        db.Index('ix_community_post_created_at_post_id', 'created_at', 'post_id'),
+        db.Index('ix_community_post_user_created_at', 'user_id', 'created_at', 'post_id'),
+    )
+
 class Like(db.Model):
     __tablename__ = 'like'
     like_id = db.Column(db.Integer, primary_key=True)
@@ -138,13 +159,43 @@ class Comment(db.Model):
 class Hashtag(db.Model):
     __tablename__ = 'hashtag'
     hashtag_id = db.Column(db.Integer, primary_key=True)
-    tag_text = db.Column(db.String(50), unique=True)
+    # 태그는 파이썬에서 정규화한 문자열 그대로 구분합니다 ('café' 와 'cafe' 는 다른 태그).
+    tag_text = db.Column(binary_string(50), unique=True)
     post_hashtags = db.relationship('PostHashtag', backref='hashtag', cascade='all, delete-orphan')
 
 class PostHashtag(db.Model):
     __tablename__ = 'post_hashtag'
     post_id = db.Column(db.Integer, db.ForeignKey('community_post.post_id'), primary_key=True)
     hashtag_id = db.Column(db.Integer, db.ForeignKey('hashtag.hashtag_id'), primary_key=True)
+    # 이 연결이 트렌딩 사용 횟수에 더해진 시간 창. NULL 이면 집계되지 않은 연결입니다.
+    counted_window = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_post_hashtag_hashtag_id', 'hashtag_id', 'post_id'),
+    )
+
+class HashtagUsage(db.Model):
+    """해시태그 사용 횟수 (시간 창 단위). 트렌딩 점수 계산에 사용합니다."""
+    __tablename__ = 'hashtag_usage'
+    hashtag_id = db.Column(db.Integer, db.ForeignKey('hashtag.hashtag_id', ondelete='CASCADE'), primary_key=True)
+    window_start = db.Column(db.DateTime, primary_key=True)
+    use_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_hashtag_usage_window_start', 'window_start'),
+    )
+
+class PostToken(db.Model):
+    """게시글 본문 검색용 역색인 (토큰 -> 게시글, 등장 횟수)"""
+    __tablename__ = 'post_token'
+    # 토큰은 파이썬 문자열 단위로 중복을 제거하므로 DB 비교도 바이너리로 맞춥니다.
+    token = db.Column(binary_string(50), primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('community_post.post_id', ondelete='CASCADE'), primary_key=True)
+    term_frequency = db.Column(db.Integer, nullable=False, default=1)
+
+    __table_args__ = (
+        db.Index('ix_post_token_post_id', 'post_id'),
+    )
 
 class Clothing(db.Model):
     __tablename__ = 'clothes'
@@ -173,7 +224,7 @@ class Outfit(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # 관계 설정
-    items = db.relationship('OutfitItem', backref='outfit', lazy=True)
+    items = db.relationship('OutfitItem', backref='outfit', lazy=True, cascade='all, delete-orphan')
     likes = db.relationship('Like', backref='outfit', lazy=True)
     comments = db.relationship('Comment', backref='outfit', lazy=True)
 
@@ -182,9 +233,12 @@ class OutfitItem(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     outfit_id = db.Column(db.Integer, db.ForeignKey('outfits.id'), nullable=False)
-    clothing_id = db.Column(db.Integer, db.ForeignKey('clothes.id'), nullable=False)
+    clothing_id = db.Column(db.Integer, db.ForeignKey('clothes.id'))
+    wardrobe_item_id = db.Column(db.Integer, db.ForeignKey('wardrobe_item.item_id', ondelete='CASCADE'))
     position = db.Column(db.String(50))  # 상의, 하의, 아우터, 신발 등 
 
+    wardrobe_item = db.relationship('WardrobeItem')
+
 class WardrobeItem(db.Model):
     __tablename__ = 'wardrobe_item'
     item_id = db.Column(db.Integer, primary_key=True)
@@ -195,5 +249,38 @@ class WardrobeItem(db.Model):
     brand = db.Column(db.String(50))
     image_path = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # CLIP 임베딩 (embedding_codec 형식의 바이너리 블롭)
+    image_embedding = db.Column(db.LargeBinary)
+    text_embedding = db.Column(db.LargeBinary)
+    combined_embedding = db.Column(db.LargeBinary)
+    embedding_model = db.Column(db.String(100))  # 임베딩을 계산한 모델 버전
+    crop_bbox = db.Column(db.String(64))  # 이미지 임베딩에 사용한 검출 영역 "x1,y1,x2,y2" (없으면 이미지 전체)
+    # 착용 가능 기온 범위 (°C). 카테고리가 바뀔 때 temperature.TEMPERATURE_RANGES 에서 채워집니다.
+    min_temp = db.Column(db.Float)
+    max_temp = db.Column(db.Float)
     
-    wardrobe = db.relationship('Wardrobe', backref='items') 
\ No newline at end of file
+    wardrobe = db.relationship('Wardrobe', backref='items') 
+
+    __table_args__ = (
+        db.Index('ix_wardrobe_item_temperature', 'wardrobe_id', 'min_temp', 'max_temp'),
+    )
+
+class UploadJob(db.Model):
+    __tablename__ = 'upload_job'
+    job_id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('wardrobe_item.item_id', ondelete='SET NULL'))
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, processing, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DailyRecommendation(db.Model):
+    __tablename__ = 'daily_recommendation'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    temp_bucket = db.Column(db.Integer, primary_key=True)  # temperature.temperature_bucket 구간 번호
+    item_ids = db.Column(db.LargeBinary, nullable=False)  # int32 배열 (순위순)
+    scores = db.Column(db.LargeBinary, nullable=False)  # float16 배열
+    depth = db.Column(db.Integer, nullable=False)  # 계산 시 요청한 순위 길이
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
@@ -1,12 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from ..models.models import db, User
+from ..services.style_vocabulary import set_user_preferred_styles
+from ..services.style_recommendation_service import StyleRecommendationService
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 import os
 import uuid
 
 auth_bp = Blueprint('auth', __name__)
+style_recommendation_service = StyleRecommendationService()
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -84,7 +87,7 @@ def get_profile():
         'username': user.username,
         'gender': user.gender,
         'birth': user.birth.isoformat() if user.birth else None,
-        'preferred_styles': getattr(user, 'preferred_styles', None),
+        'preferred_styles': style_recommendation_service.get_user_style_preferences(user.id),
         'created_at': user.created_at.isoformat() if hasattr(user, 'created_at') else None,
         'profile_image': user.profile_image
     }), 200
@@ -115,7 +118,10 @@ def update_profile():
                 return jsonify({'error': 'Username already taken'}), 400
             user.username = new_username
     if 'preferred_styles' in data:
-        user.preferred_styles = data['preferred_styles']
+        styles = data['preferred_styles']
+        if isinstance(styles, str):
+            styles = styles.split(',')
+        set_user_preferred_styles(user.id, styles)
     if 'password' in data:
         user.set_password(data['password'])
     if file:
@@ -134,7 +140,7 @@ def update_profile():
             'user': {
                 'id': user.id,
                 'username': user.username,
-                'preferred_styles': getattr(user, 'preferred_styles', None),
+                'preferred_styles': style_recommendation_service.get_user_style_preferences(user.id),
                 'profile_image': user.profile_image
             }
         }), 200
@@ -1,16 +1,34 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models.models import db, CommunityPost, Comment, Like, Hashtag, PostHashtag, User
+from ..models.models import db, CommunityPost, Comment, Like
+from ..services.image_pipeline import normalize_upload
+from ..services.pagination import keyset_page, page_size
+from ..services.post_search import search_posts
+from ..services.hashtags import trending, hashtag_autocomplete
+from ..services import post_counters  # 좋아요/댓글 카운터 매퍼 이벤트 등록
+from ..services.community_serializers import serialize_posts, post_comments, user_comments, like_details
+from PIL import UnidentifiedImageError
+from sqlalchemy import func
 import os
 import re
 
 community_bp = Blueprint('community', __name__)
+MAX_HASHTAG_RESULTS = 50
 
 def extract_hashtags(text):
     if not text:
         return []
     return re.findall(r'#(\w+)', text)
 
+def post_page(posts_query):
+    """?cursor=&limit= 로 (created_at, post_id) 커서 페이지를 읽어 응답을 만듭니다."""
+    try:
+        posts, next_cursor = keyset_page(posts_query, CommunityPost.created_at, CommunityPost.post_id,
+                                         request.args.get('cursor'), page_size(request.args.get('limit')))
+    except ValueError:
+        return jsonify({'message': '잘못된 커서입니다.'}), 400
+    return jsonify({'posts': serialize_posts(posts), 'next_cursor': next_cursor}), 200
+
 @community_bp.route('/post', methods=['POST'])
 @jwt_required()
 def create_post():
@@ -24,8 +42,12 @@ def create_post():
         static_dir = os.path.join(os.getcwd(), 'static')
         if not os.path.exists(static_dir):
             os.makedirs(static_dir)
-        image_path = os.path.join('static', filename)
-        image.save(os.path.join(os.getcwd(), image_path))
+        try:
+            # EXIF 회전 보정, RGB 변환, 크기 제한 후 JPEG 로 저장
+            saved_path = normalize_upload(image, os.path.join(static_dir, filename))
+        except (UnidentifiedImageError, OSError):
+            return jsonify({'message': '이미지 파일이 올바르지 않습니다.'}), 400
+        image_path = os.path.join('static', os.path.basename(saved_path))
     hashtags = extract_hashtags(description)
     hashtag_str = ','.join(hashtags)
     new_post = CommunityPost(
@@ -42,25 +64,35 @@ def create_post():
 @jwt_required()
 def get_posts():
     query = request.args.get('query', '').strip()
-    posts_query = CommunityPost.query
     if query:
-        posts_query = posts_query.filter(
-            (CommunityPost.description.ilike(f'%{query}%')) |
-            (CommunityPost.hashtag.ilike(f'%{query}%'))
-        )
-    posts = posts_query.order_by(CommunityPost.created_at.desc()).all()
-    post_list = []
-    for post in posts:
-        post_list.append({
-            'id': post.post_id,
-            'user_id': post.user_id,
-            'username': post.user.username if post.user else None,
-            'description': post.description,
-            'image': post.image_path,
-            'created_at': post.created_at.isoformat() if post.created_at else None,
-            'hashtags': post.hashtag.split(',') if post.hashtag else []
-        })
-    return jsonify({'posts': post_list}), 200
+        # 본문 토큰 역색인과 해시태그 테이블로 검색하고, 점수순 (score, post_id) 커서로 페이지를 나눕니다.
+        try:
+            posts, scores, next_cursor = search_posts(query, request.args.get('cursor'),
+                                                      page_size(request.args.get('limit')))
+        except ValueError:
+            return jsonify({'message': '잘못된 커서입니다.'}), 400
+        post_list = serialize_posts(posts)
+        for post in post_list:
+            post['score'] = scores[post['id']]
+        return jsonify({'posts': post_list, 'next_cursor': next_cursor}), 200
+    return post_page(CommunityPost.query)
+
+# 최근 많이 쓰인 해시태그 (시간 감쇠 점수순)
+@community_bp.route('/trending', methods=['GET'])
+@jwt_required()
+def trending_hashtags():
+    limit = page_size(request.args.get('limit'), default=10, maximum=MAX_HASHTAG_RESULTS)
+    return jsonify({'hashtags': trending(limit)}), 200
+
+# 해시태그 접두어 자동완성
+@community_bp.route('/hashtags/autocomplete', methods=['GET'])
+@jwt_required()
+def autocomplete_hashtags():
+    prefix = request.args.get('prefix', '').strip()
+    if not prefix.lstrip('#'):
+        return jsonify({'hashtags': []}), 200
+    limit = page_size(request.args.get('limit'), default=10, maximum=MAX_HASHTAG_RESULTS)
+    return jsonify({'hashtags': hashtag_autocomplete.suggest(prefix, limit)}), 200
 
 # 게시글 수정
 @community_bp.route('/post/<int:post_id>', methods=['PUT'])
@@ -112,8 +144,8 @@ def like_post():
         db.session.add(new_like)
         db.session.commit()
         liked = True
-    like_count = Like.query.filter_by(post_id=post_id).count()
-    return jsonify({'liked': liked, 'like_count': like_count}), 200
+    # 카운터는 좋아요 쓰기와 같은 트랜잭션에서 갱신되었으므로 COUNT 없이 게시글 행에서 읽습니다.
+    return jsonify({'liked': liked, 'like_count': post.like_count}), 200
 
 @community_bp.route('/comment', methods=['POST'])
 @jwt_required()
@@ -130,8 +162,7 @@ def add_comment():
     new_comment = Comment(user_id=user_id, post_id=post_id, content=content)
     db.session.add(new_comment)
     db.session.commit()
-    comment_count = Comment.query.filter_by(post_id=post_id).count()
-    return jsonify({'message': '댓글 등록 완료', 'comment_count': comment_count}), 201
+    return jsonify({'message': '댓글 등록 완료', 'comment_count': post.comment_count}), 201
 
 # 댓글 수정
 @community_bp.route('/comment/<int:comment_id>', methods=['PUT'])
@@ -165,17 +196,7 @@ def delete_comment(comment_id):
 @community_bp.route('/comments/<int:post_id>', methods=['GET'])
 @jwt_required()
 def get_comments(post_id):
-    comments = Comment.query.filter_by(post_id=post_id).order_by(Comment.created_at.asc()).all()
-    comment_list = []
-    for c in comments:
-        user = User.query.get(c.user_id)
-        comment_list.append({
-            'id': c.comment_id,
-            'user_id': c.user_id,
-            'username': user.username if user else None,
-            'content': c.content,
-            'created_at': c.created_at.isoformat() if c.created_at else None
-        })
+    comment_list = post_comments(post_id)
     return jsonify({'comments': comment_list, 'comment_count': len(comment_list)}), 200
 
 # 내가 쓴 글 목록
@@ -183,58 +204,22 @@ def get_comments(post_id):
 @jwt_required()
 def my_posts():
     user_id = get_jwt_identity()
-    posts = CommunityPost.query.filter_by(user_id=user_id).order_by(CommunityPost.created_at.desc()).all()
-    post_list = []
-    for post in posts:
-        post_list.append({
-            'id': post.post_id,
-            'user_id': post.user_id,
-            'username': post.user.username if post.user else None,
-            'description': post.description,
-            'image': post.image_path,
-            'created_at': post.created_at.isoformat() if post.created_at else None,
-            'hashtags': post.hashtag.split(',') if post.hashtag else []
-        })
-    return jsonify({'posts': post_list}), 200
+    return post_page(CommunityPost.query.filter_by(user_id=user_id))
 
 # 내가 좋아요한 글 목록
 @community_bp.route('/my_likes', methods=['GET'])
 @jwt_required()
 def my_likes():
     user_id = get_jwt_identity()
-    likes = Like.query.filter_by(user_id=user_id).all()
-    post_ids = [like.post_id for like in likes if like.post_id]
-    posts = CommunityPost.query.filter(CommunityPost.post_id.in_(post_ids)).order_by(CommunityPost.created_at.desc()).all()
-    post_list = []
-    for post in posts:
-        post_list.append({
-            'id': post.post_id,
-            'user_id': post.user_id,
-            'username': post.user.username if post.user else None,
-            'description': post.description,
-            'image': post.image_path,
-            'created_at': post.created_at.isoformat() if post.created_at else None,
-            'hashtags': post.hashtag.split(',') if post.hashtag else []
-        })
-    return jsonify({'posts': post_list}), 200
+    posts_query = CommunityPost.query.join(Like, Like.post_id == CommunityPost.post_id).filter(Like.user_id == user_id)
+    return post_page(posts_query)
 
 # 내가 쓴 댓글 목록
 @community_bp.route('/my_comments', methods=['GET'])
 @jwt_required()
 def my_comments():
     user_id = get_jwt_identity()
-    comments = Comment.query.filter_by(user_id=user_id).order_by(Comment.created_at.desc()).all()
-    comment_list = []
-    for c in comments:
-        post = CommunityPost.query.get(c.post_id)
-        comment_list.append({
-            'comment_id': c.comment_id,
-            'post_id': c.post_id,
-            'post_description': post.description if post else '',
-            'content': c.content,
-            'created_at': c.created_at.isoformat() if c.created_at else None
-        })
-    return jsonify({'comments': comment_list}), 200
+    return jsonify({'comments': user_comments(user_id)}), 200
 
 # 내가 올린 게시글 개수
 @community_bp.route('/my_post_count', methods=['GET'])
@@ -249,11 +234,9 @@ def my_post_count():
 @jwt_required()
 def my_like_count():
     user_id = get_jwt_identity()
-    posts = CommunityPost.query.filter_by(user_id=user_id).all()
-    post_ids = [p.post_id for p in posts]
-    like_count = 0
-    if post_ids:
-        like_count = Like.query.filter(Like.post_id.in_(post_ids)).count()
+    like_count = db.session.query(func.coalesce(func.sum(CommunityPost.like_count), 0)).filter(
+        CommunityPost.user_id == user_id
+    ).scalar()
     return jsonify({'like_count': like_count}), 200
 
 # 내가 올린 게시글에 누가 좋아요를 눌렀는지 상세 목록
@@ -261,19 +244,5 @@ def my_like_count():
 @jwt_required()
 def my_like_details():
     user_id = get_jwt_identity()
-    posts = CommunityPost.query.filter_by(user_id=user_id).all()
-    post_ids = [p.post_id for p in posts]
-    like_details = []
-    if post_ids:
-        likes = Like.query.filter(Like.post_id.in_(post_ids)).all()
-        for like in likes:
-            liker = User.query.get(like.user_id)
-            post = CommunityPost.query.get(like.post_id)
-            like_details.append({
-                'liker_id': liker.id if liker else None,
-                'liker_username': liker.username if liker else None,
-                'liker_profile_image': None,  # 프로필 이미지 필드가 있다면 넣기
-                'post_id': post.post_id if post else None,
-                'post_image': post.image_path if post else None
-            })
-    return jsonify({'like_details': like_details, 'like_count': len(like_details)}), 200 
\ No newline at end of file
+    details = like_details(user_id)
+    return jsonify({'like_details': details, 'like_count': len(details)}), 200
\ No newline at end of file
@@ -1,29 +1,39 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models.models import db, Outfit, WardrobeItem, User
+from sqlalchemy.orm import selectinload
+from ..models.models import db, Outfit, OutfitItem, User
 from ..services.recommendation_service import RecommendationService
-import requests
+from ..services.style_recommendation_service import StyleRecommendationService
+from ..services.weather_client import weather_client, UnknownCity
 from datetime import datetime
 
 outfit_bp = Blueprint('outfit', __name__)
 recommendation_service = RecommendationService()
+style_recommendation_service = StyleRecommendationService()
+MAX_OUTFITS_PER_REQUEST = 5
+
+def serialize_outfit(outfit):
+    return {
+        'id': outfit.id,
+        'name': outfit.name,
+        'description': outfit.description,
+        'items': [{
+            'position': outfit_item.position,
+            'item_id': outfit_item.wardrobe_item_id,
+            'name': outfit_item.wardrobe_item.name if outfit_item.wardrobe_item else None,
+            'category': outfit_item.wardrobe_item.category if outfit_item.wardrobe_item else None,
+            'image_path': outfit_item.wardrobe_item.image_path if outfit_item.wardrobe_item else None,
+        } for outfit_item in outfit.items],
+        'created_at': outfit.created_at.isoformat()
+    }
+
+def _outfits_with_items():
+    # 코디 아이템과 옷 정보를 한 번에 로드합니다.
+    return Outfit.query.options(selectinload(Outfit.items).joinedload(OutfitItem.wardrobe_item))
 
 def get_weather_data(latitude, longitude):
-    """날씨 API에서 날씨 정보를 가져옵니다."""
-    # OpenWeatherMap API 사용 예시
-    API_KEY = "YOUR_API_KEY"  # 실제 API 키로 교체 필요
-    url = f"http://api.openweathermap.org/data/2.5/weather?lat={latitude}&lon={longitude}&appid={API_KEY}&units=metric"
-    
-    try:
-        response = requests.get(url)
-        data = response.json()
-        return {
-            'temperature': data['main']['temp'],
-            'weather': data['weather'][0]['main'],
-            'humidity': data['main']['humidity']
-        }
-    except Exception as e:
-        return None
+    """날씨 API에서 날씨 정보를 가져옵니다. (좌표 격자 타일 단위로 캐시, 장애 시 대체 날씨)"""
+    return weather_client.by_coordinates_or_fallback(latitude, longitude)
 
 @outfit_bp.route('/recommend', methods=['POST'])
 @jwt_required()
@@ -40,52 +50,72 @@ def recommend_outfit():
     
     if not latitude or not longitude:
         return jsonify({'error': 'Location information is required'}), 400
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'latitude and longitude must be numbers'}), 400
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return jsonify({'error': 'latitude and longitude are out of range'}), 400
     
+    try:
+        count = min(max(int(data.get('count', 1)), 1), MAX_OUTFITS_PER_REQUEST)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'count must be an integer'}), 400
+
     # 날씨 정보 가져오기
-    weather_data = get_weather_data(latitude, longitude)
-    if not weather_data:
-        return jsonify({'error': 'Failed to fetch weather data'}), 500
-    
-    # 사용자의 옷장 아이템 가져오기
-    wardrobe_items = WardrobeItem.query.filter_by(user_id=current_user_id).all()
-    wardrobe_items_data = [{
-        'id': item.id,
-        'category': item.category,
-        'subcategory': item.subcategory,
-        'embedding': item.embedding
-    } for item in wardrobe_items]
-    
+    try:
+        weather_data = get_weather_data(latitude, longitude)
+    except UnknownCity:
+        return jsonify({'error': f'Unknown location: {latitude}, {longitude}'}), 404
+
+    # 캐시된 옷장 스냅샷 (임베딩 행렬 + 메타데이터)
+    snapshot = style_recommendation_service.get_wardrobe_snapshot(int(current_user_id))
+    style_tags = style_recommendation_service.get_user_style_preferences(int(current_user_id))
+
     # 코디 추천
     recommended_outfit = recommendation_service.recommend_outfit(
-        user_id=current_user_id,
+        user_id=int(current_user_id),
         weather_data=weather_data,
-        style_preferences=user.preferred_styles,
-        wardrobe_items=wardrobe_items_data
+        style_preferences=style_tags,
+        snapshot=snapshot,
+        n_outfits=count
     )
-    
+    if not recommended_outfit['outfits']:
+        return jsonify({'error': 'No suitable wardrobe items for the current weather'}), 404
+
     # 추천된 코디 저장
-    new_outfit = Outfit(
-        user_id=current_user_id,
-        name=f"Recommended Outfit {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-        items=recommended_outfit['items'],
-        style_tags=recommended_outfit['style_tags'],
-        created_at=recommended_outfit['created_at']
-    )
-    
+    created_at = recommended_outfit['created_at']
+    new_outfits = []
+    for rank, candidate in enumerate(recommended_outfit['outfits'], start=1):
+        new_outfit = Outfit(
+            user_id=int(current_user_id),
+            name=f"Recommended Outfit {datetime.now().strftime('%Y-%m-%d %H:%M')}" + (f" #{rank}" if count > 1 else ''),
+            description=', '.join(style_tags) or None,
+            created_at=created_at,
+            items=[OutfitItem(wardrobe_item_id=item['item_id'], position=item['position'])
+                   for item in candidate['items']]
+        )
+        new_outfits.append(new_outfit)
+
     try:
-        db.session.add(new_outfit)
+        db.session.add_all(new_outfits)
         db.session.commit()
-        
+
+        outfits = []
+        for new_outfit, candidate in zip(new_outfits, recommended_outfit['outfits']):
+            serialized = serialize_outfit(new_outfit)
+            serialized.update({
+                'score': candidate['score'],
+                'style_score': candidate['style_score'],
+                'compatibility': candidate['compatibility'],
+                'style_tags': style_tags,
+                'weather_data': weather_data,
+            })
+            outfits.append(serialized)
         return jsonify({
             'message': 'Outfit recommended successfully',
-            'outfit': {
-                'id': new_outfit.id,
-                'name': new_outfit.name,
-                'items': new_outfit.items,
-                'style_tags': new_outfit.style_tags,
-                'weather_data': weather_data,
-                'created_at': new_outfit.created_at.isoformat()
-            }
+            'outfit': outfits[0],
+            'outfits': outfits
         }), 200
         
     except Exception as e:
@@ -96,34 +126,22 @@ def recommend_outfit():
 @jwt_required()
 def get_outfits():
     current_user_id = get_jwt_identity()
-    outfits = Outfit.query.filter_by(user_id=current_user_id).order_by(Outfit.created_at.desc()).all()
+    outfits = _outfits_with_items().filter_by(user_id=current_user_id).order_by(Outfit.created_at.desc()).all()
     
     return jsonify({
-        'outfits': [{
-            'id': outfit.id,
-            'name': outfit.name,
-            'items': outfit.items,
-            'style_tags': outfit.style_tags,
-            'created_at': outfit.created_at.isoformat()
-        } for outfit in outfits]
+        'outfits': [serialize_outfit(outfit) for outfit in outfits]
     }), 200
 
 @outfit_bp.route('/outfits/<int:outfit_id>', methods=['GET'])
 @jwt_required()
 def get_outfit(outfit_id):
     current_user_id = get_jwt_identity()
-    outfit = Outfit.query.filter_by(id=outfit_id, user_id=current_user_id).first()
+    outfit = _outfits_with_items().filter_by(id=outfit_id, user_id=current_user_id).first()
     
     if not outfit:
         return jsonify({'error': 'Outfit not found'}), 404
     
-    return jsonify({
-        'id': outfit.id,
-        'name': outfit.name,
-        'items': outfit.items,
-        'style_tags': outfit.style_tags,
-        'created_at': outfit.created_at.isoformat()
-    }), 200
+    return jsonify(serialize_outfit(outfit)), 200
 
 @outfit_bp.route('/outfits/<int:outfit_id>', methods=['DELETE'])
 @jwt_required()
@@ -1,18 +1,25 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models.models import db, WardrobeItem, User, Wardrobe
-from ..services.recommendation_service import RecommendationService
+from ..models.models import db, WardrobeItem, User, Wardrobe, UploadJob
 import os
 from werkzeug.utils import secure_filename
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 import uuid
 from ..services.weather_service import get_weather_by_city
+from ..services.weather_client import UnknownCity
+from ..services.wardrobe_cache import wardrobe_cache
+from ..services.image_pipeline import normalize_upload
+from ..services.upload_jobs import upload_job_runner, WARDROBE_UPLOAD_FOLDER
+from ..services.style_recommendation_service import StyleRecommendationService
+from ..services.recommendation_planner import recommendation_planner, MAX_PLAN_DAYS
+from datetime import date
 
 wardrobe_bp = Blueprint('wardrobe', __name__)
-recommendation_service = RecommendationService()
+style_recommendation_service = StyleRecommendationService()
+MAX_RECOMMENDATIONS = 50
 
 # 이미지 업로드 설정
-UPLOAD_FOLDER = 'uploads/wardrobe'
+UPLOAD_FOLDER = WARDROBE_UPLOAD_FOLDER
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
 def allowed_file(filename):
@@ -38,15 +45,12 @@ def add_item():
     filename = secure_filename(f"{uuid.uuid4()}_{file.filename}")
     filepath = os.path.join(UPLOAD_FOLDER, filename)
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    file.save(filepath)
-    
-    # 의류 아이템 감지
-    detected_items = recommendation_service.detect_clothing_items(filepath)
-    if not detected_items:
-        return jsonify({'error': 'No clothing items detected'}), 400
-    
-    # CLIP 임베딩 계산
-    embedding = recommendation_service.get_image_embedding(filepath)
+    try:
+        # EXIF 회전 보정, RGB 변환, 크기 제한 후 JPEG 로 저장
+        filepath = normalize_upload(file, filepath)
+    except (UnidentifiedImageError, OSError):
+        return jsonify({'error': 'Invalid image file'}), 400
+    filename = os.path.basename(filepath)
     
     # 사용자의 기본 옷장 찾기 또는 생성
     user_wardrobe = Wardrobe.query.filter_by(user_id=current_user_id).first()
@@ -58,7 +62,7 @@ def add_item():
     # 웹에서 접근 가능한 이미지 경로 생성
     web_image_path = f'/uploads/{filename}'
     
-    # 새 의류 아이템 생성
+    # 새 의류 아이템 생성 (감지/임베딩은 백그라운드 작업에서 채웁니다)
     new_item = WardrobeItem(
         wardrobe_id=user_wardrobe.wardrobe_id,
         name=request.form.get('name', ''),
@@ -70,10 +74,16 @@ def add_item():
     
     try:
         db.session.add(new_item)
+        db.session.flush()
+        job = upload_job_runner.create_job(current_user_id, new_item)
         db.session.commit()
+        wardrobe_cache.patch_item(current_user_id, new_item)
+        upload_job_runner.submit(current_app._get_current_object(), job.job_id)
         
         return jsonify({
-            'message': 'Item added successfully',
+            'message': 'Item upload accepted',
+            'job_id': job.job_id,
+            'status': job.status,
             'item': {
                 'id': new_item.item_id,
                 'name': new_item.name,
@@ -82,12 +92,37 @@ def add_item():
                 'color': new_item.color,
                 'brand': new_item.brand
             }
-        }), 201
+        }), 202
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@wardrobe_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    current_user_id = get_jwt_identity()
+    job = UploadJob.query.filter_by(job_id=job_id, user_id=current_user_id).first()
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(upload_job_runner.serialize(job)), 200
+
+@wardrobe_bp.route('/jobs/<job_id>/retry', methods=['POST'])
+@jwt_required()
+def retry_job(job_id):
+    current_user_id = get_jwt_identity()
+    job = UploadJob.query.filter_by(job_id=job_id, user_id=current_user_id).first()
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status != 'failed' or job.item_id is None:
+        return jsonify({'error': 'Only failed jobs with an item can be retried'}), 400
+    
+    upload_job_runner.retry(current_app._get_current_object(), job)
+    return jsonify(upload_job_runner.serialize(job)), 202
+
 @wardrobe_bp.route('/items', methods=['GET'])
 @jwt_required()
 def get_items():
@@ -123,7 +158,10 @@ def get_items():
 @jwt_required()
 def update_item(item_id):
     current_user_id = get_jwt_identity()
-    item = WardrobeItem.query.filter_by(id=item_id, user_id=current_user_id).first()
+    item = WardrobeItem.query.join(Wardrobe).filter(
+        WardrobeItem.item_id == item_id,
+        Wardrobe.user_id == current_user_id
+    ).first()
     
     if not item:
         return jsonify({'error': 'Item not found'}), 404
@@ -135,8 +173,6 @@ def update_item(item_id):
         item.name = data['name']
     if 'category' in data:
         item.category = data['category']
-    if 'subcategory' in data:
-        item.subcategory = data['subcategory']
     if 'color' in data:
         item.color = data['color']
     if 'brand' in data:
@@ -144,13 +180,13 @@ def update_item(item_id):
     
     try:
         db.session.commit()
+        wardrobe_cache.patch_item(current_user_id, item)
         return jsonify({
             'message': 'Item updated successfully',
             'item': {
-                'id': item.id,
+                'id': item.item_id,
                 'name': item.name,
                 'category': item.category,
-                'subcategory': item.subcategory,
                 'image_path': item.image_path,
                 'color': item.color,
                 'brand': item.brand
@@ -165,7 +201,10 @@ def update_item(item_id):
 @jwt_required()
 def delete_item(item_id):
     current_user_id = get_jwt_identity()
-    item = WardrobeItem.query.filter_by(id=item_id, user_id=current_user_id).first()
+    item = WardrobeItem.query.join(Wardrobe).filter(
+        WardrobeItem.item_id == item_id,
+        Wardrobe.user_id == current_user_id
+    ).first()
     
     if not item:
         return jsonify({'error': 'Item not found'}), 404
@@ -177,6 +216,7 @@ def delete_item(item_id):
         
         db.session.delete(item)
         db.session.commit()
+        wardrobe_cache.remove_item(current_user_id, item_id)
         
         return jsonify({'message': 'Item deleted successfully'}), 200
         
@@ -184,6 +224,55 @@ def delete_item(item_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@wardrobe_bp.route('/recommendations', methods=['GET'])
+@jwt_required()
+def recommend_items():
+    current_user_id = int(get_jwt_identity())
+    city = request.args.get('city', 'Seoul')
+    top_n = min(max(request.args.get('top_n', 10, type=int), 1), MAX_RECOMMENDATIONS)
+    try:
+        recommendations = style_recommendation_service.recommend_styles(current_user_id, city, top_n=top_n)
+    except UnknownCity:
+        return jsonify({'error': f'Unknown city: {city}'}), 404
+    return jsonify({'city': city, 'recommendations': recommendations}), 200
+
+@wardrobe_bp.route('/recommendations/plan', methods=['POST'])
+@jwt_required()
+def plan_recommendations():
+    """여러 (날짜, 도시) 의 추천을 한 번에 계산합니다."""
+    current_user_id = int(get_jwt_identity())
+    data = request.get_json() or {}
+    entries = data.get('days')
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'error': 'days must be a non-empty list of {date, city}'}), 400
+    if len(entries) > MAX_PLAN_DAYS:
+        return jsonify({'error': f'At most {MAX_PLAN_DAYS} days can be planned at once'}), 400
+    days = []
+    for entry in entries:
+        try:
+            day = date.fromisoformat(entry['date'])
+            city = entry.get('city', 'Seoul').strip()
+        except (TypeError, KeyError, ValueError, AttributeError):
+            return jsonify({'error': 'Each day needs an ISO date (YYYY-MM-DD) and a city'}), 400
+        if not city:
+            return jsonify({'error': 'Each day needs an ISO date (YYYY-MM-DD) and a city'}), 400
+        days.append({'date': day, 'city': city})
+    try:
+        top_n = min(max(int(data.get('top_n', 10)), 1), MAX_RECOMMENDATIONS)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_n must be an integer'}), 400
+    avoid_repeats = data.get('avoid_repeats', False)
+    if not isinstance(avoid_repeats, bool):
+        return jsonify({'error': 'avoid_repeats must be a boolean'}), 400
+
+    snapshot = style_recommendation_service.get_wardrobe_snapshot(current_user_id)
+    try:
+        plan = recommendation_planner.plan(current_user_id, snapshot, days, top_n=top_n,
+                                           avoid_repeats=avoid_repeats)
+    except UnknownCity as e:
+        return jsonify({'error': f'Unknown city: {e}'}), 404
+    return jsonify({'plan': plan}), 200
+
 @wardrobe_bp.route('/weather', methods=['GET'])
 def get_weather():
     city = request.args.get('city', 'Seoul')
@@ -196,6 +285,8 @@ def get_weather():
         else:
             print("==== 날씨 정보 없음 ====")
             return jsonify({'error': '날씨 정보를 가져올 수 없습니다.'}), 400
+    except UnknownCity:
+        return jsonify({'error': f'Unknown city: {city}'}), 404
     except Exception as e:
         print("==== 예외 발생 ====")
         print(e)
@@ -0,0 +1,140 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import insert, select
+import threading
+import logging
+import os
+from app.models.models import db, Color, Season, WardrobeColor, WardrobeSeason
+from .embedding_codec import l2_normalize
+from .inference_batcher import embed_texts
+from .ranking import normalize_rows
+
+SEASON_THRESHOLD = float(os.environ.get('SEASON_TAG_THRESHOLD', 0.3))
+# CLIP 의 logit scale (학습된 값 ≈ 100) 로 그룹별 softmax 를 계산합니다.
+LOGIT_SCALE = 100.0
+
+# (저장할 라벨, 영어 프롬프트) - 카테고리는 temperature.TEMPERATURE_RANGES 의 키와 맞춥니다.
+CATEGORY_PROMPTS = [
+    ('패딩', 'a photo of a padded puffer jacket'), ('코트', 'a photo of a long coat'),
+    ('자켓', 'a photo of a jacket'), ('니트', 'a photo of a knit sweater'),
+    ('맨투맨', 'a photo of a sweatshirt'), ('후드티', 'a photo of a hoodie'),
+    ('셔츠', 'a photo of a button-up shirt'), ('티셔츠', 'a photo of a t-shirt'),
+    ('반팔', 'a photo of a short sleeve top'), ('민소매', 'a photo of a sleeveless top'),
+    ('청바지', 'a photo of blue jeans'), ('슬랙스', 'a photo of slacks trousers'),
+    ('반바지', 'a photo of shorts'), ('치마', 'a photo of a skirt'),
+    ('운동화', 'a photo of sneakers'), ('구두', 'a photo of leather dress shoes'),
+    ('샌들', 'a photo of sandals'),
+]
+COLOR_PROMPTS = [
+    ('검정', 'black'), ('흰색', 'white'), ('회색', 'gray'), ('네이비', 'navy blue'),
+    ('파랑', 'blue'), ('하늘색', 'light blue'), ('빨강', 'red'), ('분홍', 'pink'),
+    ('주황', 'orange'), ('노랑', 'yellow'), ('초록', 'green'), ('카키', 'khaki'),
+    ('베이지', 'beige'), ('갈색', 'brown'), ('보라', 'purple'),
+]
+SEASON_PROMPTS = [
+    ('봄', 'clothing for mild spring weather'), ('여름', 'clothing for hot summer weather'),
+    ('가을', 'clothing for cool autumn weather'), ('겨울', 'clothing for cold winter weather'),
+]
+
+
+class AttributeTagger:
+    """저장된 이미지 임베딩과 미리 계산한 프롬프트 행렬의 한 번의 matmul 로 속성을 태깅합니다."""
+
+    def __init__(self):
+        self._groups: List[Tuple[str, List[str], slice]] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def _build(self):
+        with self._lock:
+            if self._matrix is not None:
+                return
+            groups = [
+                ('category', CATEGORY_PROMPTS),
+                ('color', [(label, f'a photo of {text} clothing') for label, text in COLOR_PROMPTS]),
+                ('season', SEASON_PROMPTS),
+            ]
+            # 인코딩이 실패해도 반쯤 채운 상태가 남지 않도록 지역 변수에 만든 뒤 함께 할당합니다.
+            slices, prompts, offset = [], [], 0
+            for name, entries in groups:
+                slices.append((name, [label for label, _ in entries], slice(offset, offset + len(entries))))
+                prompts.extend(text for _, text in entries)
+                offset += len(entries)
+            matrix = normalize_rows(np.stack(embed_texts(prompts)))
+            self._groups = slices
+            self._matrix = matrix
+            logging.info(f"속성 프롬프트 행렬 준비 완료: {matrix.shape}")
+
+    def scores(self, image_embedding: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """속성 그룹별 라벨 확률을 반환합니다."""
+        if self._matrix is None:
+            self._build()
+        logits = LOGIT_SCALE * (self._matrix @ l2_normalize(image_embedding))
+        result = {}
+        for name, labels, group in self._groups:
+            group_logits = logits[group]
+            probs = np.exp(group_logits - group_logits.max())
+            probs /= probs.sum()
+            result[name] = dict(zip(labels, probs.tolist()))
+        return result
+
+    def tag(self, image_embedding: np.ndarray) -> Dict:
+        scores = self.scores(image_embedding)
+        seasons = [label for label, p in scores['season'].items() if p >= SEASON_THRESHOLD]
+        if not seasons:
+            seasons = [max(scores['season'], key=scores['season'].get)]
+        return {
+            'category': max(scores['category'], key=scores['category'].get),
+            'color': max(scores['color'], key=scores['color'].get),
+            'seasons': seasons,
+            'scores': scores,
+        }
+
+
+COLOR_LABELS = frozenset(label for label, _ in COLOR_PROMPTS)
+SEASON_LABELS = frozenset(label for label, _ in SEASON_PROMPTS)
+
+
+def _label_ids(model, names: List[str]) -> Dict[str, int]:
+    """이름 -> id. 없는 라벨은 한 번의 INSERT 로 만들고, 동시 업로드가 먼저 만든 중복은 무시합니다."""
+    if not names:
+        return {}
+    table = model.__table__
+    id_column = table.primary_key.columns[0]
+    connection = db.session.connection()
+    ids = dict(connection.execute(select(table.c.name, id_column).where(table.c.name.in_(names))).all())
+    missing = [name for name in names if name not in ids]
+    if missing:
+        connection.execute(insert(table).prefix_with('IGNORE', dialect='mysql').prefix_with('OR IGNORE', dialect='sqlite'),
+                           [{'name': name} for name in missing])
+        ids.update(connection.execute(select(table.c.name, id_column).where(table.c.name.in_(missing))).all())
+    return ids
+
+
+def _link(model, id_column: str, wardrobe_id: int, ids: List[int]):
+    """옷장 단위 태그 연결을 추가합니다. 이미 있는 연결은 무시합니다."""
+    if not ids:
+        return
+    db.session.execute(insert(model.__table__).prefix_with('IGNORE', dialect='mysql').prefix_with('OR IGNORE', dialect='sqlite'),
+                       [{'wardrobe_id': wardrobe_id, id_column: label_id} for label_id in ids])
+
+
+def apply_tags(item, tags: Dict):
+    """태깅 결과를 아이템과 옷장 태그 테이블에 기록합니다. 사용자가 입력한 값은 덮어쓰지 않습니다.
+
+    Color/Season 행은 태거의 라벨 집합만 만들며, 사용자가 자유롭게 입력한 색상은 아이템에만 남깁니다.
+    WardrobeColor/WardrobeSeason 은 옷장 단위 테이블이므로 옷장에 없는 태그만 추가합니다.
+    커밋은 호출자가 합니다.
+    """
+    if not item.category:
+        item.category = tags['category']
+    if not item.color:
+        item.color = tags['color']
+    colors = [item.color] if item.color in COLOR_LABELS else []
+    _link(WardrobeColor, 'color_id', item.wardrobe_id, list(_label_ids(Color, colors).values()))
+    seasons = [name for name in tags['seasons'] if name in SEASON_LABELS]
+    _link(WardrobeSeason, 'season_id', item.wardrobe_id, list(_label_ids(Season, seasons).values()))
+
+
+# 프로세스 단위 속성 태거
+attribute_tagger = AttributeTagger()
@@ -0,0 +1,60 @@
+from typing import Dict
+import threading
+import logging
+import time
+
+
+class CircuitBreaker:
+    """연속 실패가 임계값을 넘으면 일정 시간 호출을 차단하는 서킷 브레이커.
+
+    closed -> (연속 실패 failure_threshold 회) -> open -> (reset_timeout 경과) -> half_open
+    half_open 에서는 시험 호출 하나만 허용하고, 성공하면 closed, 실패하면 다시 open 이 됩니다.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._trial_in_flight = False
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logging.info(f"서킷 브레이커 복구: {self.name}")
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+                self.opens += 1
+                logging.warning(f"서킷 브레이커 열림: {self.name} (연속 실패 {self.failures}회)")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures, 'opens': self.opens, 'rejected': self.rejected,
+                    'failure_threshold': self.failure_threshold, 'reset_timeout': self.reset_timeout}
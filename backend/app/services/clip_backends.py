@@ -0,0 +1,190 @@
+import torch
+import numpy as np
+from typing import Dict, List, Optional
+import logging
+import copy
+import time
+import os
+
+CLIP_BACKEND = os.environ.get('CLIP_BACKEND', 'torch')  # torch, int8, onnx
+CLIP_ONNX_DIR = os.environ.get('CLIP_ONNX_DIR', os.path.join('instance', 'clip_onnx'))
+BACKEND_NAMES = ('torch', 'int8', 'onnx')
+
+
+class TorchClipBackend:
+    """eager PyTorch (fp32) 추론 백엔드."""
+
+    name = 'torch'
+
+    def __init__(self, model, device):
+        self.model = model
+        self.device = device
+
+    def image_features(self, pixel_values: torch.Tensor) -> np.ndarray:
+        with torch.inference_mode():
+            features = self.model.get_image_features(pixel_values=pixel_values.to(self.device))
+        return features.float().cpu().numpy()
+
+    def text_features(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> np.ndarray:
+        with torch.inference_mode():
+            features = self.model.get_text_features(input_ids=input_ids.to(self.device),
+                                                    attention_mask=attention_mask.to(self.device))
+        return features.float().cpu().numpy()
+
+
+class QuantizedTorchBackend(TorchClipBackend):
+    """Linear 레이어를 동적 int8 양자화한 CPU 전용 PyTorch 백엔드."""
+
+    name = 'int8'
+
+    def __init__(self, model, device):
+        quantized = torch.quantization.quantize_dynamic(
+            copy.deepcopy(model).to('cpu').eval(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+        super().__init__(quantized, torch.device('cpu'))
+
+
+class _VisionExport(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        return self.model.get_image_features(pixel_values=pixel_values)
+
+
+class _TextExport(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model.get_text_features(input_ids=input_ids, attention_mask=attention_mask)
+
+
+class OnnxClipBackend:
+    """ONNX Runtime CPU 백엔드. 그래프는 처음 사용할 때 CLIP_ONNX_DIR 에 export 됩니다."""
+
+    name = 'onnx'
+
+    def __init__(self, model, model_name: str, export_dir: str = CLIP_ONNX_DIR):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise RuntimeError('onnx 백엔드를 사용하려면 onnxruntime 패키지가 필요합니다.')
+        export_dir = os.path.join(export_dir, model_name.replace('/', '__'))
+        vision_path = os.path.join(export_dir, 'vision.onnx')
+        text_path = os.path.join(export_dir, 'text.onnx')
+        if not (os.path.exists(vision_path) and os.path.exists(text_path)):
+            self.export(model, export_dir)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = os.environ.get('CLIP_ONNX_THREADS')
+        if threads:
+            options.intra_op_num_threads = int(threads)
+        providers = ['CPUExecutionProvider']
+        self.vision_session = onnxruntime.InferenceSession(vision_path, options, providers=providers)
+        self.text_session = onnxruntime.InferenceSession(text_path, options, providers=providers)
+
+    @staticmethod
+    def export(model, export_dir: str):
+        os.makedirs(export_dir, exist_ok=True)
+        model = copy.deepcopy(model).to('cpu').eval()
+        started = time.perf_counter()
+        torch.onnx.export(
+            _VisionExport(model), (torch.zeros(1, 3, 224, 224),), os.path.join(export_dir, 'vision.onnx'),
+            input_names=['pixel_values'], output_names=['image_embeds'],
+            dynamic_axes={'pixel_values': {0: 'batch'}, 'image_embeds': {0: 'batch'}},
+            opset_version=14,
+        )
+        dummy_ids = torch.ones(1, 8, dtype=torch.long)
+        torch.onnx.export(
+            _TextExport(model), (dummy_ids, torch.ones_like(dummy_ids)), os.path.join(export_dir, 'text.onnx'),
+            input_names=['input_ids', 'attention_mask'], output_names=['text_embeds'],
+            dynamic_axes={'input_ids': {0: 'batch', 1: 'sequence'},
+                          'attention_mask': {0: 'batch', 1: 'sequence'},
+                          'text_embeds': {0: 'batch'}},
+            opset_version=14,
+        )
+        logging.info(f"CLIP ONNX export 완료: {export_dir} ({time.perf_counter() - started:.1f}s)")
+
+    def image_features(self, pixel_values: torch.Tensor) -> np.ndarray:
+        pixels = pixel_values.detach().cpu().numpy().astype(np.float32)
+        return self.vision_session.run(None, {'pixel_values': pixels})[0]
+
+    def text_features(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> np.ndarray:
+        return self.text_session.run(None, {
+            'input_ids': input_ids.detach().cpu().numpy().astype(np.int64),
+            'attention_mask': attention_mask.detach().cpu().numpy().astype(np.int64),
+        })[0]
+
+
+def build_backend(name: str, model, device, model_name: str):
+    if name == 'torch':
+        return TorchClipBackend(model, device)
+    if name == 'int8':
+        return QuantizedTorchBackend(model, device)
+    if name == 'onnx':
+        return OnnxClipBackend(model, model_name)
+    raise ValueError(f'알 수 없는 CLIP 백엔드입니다: {name} (사용 가능: {", ".join(BACKEND_NAMES)})')
+
+
+def _cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return np.sum(a * b, axis=1)
+
+
+def check_parity(reference, candidates: List, pixel_values: torch.Tensor, text_inputs: Dict,
+                 tolerance: float = 0.01) -> List[Dict]:
+    """기준 백엔드 대비 각 백엔드 임베딩의 코사인 유사도가 1 - tolerance 이상인지 확인합니다."""
+    ref_image = reference.image_features(pixel_values)
+    ref_text = reference.text_features(**text_inputs)
+    results = []
+    for backend in candidates:
+        image_cos = _cosine_rows(ref_image, backend.image_features(pixel_values))
+        text_cos = _cosine_rows(ref_text, backend.text_features(**text_inputs))
+        min_cos = float(min(image_cos.min(), text_cos.min()))
+        results.append({
+            'backend': backend.name,
+            'min_image_cosine': float(image_cos.min()),
+            'min_text_cosine': float(text_cos.min()),
+            'max_deviation': 1.0 - min_cos,
+            'passed': 1.0 - min_cos <= tolerance,
+        })
+    return results
+
+
+def benchmark(backend, pixel_values: torch.Tensor, text_inputs: Dict, iterations: int = 20,
+              warmup: int = 2) -> Dict:
+    """배치 단위 지연시간(p50/p95)과 초당 처리량을 측정합니다."""
+    batch = pixel_values.shape[0]
+    result = {'backend': backend.name, 'batch_size': batch}
+    for kind, run in (('image', lambda: backend.image_features(pixel_values)),
+                      ('text', lambda: backend.text_features(**text_inputs))):
+        for _ in range(warmup):
+            run()
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        timings = np.array(timings)
+        result[kind] = {
+            'p50_ms': float(np.percentile(timings, 50) * 1000),
+            'p95_ms': float(np.percentile(timings, 95) * 1000),
+            'items_per_second': float(batch / timings.mean()),
+        }
+    return result
+
+
+def sample_inputs(processor, batch_size: int, texts: Optional[List[str]] = None, seed: int = 0):
+    """패리티/벤치마크용 입력 (랜덤 이미지, 짧은 문장) 을 만듭니다."""
+    from PIL import Image
+    rng = np.random.default_rng(seed)
+    images = [Image.fromarray(rng.integers(0, 255, (256, 256, 3), dtype=np.uint8)) for _ in range(batch_size)]
+    texts = texts or ['casual style', '검은색 니트', 'denim jacket', '여름 반팔 티셔츠']
+    texts = (texts * (batch_size // len(texts) + 1))[:batch_size]
+    pixel_values = processor(images=images, return_tensors='pt')['pixel_values']
+    encoded = processor(text=texts, return_tensors='pt', padding=True, truncation=True)
+    return pixel_values, {'input_ids': encoded['input_ids'], 'attention_mask': encoded['attention_mask']}
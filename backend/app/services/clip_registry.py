@@ -0,0 +1,143 @@
+import torch
+from transformers import CLIPProcessor, CLIPModel
+from typing import Dict, Optional
+import threading
+import logging
+import time
+import os
+from .clip_backends import CLIP_BACKEND, build_backend
+
+CLIP_MODEL_NAME = os.environ.get('CLIP_MODEL_NAME', 'openai/clip-vit-base-patch32')
+# 저장된 임베딩에 함께 기록되는 버전 태그. 모델이 바뀌면 기존 임베딩은 stale 로 간주됩니다.
+EMBEDDING_MODEL_VERSION = os.environ.get('EMBEDDING_MODEL_VERSION', CLIP_MODEL_NAME)
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """현재 프로세스의 RSS(상주 메모리) 크기를 바이트 단위로 반환합니다."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # macOS는 바이트, Linux는 KB 단위의 최대 RSS를 반환합니다.
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if os.uname().sysname == 'Darwin' else max_rss * 1024
+    except Exception:
+        return None
+
+
+class ClipModelRegistry:
+    """프로세스 전체에서 하나의 CLIP 모델을 공유하는 레지스트리.
+
+    모델은 처음 사용될 때(또는 warmup 호출 시) 한 번만 로드되며,
+    로드 시간과 메모리 사용량을 기록합니다.
+    """
+
+    def __init__(self, model_name: str = CLIP_MODEL_NAME, backend_name: str = CLIP_BACKEND):
+        self.model_name = model_name
+        self.backend_name = backend_name
+        self._backends = {}
+        self._lock = threading.Lock()
+        self._model = None
+        self._processor = None
+        self._device = None
+        self._load_seconds = None
+        self._rss_delta_bytes = None
+        self._param_bytes = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def _load(self):
+        with self._lock:
+            if self._model is not None:
+                return
+            rss_before = _current_rss_bytes()
+            started = time.perf_counter()
+            try:
+                processor = CLIPProcessor.from_pretrained(self.model_name)
+                model = CLIPModel.from_pretrained(self.model_name)
+                device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+                model.to(device)
+                model.eval()
+            except Exception as e:
+                logging.error(f"CLIP 모델 로드 실패: {e}")
+                raise
+            self._load_seconds = time.perf_counter() - started
+            rss_after = _current_rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                self._rss_delta_bytes = rss_after - rss_before
+            self._param_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+            self._processor = processor
+            self._device = device
+            # 다른 스레드가 loaded 를 보고 바로 사용할 수 있도록 모델은 마지막에 할당합니다.
+            self._model = model
+            logging.info(
+                f"CLIP 모델 로드 완료: {self.model_name} ({self._load_seconds:.2f}s, "
+                f"파라미터 {self._param_bytes / 2**20:.1f}MB, RSS 증가 "
+                f"{(self._rss_delta_bytes or 0) / 2**20:.1f}MB)"
+            )
+
+    @property
+    def model(self) -> CLIPModel:
+        if self._model is None:
+            self._load()
+        return self._model
+
+    @property
+    def processor(self) -> CLIPProcessor:
+        if self._model is None:
+            self._load()
+        return self._processor
+
+    @property
+    def device(self) -> torch.device:
+        if self._model is None:
+            self._load()
+        return self._device
+
+    def get_backend(self, name: str):
+        """이름에 해당하는 추론 백엔드(torch/int8/onnx)를 만들어 재사용합니다."""
+        backend = self._backends.get(name)
+        if backend is None:
+            model = self.model
+            with self._lock:
+                backend = self._backends.get(name)
+                if backend is None:
+                    started = time.perf_counter()
+                    backend = build_backend(name, model, self._device, self.model_name)
+                    self._backends[name] = backend
+                    logging.info(f"CLIP 백엔드 준비 완료: {name} ({time.perf_counter() - started:.2f}s)")
+        return backend
+
+    @property
+    def backend(self):
+        """CLIP_BACKEND 로 선택된 기본 추론 백엔드."""
+        return self.get_backend(self.backend_name)
+
+    def warmup(self) -> Dict:
+        """모델과 백엔드를 미리 로드하고 한 번의 추론으로 커널을 초기화합니다."""
+        backend = self.backend
+        inputs = self._processor(text=["warmup"], return_tensors="pt", padding=True)
+        backend.text_features(inputs['input_ids'], inputs['attention_mask'])
+        return self.stats()
+
+    def stats(self) -> Dict:
+        return {
+            'model_name': self.model_name,
+            'backend': self.backend_name,
+            'loaded': self.loaded,
+            'device': str(self._device) if self._device is not None else None,
+            'load_seconds': self._load_seconds,
+            'param_bytes': self._param_bytes,
+            'rss_delta_bytes': self._rss_delta_bytes,
+            'rss_bytes': _current_rss_bytes(),
+        }
+
+
+# 모든 서비스가 공유하는 프로세스 단위 레지스트리
+clip_registry = ClipModelRegistry()
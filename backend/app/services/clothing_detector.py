@@ -0,0 +1,139 @@
+from PIL import Image
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import threading
+import logging
+import os
+
+CLOTHING_DETECTOR_PATH = os.environ.get('CLOTHING_DETECTOR_PATH')  # .onnx 또는 TorchScript(.pt)
+CLOTHING_DETECTOR_SIZE = int(os.environ.get('CLOTHING_DETECTOR_SIZE', 320))
+CLOTHING_DETECTOR_SCORE = float(os.environ.get('CLOTHING_DETECTOR_SCORE', 0.35))
+CLOTHING_DETECTOR_IOU = float(os.environ.get('CLOTHING_DETECTOR_IOU', 0.5))
+CLOTHING_DETECTOR_MAX = int(os.environ.get('CLOTHING_DETECTOR_MAX', 8))
+
+# DeepFashion2 클래스 순서 -> (카테고리, 세부 카테고리)
+DEFAULT_LABELS = [
+    ('short_sleeved_shirt', '상의', '반팔'),
+    ('long_sleeved_shirt', '상의', '긴팔'),
+    ('short_sleeved_outwear', '아우터', '자켓'),
+    ('long_sleeved_outwear', '아우터', '코트'),
+    ('vest', '상의', '민소매'),
+    ('sling', '상의', '민소매'),
+    ('shorts', '하의', '반바지'),
+    ('trousers', '하의', '슬랙스'),
+    ('skirt', '하의', '치마'),
+    ('short_sleeved_dress', '원피스', '반팔'),
+    ('long_sleeved_dress', '원피스', '긴팔'),
+    ('vest_dress', '원피스', '민소매'),
+    ('sling_dress', '원피스', '민소매'),
+]
+
+
+def _letterbox(image: Image.Image, size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """비율을 유지한 채 size x size 로 맞추고 (1, 3, size, size) float32 입력을 만듭니다."""
+    scale = size / max(image.width, image.height)
+    resized = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                           Image.BILINEAR)
+    canvas = Image.new('RGB', (size, size), (114, 114, 114))
+    pad = ((size - resized.width) // 2, (size - resized.height) // 2)
+    canvas.paste(resized, pad)
+    array = np.asarray(canvas, dtype=np.float32).transpose(2, 0, 1)[None] / 255.0
+    return np.ascontiguousarray(array), scale, pad
+
+
+def _nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float, max_keep: int) -> List[int]:
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores)
+    keep = []
+    while order.size and len(keep) < max_keep:
+        i = order[0]
+        keep.append(int(i))
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-9)
+        order = order[1:][iou <= iou_threshold]
+    return keep
+
+
+class ClothingDetector:
+    """CPU 에서 동작하는 소형 의류 검출기 (YOLOv8 형식 출력의 ONNX 또는 TorchScript 모델).
+
+    모델이 설정되지 않은 경우 이미지 전체를 하나의 의류로 간주합니다.
+    """
+
+    def __init__(self, model_path: Optional[str] = CLOTHING_DETECTOR_PATH, input_size: int = CLOTHING_DETECTOR_SIZE,
+                 score_threshold: float = CLOTHING_DETECTOR_SCORE, iou_threshold: float = CLOTHING_DETECTOR_IOU,
+                 labels: List[Tuple[str, str, str]] = DEFAULT_LABELS):
+        self.model_path = model_path
+        self.input_size = input_size
+        self.score_threshold = score_threshold
+        self.iou_threshold = iou_threshold
+        self.labels = labels
+        self._runner = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.model_path)
+
+    def _load(self):
+        with self._lock:
+            if self._runner is not None:
+                return
+            if self.model_path.endswith('.onnx'):
+                import onnxruntime
+                session = onnxruntime.InferenceSession(self.model_path, providers=['CPUExecutionProvider'])
+                input_name = session.get_inputs()[0].name
+                self._runner = lambda x: session.run(None, {input_name: x})[0]
+            else:
+                import torch
+                module = torch.jit.load(self.model_path, map_location='cpu').eval()
+
+                def run(x):
+                    with torch.inference_mode():
+                        out = module(torch.from_numpy(x))
+                    return (out[0] if isinstance(out, (tuple, list)) else out).numpy()
+                self._runner = run
+            logging.info(f"의류 검출 모델 로드 완료: {self.model_path} (입력 {self.input_size}px)")
+
+    def detect(self, image: Image.Image) -> List[Dict]:
+        """디코드된 RGB 이미지에서 의류를 검출합니다. bbox 는 원본 픽셀 좌표 [x1, y1, x2, y2] 입니다."""
+        if not self.enabled:
+            return [{'category': None, 'subcategory': None, 'label': None, 'confidence': 1.0,
+                     'bbox': [0, 0, image.width, image.height]}]
+        if self._runner is None:
+            self._load()
+        inputs, scale, (pad_x, pad_y) = _letterbox(image, self.input_size)
+        preds = self._runner(inputs)[0]  # (4 + C, N)
+        if preds.shape[0] > preds.shape[1]:
+            preds = preds.T
+        class_scores = preds[4:]
+        class_ids = class_scores.argmax(axis=0)
+        scores = class_scores[class_ids, np.arange(class_scores.shape[1])]
+        keep = scores >= self.score_threshold
+        if not keep.any():
+            return []
+        cx, cy, w, h = preds[:4, keep]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        boxes[:, [0, 2]] = np.clip((boxes[:, [0, 2]] - pad_x) / scale, 0, image.width)
+        boxes[:, [1, 3]] = np.clip((boxes[:, [1, 3]] - pad_y) / scale, 0, image.height)
+        scores, class_ids = scores[keep], class_ids[keep]
+
+        detections = []
+        for i in _nms(boxes, scores, self.iou_threshold, CLOTHING_DETECTOR_MAX):
+            label, category, subcategory = self.labels[class_ids[i]] if class_ids[i] < len(self.labels) \
+                else (str(class_ids[i]), None, None)
+            x1, y1, x2, y2 = (int(round(v)) for v in boxes[i])
+            if x2 - x1 < 2 or y2 - y1 < 2:
+                continue
+            detections.append({'category': category, 'subcategory': subcategory, 'label': label,
+                               'confidence': float(scores[i]), 'bbox': [x1, y1, x2, y2]})
+        return detections
+
+
+# 프로세스 단위 의류 검출기
+clothing_detector = ClothingDetector()
@@ -0,0 +1,77 @@
+from typing import Dict, Iterable, List
+from app.models.models import db, User, CommunityPost, Comment, Like
+
+# 커뮤니티 응답 직렬화. 연관 행은 행마다 조회하지 않고 IN 조회/조인 한 번으로 필요한 컬럼만 가져오므로,
+# 각 엔드포인트의 쿼리 수는 결과 크기와 관계없이 일정합니다.
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def usernames_by_id(user_ids: Iterable[int]) -> Dict[int, str]:
+    ids = {user_id for user_id in user_ids if user_id is not None}
+    if not ids:
+        return {}
+    return dict(db.session.query(User.id, User.username).filter(User.id.in_(ids)).all())
+
+
+def serialize_posts(posts: List[CommunityPost]) -> List[Dict]:
+    usernames = usernames_by_id(post.user_id for post in posts)
+    return [{
+        'id': post.post_id,
+        'user_id': post.user_id,
+        'username': usernames.get(post.user_id),
+        'description': post.description,
+        'image': post.image_path,
+        'created_at': _isoformat(post.created_at),
+        'hashtags': post.hashtag.split(',') if post.hashtag else [],
+        'like_count': post.like_count,
+        'comment_count': post.comment_count
+    } for post in posts]
+
+
+def post_comments(post_id: int) -> List[Dict]:
+    rows = db.session.query(
+        Comment.comment_id, Comment.user_id, User.username, Comment.content, Comment.created_at
+    ).outerjoin(User, User.id == Comment.user_id).filter(
+        Comment.post_id == post_id
+    ).order_by(Comment.created_at.asc()).all()
+    return [{
+        'id': row.comment_id,
+        'user_id': row.user_id,
+        'username': row.username,
+        'content': row.content,
+        'created_at': _isoformat(row.created_at)
+    } for row in rows]
+
+
+def user_comments(user_id: int) -> List[Dict]:
+    rows = db.session.query(
+        Comment.comment_id, Comment.post_id, CommunityPost.description, Comment.content, Comment.created_at
+    ).outerjoin(CommunityPost, CommunityPost.post_id == Comment.post_id).filter(
+        Comment.user_id == user_id
+    ).order_by(Comment.created_at.desc()).all()
+    return [{
+        'comment_id': row.comment_id,
+        'post_id': row.post_id,
+        'post_description': row.description or '',
+        'content': row.content,
+        'created_at': _isoformat(row.created_at)
+    } for row in rows]
+
+
+def like_details(user_id: int) -> List[Dict]:
+    """user_id 가 올린 게시글에 달린 좋아요와 누른 사용자 정보."""
+    rows = db.session.query(
+        User.id, User.username, CommunityPost.post_id, CommunityPost.image_path
+    ).select_from(Like).join(CommunityPost, CommunityPost.post_id == Like.post_id).outerjoin(
+        User, User.id == Like.user_id
+    ).filter(CommunityPost.user_id == user_id).all()
+    return [{
+        'liker_id': row.id,
+        'liker_username': row.username,
+        'liker_profile_image': None,  # 프로필 이미지 필드가 있다면 넣기
+        'post_id': row.post_id,
+        'post_image': row.image_path
+    } for row in rows]
@@ -0,0 +1,144 @@
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import delete, event, insert, select
+import logging
+import time
+import os
+from app.models.models import db, DailyRecommendation, PreferredStyle, Wardrobe, WardrobeItem
+from .embedding_codec import decode_embedding
+from .ranking import stack_embeddings, top_k
+from .style_vocabulary import preference_cache
+from .temperature import (item_temperature_range, temperature_bucket, temperature_buckets, bucket_temperature,
+                          TEMPERATURE_TOLERANCE)
+from .wardrobe_cache import wardrobe_cache
+
+PRECOMPUTE_TOP_N = int(os.environ.get('RECOMMENDATION_PRECOMPUTE_TOP_N', 20))
+PRECOMPUTE_MAX_AGE_SECONDS = float(os.environ.get('RECOMMENDATION_PRECOMPUTE_MAX_AGE', 24 * 3600))
+
+
+def active_user_ids() -> List[int]:
+    """임베딩된 옷장 아이템이 있는 사용자 목록."""
+    rows = db.session.query(Wardrobe.user_id).join(WardrobeItem).filter(
+        Wardrobe.user_id.isnot(None),
+        WardrobeItem.combined_embedding.isnot(None),
+    ).distinct().order_by(Wardrobe.user_id).all()
+    return [user_id for (user_id,) in rows]
+
+
+def _rank_batch(user_ids: List[int], top_n: int) -> List[Dict]:
+    """사용자 배치의 옷장을 한 번에 로드해 모든 기온 구간의 순위를 계산합니다."""
+    rows = db.session.query(
+        Wardrobe.user_id, WardrobeItem.item_id, WardrobeItem.category, WardrobeItem.min_temp,
+        WardrobeItem.max_temp, WardrobeItem.combined_embedding
+    ).join(Wardrobe).filter(Wardrobe.user_id.in_(user_ids)).order_by(Wardrobe.user_id, WardrobeItem.item_id).all()
+    if not rows:
+        return []
+    owners = np.array([row.user_id for row in rows], dtype=np.int64)
+    item_ids = np.array([row.item_id for row in rows], dtype=np.int32)
+    matrix, valid = stack_embeddings([decode_embedding(row.combined_embedding) for row in rows])
+    ranges = np.array([item_temperature_range(row) for row in rows], dtype=np.float32)
+
+    # 사용자별 선호 벡터를 아이템 행에 맞춰 펼친 뒤 행 단위 내적으로 배치 전체 점수를 한 번에 계산합니다.
+    batch_users = list(dict.fromkeys(owners.tolist()))
+    preferences = np.stack([preference_cache.get(user_id) for user_id in batch_users]).astype(np.float32)
+    owner_index = np.searchsorted(np.array(batch_users), owners)
+    scores = np.einsum('md,md->m', matrix, preferences[owner_index])
+
+    # (구간 수, 아이템 수) 기온 마스크
+    buckets = list(temperature_buckets())
+    temps = np.array([bucket_temperature(b) for b in buckets], dtype=np.float32)[:, None]
+    masks = (ranges[:, 0] - TEMPERATURE_TOLERANCE <= temps) & (temps <= ranges[:, 1] + TEMPERATURE_TOLERANCE)
+    masks &= valid
+
+    now = datetime.utcnow()
+    results = []
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    ends = np.r_[starts[1:], owners.size]
+    for start, end in zip(starts, ends):
+        user_scores = scores[start:end]
+        for bucket, mask in zip(buckets, masks[:, start:end]):
+            indices, ranked = top_k(user_scores, top_n, mask)
+            results.append({
+                'user_id': int(owners[start]),
+                'temp_bucket': bucket,
+                'item_ids': item_ids[start:end][indices].astype('<i4').tobytes(),
+                'scores': ranked.astype('<f2').tobytes(),
+                'depth': top_n,
+                'computed_at': now,
+            })
+    return results
+
+
+def precompute_recommendations(user_ids: Optional[Iterable[int]] = None, batch_size: int = 256,
+                               top_n: int = PRECOMPUTE_TOP_N,
+                               report: Callable[[str], None] = logging.info) -> Dict:
+    """활성 사용자의 모든 기온 구간별 추천 순위를 계산해 daily_recommendation 에 저장합니다."""
+    user_ids = sorted(set(user_ids)) if user_ids is not None else active_user_ids()
+    started = time.perf_counter()
+    stored = 0
+    for offset in range(0, len(user_ids), batch_size):
+        batch = user_ids[offset:offset + batch_size]
+        rows = _rank_batch(batch, top_n)
+        db.session.execute(delete(DailyRecommendation).where(DailyRecommendation.user_id.in_(batch)))
+        if rows:
+            db.session.execute(insert(DailyRecommendation), rows)
+        db.session.commit()
+        stored += len(rows)
+        report(f"{min(offset + batch_size, len(user_ids))}/{len(user_ids)}명 처리, {stored}개 순위 저장")
+    elapsed = time.perf_counter() - started
+    return {'users': len(user_ids), 'rows': stored, 'seconds': elapsed}
+
+
+def load_precomputed(user_id: int, temperature: float, top_n: int,
+                     max_age_seconds: float = PRECOMPUTE_MAX_AGE_SECONDS) -> Optional[List[Dict]]:
+    """신선한 사전 계산 결과가 있으면 recommend_styles 와 같은 형식으로 반환하고, 없으면 None."""
+    row = DailyRecommendation.query.get((int(user_id), temperature_bucket(temperature)))
+    if row is None or row.depth < top_n or row.computed_at is None:
+        return None
+    if datetime.utcnow() - row.computed_at > timedelta(seconds=max_age_seconds):
+        return None
+    item_ids = np.frombuffer(row.item_ids, dtype='<i4')[:top_n].tolist()
+    scores = np.frombuffer(row.scores, dtype='<f2')[:top_n].astype(np.float32).tolist()
+    if not item_ids:
+        return []
+
+    # 옷장 스냅샷이 캐시되어 있으면 재사용하고, 아니면 필요한 아이템만 조회합니다.
+    snapshot = wardrobe_cache.peek(user_id)
+    if snapshot is not None:
+        records = {r['id']: r for r in snapshot.records}
+        items = {item_id: (records[item_id]['image_path'], records[item_id]['metadata'],
+                           records[item_id]['temperature_range'])
+                 for item_id in item_ids if item_id in records}
+    else:
+        rows = db.session.query(
+            WardrobeItem.item_id, WardrobeItem.image_path, WardrobeItem.name,
+            WardrobeItem.category, WardrobeItem.color, WardrobeItem.brand,
+            WardrobeItem.min_temp, WardrobeItem.max_temp,
+        ).filter(WardrobeItem.item_id.in_(item_ids)).all()
+        items = {r.item_id: (r.image_path, {'name': r.name, 'category': r.category, 'color': r.color,
+                                             'brand': r.brand}, item_temperature_range(r)) for r in rows}
+    if len(items) != len(item_ids):
+        # 삭제된 아이템이 섞여 있으면 실시간 계산으로 넘깁니다.
+        return None
+    return [{
+        'item_id': item_id,
+        'image_path': items[item_id][0],
+        'metadata': items[item_id][1],
+        'temperature_range': items[item_id][2],
+        'similarity_score': score,
+    } for item_id, score in zip(item_ids, scores)]
+
+
+@event.listens_for(WardrobeItem, 'after_insert')
+@event.listens_for(WardrobeItem, 'after_update')
+@event.listens_for(WardrobeItem, 'after_delete')
+def _invalidate_wardrobe_owner(mapper, connection, target):
+    owner = select(Wardrobe.user_id).where(Wardrobe.wardrobe_id == target.wardrobe_id).scalar_subquery()
+    connection.execute(delete(DailyRecommendation.__table__).where(DailyRecommendation.user_id == owner))
+
+
+@event.listens_for(PreferredStyle, 'after_insert')
+@event.listens_for(PreferredStyle, 'after_delete')
+def _invalidate_preference_owner(mapper, connection, target):
+    connection.execute(delete(DailyRecommendation.__table__).where(DailyRecommendation.user_id == target.user_id))
@@ -0,0 +1,216 @@
+import torch
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import or_, update
+import logging
+import json
+import time
+import os
+from app.models.models import db, DailyRecommendation, Wardrobe, WardrobeItem
+from .clip_registry import CLIP_MODEL_NAME, EMBEDDING_MODEL_VERSION
+from .embedding_codec import encode_embedding
+from .image_pipeline import load_pixels, parse_bbox
+from .inference_batcher import forward_images, forward_texts
+from .ranking import normalize_rows
+from .recommendation_service import item_description
+from .result_cache import result_cache
+from .upload_jobs import UploadJobRunner
+from .wardrobe_cache import wardrobe_cache
+
+_worker_processor = None
+
+
+def _init_worker(model_name: str):
+    # 각 프로세스는 전처리에 필요한 CLIPProcessor 만 로드합니다 (모델 가중치는 로드하지 않음).
+    global _worker_processor
+    from transformers import CLIPProcessor
+    torch.set_num_threads(1)
+    _worker_processor = CLIPProcessor.from_pretrained(model_name)
+
+
+def _preprocess(job: Tuple[int, str, Optional[str]]) -> Tuple[int, Optional[np.ndarray], Optional[str]]:
+    """이미지 (업로드 때 임베딩한 검출 영역) 를 (3, 224, 224) float32 배열로 전처리합니다.
+    전처리 캐시가 있으면 디코드를 생략합니다."""
+    item_id, path, crop_bbox = job
+    try:
+        pixels = load_pixels(path, processor=_worker_processor, bbox=parse_bbox(crop_bbox))
+        return item_id, np.asarray(pixels, dtype=np.float32), None
+    except Exception as e:
+        return item_id, None, str(e)
+
+
+class BackfillCheckpoint:
+    """재시작 시 이어서 진행할 수 있도록 마지막으로 처리한 item_id 를 파일에 기록합니다."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.model_version = EMBEDDING_MODEL_VERSION
+        self.last_item_id = 0
+        self.processed = 0
+        self.failed: List[int] = []
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path) as f:
+            data = json.load(f)
+        self.model_version = data.get('model_version')
+        self.last_item_id = data.get('last_item_id', 0)
+        self.processed = data.get('processed', 0)
+        self.failed = data.get('failed', [])
+        return self.ensure_model_version()
+
+    def ensure_model_version(self):
+        """다른 모델 버전으로 진행하던 체크포인트면 처음부터 다시 진행합니다.
+
+        그 버전에서 지나간 item_id 들도 현재 모델로는 모두 구버전이므로 last_item_id 와 실패 목록을 비웁니다.
+        """
+        if self.model_version != EMBEDDING_MODEL_VERSION:
+            if self.last_item_id:
+                logging.info(f"모델 버전이 바뀌어 ({self.model_version} -> {EMBEDDING_MODEL_VERSION}) 처음부터 다시 진행합니다.")
+            self.model_version = EMBEDDING_MODEL_VERSION
+            self.last_item_id = 0
+            self.processed = 0
+            self.failed = []
+        return self
+
+    def save(self):
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'model_version': EMBEDDING_MODEL_VERSION,
+                'last_item_id': self.last_item_id,
+                'processed': self.processed,
+                'failed': self.failed,
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def reset(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.model_version = EMBEDDING_MODEL_VERSION
+        self.last_item_id = 0
+        self.processed = 0
+        self.failed = []
+
+
+def stale_items_query(after_id: int = 0, item_ids: Optional[List[int]] = None):
+    """임베딩이 없거나 현재 모델 버전이 아닌 아이템을 item_id 순으로 조회합니다. item_ids 를 주면 그 중에서만 찾습니다."""
+    query = db.session.query(
+        WardrobeItem.item_id, WardrobeItem.wardrobe_id, WardrobeItem.image_path, WardrobeItem.name,
+        WardrobeItem.category, WardrobeItem.color, WardrobeItem.brand, WardrobeItem.crop_bbox,
+    ).filter(
+        WardrobeItem.item_id > after_id,
+        or_(
+            WardrobeItem.combined_embedding.is_(None),
+            WardrobeItem.embedding_model.is_(None),
+            WardrobeItem.embedding_model != EMBEDDING_MODEL_VERSION,
+        )
+    )
+    if item_ids is not None:
+        query = query.filter(WardrobeItem.item_id.in_(item_ids))
+    return query.order_by(WardrobeItem.item_id)
+
+
+def _embed_rows(pool, rows, workers: int) -> Tuple[List[int], List[int]]:
+    """한 배치의 이미지를 전처리/임베딩해 bulk UPDATE 로 기록하고 (성공 id, 실패 id) 를 반환합니다."""
+    meta = {row.item_id: row for row in rows}
+    jobs = [(row.item_id, UploadJobRunner.local_image_path(row.image_path), row.crop_bbox) for row in rows]
+    decoded = list(pool.map(_preprocess, jobs, chunksize=max(1, len(jobs) // (workers * 2))))
+
+    ok = [(item_id, pixels) for item_id, pixels, _ in decoded if pixels is not None]
+    failed = []
+    for item_id, _, error in decoded:
+        if error is not None:
+            logging.warning(f"임베딩 백필 실패 (item {item_id}): {error}")
+            failed.append(item_id)
+
+    ids = [item_id for item_id, _ in ok]
+    if ok:
+        image_vecs = normalize_rows(forward_images(torch.from_numpy(np.stack([p for _, p in ok]))))
+        texts = [item_description(meta[i].name, meta[i].category, meta[i].color, meta[i].brand) for i in ids]
+        text_vecs = normalize_rows(forward_texts(texts))
+        combined_vecs = normalize_rows(image_vecs + text_vecs)
+        owners = wardrobe_owners({meta[i].wardrobe_id for i in ids})
+        db.session.execute(update(WardrobeItem), [{
+            'item_id': item_id,
+            'image_embedding': encode_embedding(image_vecs[i]),
+            'text_embedding': encode_embedding(text_vecs[i]),
+            'combined_embedding': encode_embedding(combined_vecs[i]),
+            'embedding_model': EMBEDDING_MODEL_VERSION,
+        } for i, item_id in enumerate(ids)])
+        # bulk UPDATE 는 매퍼 이벤트를 발생시키지 않으므로 WardrobeItem 리스너가 하던 무효화를 직접 합니다.
+        DailyRecommendation.query.filter(DailyRecommendation.user_id.in_(owners)).delete(synchronize_session=False)
+        db.session.commit()
+        invalidate_wardrobes(owners)
+    return ids, failed
+
+
+def wardrobe_owners(wardrobe_ids) -> List[int]:
+    wardrobe_ids = [w for w in wardrobe_ids if w is not None]
+    if not wardrobe_ids:
+        return []
+    return [user_id for (user_id,) in db.session.query(Wardrobe.user_id).filter(
+        Wardrobe.wardrobe_id.in_(wardrobe_ids), Wardrobe.user_id.isnot(None)
+    ).distinct()]
+
+
+def invalidate_wardrobes(user_ids: List[int]):
+    """커밋된 bulk 쓰기 후 사용자의 추천 결과 캐시 버전을 올리고 옷장 스냅샷을 버립니다."""
+    for user_id in user_ids:
+        result_cache.bump_wardrobe(user_id)
+        wardrobe_cache.invalidate(user_id)
+
+
+def run_backfill(checkpoint: BackfillCheckpoint, batch_size: int = 64, workers: Optional[int] = None,
+                 limit: Optional[int] = None, report: Callable[[str], None] = logging.info) -> Dict:
+    """누락/구버전 임베딩을 배치로 다시 계산해 bulk UPDATE 로 기록합니다.
+
+    item_id 순으로 한 번 훑은 뒤, 이전 실행을 포함해 실패했던 아이템을 한 번 더 시도합니다.
+    다시 실패한 아이템만 체크포인트의 실패 목록에 남습니다.
+    """
+    workers = workers or os.cpu_count() or 1
+    checkpoint.ensure_model_version()
+    started = time.perf_counter()
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(CLIP_MODEL_NAME,)) as pool:
+        while limit is None or done < limit:
+            size = batch_size if limit is None else min(batch_size, limit - done)
+            rows = stale_items_query(checkpoint.last_item_id).limit(size).all()
+            if not rows:
+                break
+            ids, failed = _embed_rows(pool, rows, workers)
+            checkpoint.failed.extend(i for i in failed if i not in checkpoint.failed)
+
+            done += len(rows)
+            checkpoint.processed += len(ids)
+            checkpoint.last_item_id = rows[-1].item_id
+            checkpoint.save()
+            elapsed = time.perf_counter() - started
+            report(f"{done}개 처리 (마지막 item {checkpoint.last_item_id}), {done / elapsed:.1f} items/s")
+
+        # 커서는 지나간 id 를 다시 보지 않으므로 실패한 아이템은 따로 한 번 더 시도합니다.
+        # 그 사이 삭제되었거나 다른 경로로 임베딩된 아이템은 조회되지 않아 목록에서 빠집니다.
+        retry_ids = list(checkpoint.failed)
+        still_failed = []
+        for start in range(0, len(retry_ids), batch_size):
+            rows = stale_items_query(item_ids=retry_ids[start:start + batch_size]).all()
+            if rows:
+                ids, failed = _embed_rows(pool, rows, workers)
+                checkpoint.processed += len(ids)
+                still_failed.extend(failed)
+        if retry_ids:
+            report(f"실패했던 {len(retry_ids)}개 재시도: {len(retry_ids) - len(still_failed)}개 해결")
+            checkpoint.failed = still_failed
+            checkpoint.save()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'scanned': done,
+        'processed': checkpoint.processed,
+        'failed': len(checkpoint.failed),
+        'seconds': elapsed,
+        'items_per_second': done / elapsed if elapsed > 0 else 0.0,
+    }
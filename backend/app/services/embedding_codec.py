@@ -0,0 +1,39 @@
+import numpy as np
+from typing import Optional
+import struct
+import os
+
+# 블롭 형식: magic(2) + dtype 코드(1) + 차원(uint16) + 원시 벡터 바이트 (little-endian)
+_MAGIC = b'EM'
+_HEADER = struct.Struct('<2sBH')
+_DTYPES = {0: np.dtype('<f4'), 1: np.dtype('<f2')}
+_DTYPE_CODES = {np.dtype('<f4'): 0, np.dtype('<f2'): 1}
+
+STORAGE_DTYPE = np.dtype('<f2') if os.environ.get('EMBEDDING_STORAGE_DTYPE', 'float16') == 'float16' else np.dtype('<f4')
+
+
+def l2_normalize(vec: np.ndarray) -> np.ndarray:
+    """벡터를 L2 정규화합니다. 영벡터는 그대로 반환합니다."""
+    vec = np.asarray(vec, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vec)
+    if norm == 0:
+        return vec
+    return vec / norm
+
+
+def encode_embedding(vec: np.ndarray, dtype: np.dtype = STORAGE_DTYPE) -> bytes:
+    """임베딩 벡터를 DB 저장용 바이너리 블롭으로 인코딩합니다."""
+    dtype = np.dtype(dtype).newbyteorder('<')
+    arr = np.asarray(vec).reshape(-1).astype(dtype)
+    return _HEADER.pack(_MAGIC, _DTYPE_CODES[dtype], arr.shape[0]) + arr.tobytes()
+
+
+def decode_embedding(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    """encode_embedding 으로 저장된 블롭을 float32 벡터로 복원합니다."""
+    if not blob:
+        return None
+    magic, dtype_code, dim = _HEADER.unpack_from(blob)
+    if magic != _MAGIC or dtype_code not in _DTYPES:
+        raise ValueError('알 수 없는 임베딩 형식입니다.')
+    arr = np.frombuffer(blob, dtype=_DTYPES[dtype_code], count=dim, offset=_HEADER.size)
+    return arr.astype(np.float32)
@@ -0,0 +1,253 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+import heapq
+import threading
+import time
+import os
+from app.models.models import db, Hashtag, HashtagUsage, PostHashtag
+
+MAX_TAG_LENGTH = 50
+# 사용 횟수는 이 길이(초)의 시간 창 단위로 집계합니다.
+HASHTAG_WINDOW_SECONDS = int(os.environ.get('HASHTAG_WINDOW_SECONDS', 3600))
+# 트렌딩 점수는 시간 창마다 반감기에 따라 감쇠시켜 합산합니다.
+TRENDING_HALF_LIFE = float(os.environ.get('HASHTAG_TRENDING_HALF_LIFE', 6 * 3600))
+TRENDING_HORIZON = float(os.environ.get('HASHTAG_TRENDING_HORIZON', 7 * 24 * 3600))
+TRENDING_CACHE_TTL = float(os.environ.get('HASHTAG_TRENDING_CACHE_TTL', 60))
+AUTOCOMPLETE_TTL = float(os.environ.get('HASHTAG_AUTOCOMPLETE_TTL', 300))
+
+
+def normalize_tag(tag: str) -> str:
+    return tag.strip().lstrip('#').lower()[:MAX_TAG_LENGTH]
+
+
+def post_tags(hashtag: Optional[str]) -> List[str]:
+    """CommunityPost.hashtag (쉼표 구분) 를 정규화된 태그 목록으로 바꿉니다."""
+    if not hashtag:
+        return []
+    return list(dict.fromkeys(tag for tag in (normalize_tag(t) for t in hashtag.split(',')) if tag))
+
+
+def window_start(at: Optional[float] = None) -> datetime:
+    at = time.time() if at is None else at
+    return datetime.utcfromtimestamp(int(at) // HASHTAG_WINDOW_SECONDS * HASHTAG_WINDOW_SECONDS)
+
+
+def hashtag_ids(connection, tags: List[str]) -> Dict[str, int]:
+    """태그 -> hashtag_id. 없는 태그는 한 번의 INSERT 로 만들고, 동시에 만들어진 중복은 무시합니다."""
+    if not tags:
+        return {}
+    table = Hashtag.__table__
+    ids = dict(connection.execute(select(table.c.tag_text, table.c.hashtag_id).where(table.c.tag_text.in_(tags))).all())
+    missing = [tag for tag in tags if tag not in ids]
+    if missing:
+        connection.execute(insert(table).prefix_with('IGNORE', dialect='mysql').prefix_with('OR IGNORE', dialect='sqlite'),
+                           [{'tag_text': tag} for tag in missing])
+        ids.update(connection.execute(
+            select(table.c.tag_text, table.c.hashtag_id).where(table.c.tag_text.in_(missing))).all())
+    return ids
+
+
+def bump_usage(connection, deltas: Dict[Tuple[int, datetime], int]):
+    """(hashtag_id, 시간 창) 별 사용 횟수 변화를 한 번의 upsert 로 더합니다."""
+    rows = [{'hashtag_id': hashtag_id, 'window_start': window, 'use_count': delta}
+            for (hashtag_id, window), delta in deltas.items() if delta]
+    if not rows:
+        return
+    table = HashtagUsage.__table__
+    if connection.dialect.name == 'mysql':
+        stmt = mysql_insert(table)
+        connection.execute(stmt.on_duplicate_key_update(use_count=table.c.use_count + stmt.inserted.use_count), rows)
+    elif connection.dialect.name == 'sqlite':
+        stmt = sqlite_insert(table)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=['hashtag_id', 'window_start'],
+            set_={'use_count': table.c.use_count + stmt.excluded.use_count}), rows)
+    else:
+        for row in rows:
+            updated = connection.execute(update(table).where(
+                table.c.hashtag_id == row['hashtag_id'], table.c.window_start == row['window_start']
+            ).values(use_count=table.c.use_count + row['use_count']))
+            if not updated.rowcount:
+                connection.execute(insert(table), [row])
+
+
+def uncount_links(connection, links: Iterable[Tuple[int, Optional[datetime]]]):
+    """지워진 연결의 사용 횟수를 처음 더했던 시간 창에서 뺍니다.
+
+    집계되지 않은 연결 (counted_window 가 NULL) 과 TRENDING_HORIZON 보다 오래된 창은 트렌딩에
+    영향이 없으므로 건너뜁니다.
+    """
+    horizon = window_start(time.time() - TRENDING_HORIZON)
+    deltas = Counter()
+    for hashtag_id, window in links:
+        if window is not None and window >= horizon:
+            deltas[(hashtag_id, window)] -= 1
+    bump_usage(connection, deltas)
+
+
+def sync_post_hashtags(connection, post_id: int, tags: List[str],
+                       count_usage: bool = True) -> Tuple[List[str], List[str]]:
+    """게시글의 해시태그 연결을 tags 로 맞춥니다. 바뀐 태그만 한 번씩 bulk 로 지우고/넣습니다.
+
+    (추가된 태그, 제거된 태그) 를 반환합니다. count_usage 이면 추가된 태그를 현재 시간 창에 +1 하고
+    그 창을 연결에 기록해 두며, 제거된 태그는 기록된 창에서 -1 합니다.
+    """
+    table = PostHashtag.__table__
+    current = {row.tag_text: row for row in connection.execute(
+        select(Hashtag.tag_text, table.c.hashtag_id, table.c.counted_window)
+        .join(Hashtag, Hashtag.hashtag_id == table.c.hashtag_id).where(table.c.post_id == post_id))}
+    removed = [tag for tag in current if tag not in tags]
+    added = [tag for tag in tags if tag not in current]
+    if removed:
+        connection.execute(delete(table).where(
+            table.c.post_id == post_id, table.c.hashtag_id.in_([current[tag].hashtag_id for tag in removed])))
+        uncount_links(connection, [(current[tag].hashtag_id, current[tag].counted_window) for tag in removed])
+    added_ids = hashtag_ids(connection, added)
+    if added_ids:
+        window = window_start() if count_usage else None
+        connection.execute(insert(table), [
+            {'post_id': post_id, 'hashtag_id': hashtag_id, 'counted_window': window}
+            for hashtag_id in added_ids.values()
+        ])
+        if count_usage:
+            bump_usage(connection, {(hashtag_id, window): 1 for hashtag_id in added_ids.values()})
+    return added, removed
+
+
+def remove_post_hashtags(connection, post_id: int):
+    """삭제되는 게시글에 남은 연결을 지우고 사용 횟수를 되돌립니다.
+
+    ORM cascade 로 먼저 지워진 연결은 PostHashtag after_delete 이벤트에서 되돌립니다.
+    """
+    table = PostHashtag.__table__
+    links = connection.execute(select(table.c.hashtag_id, table.c.counted_window)
+                               .where(table.c.post_id == post_id)).all()
+    if links:
+        connection.execute(delete(table).where(table.c.post_id == post_id))
+        uncount_links(connection, links)
+
+
+@event.listens_for(PostHashtag, 'after_delete')
+def _uncount_deleted_link(mapper, connection, target):
+    uncount_links(connection, [(target.hashtag_id, target.counted_window)])
+
+
+# limit -> (결과, 계산 시각)
+_trending_cache: Dict[int, Tuple[List[Dict], float]] = {}
+
+
+def trending(limit: int = 10) -> List[Dict]:
+    """최근 TRENDING_HORIZON 동안의 시간 창별 사용 횟수를 반감기로 감쇠해 합산한 상위 태그."""
+    now = time.time()
+    cached = _trending_cache.get(limit)
+    if cached is not None and now - cached[1] <= TRENDING_CACHE_TTL:
+        return cached[0]
+    rows = db.session.query(HashtagUsage.hashtag_id, HashtagUsage.window_start, HashtagUsage.use_count).filter(
+        HashtagUsage.window_start >= datetime.utcfromtimestamp(now - TRENDING_HORIZON)).all()
+    scores = Counter()
+    uses = Counter()
+    epoch = datetime(1970, 1, 1)
+    for hashtag_id, started, count in rows:
+        # 창이 끝난 시점부터 감쇠하므로 현재 창은 가중치 1 입니다.
+        age = max(now - ((started - epoch).total_seconds() + HASHTAG_WINDOW_SECONDS), 0)
+        scores[hashtag_id] += count * 0.5 ** (age / TRENDING_HALF_LIFE)
+        uses[hashtag_id] += count
+    top = heapq.nlargest(limit, ((score, hashtag_id) for hashtag_id, score in scores.items() if score > 0))
+    names = dict(db.session.query(Hashtag.hashtag_id, Hashtag.tag_text).filter(
+        Hashtag.hashtag_id.in_([hashtag_id for _, hashtag_id in top])).all()) if top else {}
+    result = [{'tag': names[hashtag_id], 'score': round(score, 3), 'uses': uses[hashtag_id]}
+              for score, hashtag_id in top if hashtag_id in names]
+    _trending_cache[limit] = (result, now)
+    return result
+
+
+class HashtagAutocomplete:
+    """해시태그 접두어 자동완성.
+
+    태그를 정렬된 배열로 보관하고 bisect 로 접두어 범위를 찾아, 게시글 수가 많은 순으로 반환합니다.
+    커밋된 태그 변경은 배열에 바로 반영하고, 다른 프로세스의 변경은 AUTOCOMPLETE_TTL 마다 전체 재구성으로 반영합니다.
+    """
+
+    def __init__(self, ttl_seconds: float = AUTOCOMPLETE_TTL):
+        self.ttl_seconds = ttl_seconds
+        self._tags: List[str] = []
+        self._counts: Dict[str, int] = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.updates = 0
+
+    def _ensure_loaded(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at <= self.ttl_seconds:
+            return
+        rows = db.session.query(Hashtag.tag_text, func.count(PostHashtag.post_id)).outerjoin(
+            PostHashtag, PostHashtag.hashtag_id == Hashtag.hashtag_id).group_by(Hashtag.hashtag_id, Hashtag.tag_text).all()
+        counts = {tag: count for tag, count in rows if count > 0}
+        with self._lock:
+            self._counts = counts
+            self._tags = sorted(counts)
+            self._loaded_at = time.monotonic()
+            self.rebuilds += 1
+
+    def apply(self, deltas: Dict[str, int]):
+        """커밋된 태그별 게시글 수 변화를 반영합니다. 아직 로드되지 않았으면 무시합니다."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for tag, delta in deltas.items():
+                count = self._counts.get(tag, 0) + delta
+                if count > 0:
+                    if tag not in self._counts:
+                        insort(self._tags, tag)
+                    self._counts[tag] = count
+                elif tag in self._counts:
+                    del self._counts[tag]
+                    self._tags.pop(bisect_left(self._tags, tag))
+            self.updates += 1
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict]:
+        self._ensure_loaded()
+        prefix = normalize_tag(prefix)
+        with self._lock:
+            lo = bisect_left(self._tags, prefix)
+            hi = bisect_left(self._tags, prefix + '\U0010ffff')
+            top = heapq.nsmallest(limit, self._tags[lo:hi], key=lambda tag: (-self._counts[tag], tag))
+            return [{'tag': tag, 'posts': self._counts[tag]} for tag in top]
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'tags': len(self._tags), 'rebuilds': self.rebuilds, 'updates': self.updates,
+                    'ttl_seconds': self.ttl_seconds}
+
+
+# 프로세스 단위 해시태그 자동완성
+hashtag_autocomplete = HashtagAutocomplete()
+
+
+def mark_tags_changed(session, added: Iterable[str], removed: Iterable[str]):
+    """자동완성에 반영할 태그 변화를 기록합니다. 커밋된 뒤에 반영됩니다."""
+    pending = session.info.setdefault('hashtag_deltas', Counter())
+    pending.update({tag: 1 for tag in added})
+    pending.subtract({tag: 1 for tag in removed})
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_tag_changes(session):
+    deltas = session.info.pop('hashtag_deltas', None)
+    if deltas:
+        hashtag_autocomplete.apply(deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_tag_changes(session):
+    session.info.pop('hashtag_deltas', None)
@@ -0,0 +1,117 @@
+import torch
+from PIL import Image, ImageOps
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+import hashlib
+import logging
+import os
+from .clip_registry import clip_registry, CLIP_MODEL_NAME
+
+UPLOAD_MAX_SIDE = int(os.environ.get('UPLOAD_MAX_SIDE', 1600))
+UPLOAD_JPEG_QUALITY = int(os.environ.get('UPLOAD_JPEG_QUALITY', 90))
+PIXEL_CACHE_DIR = os.environ.get('CLIP_PIXEL_CACHE_DIR', os.path.join('uploads', '.clip_pixels'))
+
+
+def normalize_upload(file_storage, dest_path: str, max_side: int = UPLOAD_MAX_SIDE) -> str:
+    """업로드 이미지를 EXIF 방향 보정, RGB 변환, 최대 변 길이 제한 후 JPEG 로 저장합니다.
+
+    확장자는 .jpg 로 바뀌며, 실제로 저장된 경로를 반환합니다.
+    """
+    with Image.open(file_storage.stream) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGB')
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        dest_path = os.path.splitext(dest_path)[0] + '.jpg'
+        os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+        image.save(dest_path, 'JPEG', quality=UPLOAD_JPEG_QUALITY, optimize=True)
+    return dest_path
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+BBox = Tuple[int, int, int, int]
+
+
+def format_bbox(bbox: Optional[Sequence[int]]) -> Optional[str]:
+    """검출 영역 [x1, y1, x2, y2] 를 WardrobeItem.crop_bbox 에 저장하는 "x1,y1,x2,y2" 문자열로 바꿉니다."""
+    return ','.join(str(int(v)) for v in bbox) if bbox else None
+
+
+def parse_bbox(value: Optional[str]) -> Optional[BBox]:
+    if not value:
+        return None
+    x1, y1, x2, y2 = (int(v) for v in value.split(','))
+    return x1, y1, x2, y2
+
+
+def _cache_path(digest: str, cache_dir: str, bbox: Optional[Sequence[int]] = None) -> str:
+    # 전처리 설정은 모델마다 다르므로 모델 이름도 키에 포함합니다.
+    # 검출 영역 crop 은 같은 이미지라도 입력이 다르므로 (이미지, bbox) 를 키로 따로 저장합니다.
+    model_key = CLIP_MODEL_NAME.replace('/', '__')
+    name = digest if bbox is None else f"{digest}_{format_bbox(bbox).replace(',', '_')}"
+    return os.path.join(cache_dir, model_key, digest[:2], f'{name}.npy')
+
+
+def _read_cached(cached: str) -> Optional[np.ndarray]:
+    if not os.path.exists(cached):
+        return None
+    try:
+        return np.load(cached, mmap_mode='r')
+    except (OSError, ValueError) as e:
+        logging.warning(f"전처리 캐시 손상, 다시 생성합니다: {cached} ({e})")
+        return None
+
+
+def _preprocess(image: Image.Image, processor, cached: Optional[str]) -> np.ndarray:
+    pixels = processor(images=image.convert('RGB'), return_tensors='np')['pixel_values'][0].astype(np.float16)
+    if cached:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        tmp_path = f'{cached}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, pixels)
+        os.replace(tmp_path, cached)
+    return pixels
+
+
+def load_pixels(path: str, processor=None, cache_dir: Optional[str] = PIXEL_CACHE_DIR,
+                bbox: Optional[Sequence[int]] = None) -> np.ndarray:
+    """이미지 (bbox 를 주면 그 영역의 crop) 의 CLIP 전처리 결과 (3, 224, 224) 를 반환합니다.
+
+    결과는 (이미지 해시, bbox) 를 키로 float16 .npy 파일에 캐시되며, 이후에는 JPEG 디코드 없이
+    메모리 맵으로 읽습니다. processor 를 주지 않으면 공유 레지스트리의 것을 사용합니다.
+    """
+    cached = _cache_path(file_digest(path), cache_dir, bbox) if cache_dir else None
+    pixels = _read_cached(cached) if cached else None
+    if pixels is not None:
+        return pixels
+    with Image.open(path) as image:
+        region = image.crop(tuple(bbox)) if bbox else image
+        return _preprocess(region, processor or clip_registry.processor, cached)
+
+
+def crop_pixels(path: str, image: Image.Image, bboxes: List[Sequence[int]], processor=None,
+                cache_dir: Optional[str] = PIXEL_CACHE_DIR) -> List[np.ndarray]:
+    """이미 디코드한 image 에서 검출 영역별 전처리 결과를 만들고, load_pixels(path, bbox=...) 와 같은 키로 캐시합니다."""
+    digest = file_digest(path) if cache_dir else None
+    processor = processor or clip_registry.processor
+    results = []
+    for bbox in bboxes:
+        cached = _cache_path(digest, cache_dir, bbox) if digest else None
+        pixels = _read_cached(cached) if cached else None
+        results.append(pixels if pixels is not None else _preprocess(image.crop(tuple(bbox)), processor, cached))
+    return results
+
+
+def pixel_tensor(path: str, bbox: Optional[Sequence[int]] = None) -> torch.Tensor:
+    """캐시된 전처리 결과를 모델 입력 텐서 (1, 3, 224, 224) float32 로 반환합니다."""
+    return as_tensor(load_pixels(path, bbox=bbox))
+
+
+def as_tensor(pixels: np.ndarray) -> torch.Tensor:
+    return torch.from_numpy(np.asarray(pixels, dtype=np.float32))[None]
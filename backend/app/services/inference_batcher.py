@@ -0,0 +1,180 @@
+import torch
+from PIL import Image
+import numpy as np
+from typing import Any, Callable, Dict, List
+from concurrent.futures import Future
+from collections import Counter
+import threading
+import logging
+import queue
+import time
+import os
+from .clip_registry import clip_registry
+
+MAX_BATCH_SIZE = int(os.environ.get('CLIP_BATCH_MAX_SIZE', 16))
+MAX_WAIT_MS = float(os.environ.get('CLIP_BATCH_MAX_WAIT_MS', 5))
+# 호출자가 배치 결과를 기다리는 최대 시간(초). 첫 배치의 모델 로드 시간을 포함할 수 있도록 넉넉히 둡니다.
+RESULT_TIMEOUT = float(os.environ.get('CLIP_BATCH_RESULT_TIMEOUT', 120))
+
+
+class MicroBatcher:
+    """동시에 들어온 추론 요청을 모아 한 번의 forward 로 처리하는 스케줄러.
+
+    첫 요청이 들어온 뒤 max_wait_ms 동안 또는 max_batch_size 개가 찰 때까지
+    요청을 모으고, run_batch 결과를 각 호출자의 Future 에 돌려줍니다.
+    """
+
+    def __init__(self, name: str, run_batch: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS,
+                 result_timeout: float = RESULT_TIMEOUT):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.result_timeout = result_timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._batch_sizes = Counter()
+        self._items = 0
+        self._batches = 0
+        self._busy_seconds = 0.0
+
+    def _ensure_worker(self):
+        # fork 된 워커 프로세스에서는 스레드가 복사되지 않으므로 pid 로 확인합니다.
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._worker, name=f'{self.name}-batcher', daemon=True)
+            self._thread.start()
+
+    def submit(self, payload: Any) -> Future:
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((payload, future))
+        return future
+
+    def __call__(self, payload: Any) -> Any:
+        return self.submit(payload).result(timeout=self.result_timeout)
+
+    def map(self, payloads: List[Any]) -> List[Any]:
+        futures = [self.submit(p) for p in payloads]
+        return [f.result(timeout=self.result_timeout) for f in futures]
+
+    def _collect(self) -> List:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            payloads = [payload for payload, _ in batch]
+            started = time.perf_counter()
+            error = None
+            try:
+                results = self.run_batch(payloads)
+                # 결과 수가 다르면 어느 결과가 어느 요청의 것인지 알 수 없으므로 하나도 돌려주지 않습니다.
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name} 배치 결과 수 불일치: 요청 {len(batch)}개, 결과 {len(results)}개")
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logging.error(f"{self.name} 배치 추론 실패: {e}")
+                error = e
+            finally:
+                # 어떤 경로로 끝나든 결과를 받지 못한 요청이 계속 기다리지 않도록 실패로 처리합니다.
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error or RuntimeError(f"{self.name} 배치 추론이 결과 없이 종료되었습니다"))
+                self._busy_seconds += time.perf_counter() - started
+                self._batches += 1
+                self._items += len(batch)
+                self._batch_sizes[len(batch)] += 1
+
+    def stats(self) -> Dict:
+        return {
+            'name': self.name,
+            'queue_depth': self._queue.qsize(),
+            'batches': self._batches,
+            'items': self._items,
+            'avg_batch_size': self._items / self._batches if self._batches else 0.0,
+            'batch_size_histogram': dict(sorted(self._batch_sizes.items())),
+            'busy_seconds': self._busy_seconds,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+        }
+
+
+def forward_images(pixel_values: torch.Tensor) -> np.ndarray:
+    """(N, 3, 224, 224) 입력을 한 번의 forward 로 (N, 512) 이미지 특징으로 변환합니다."""
+    return clip_registry.backend.image_features(pixel_values)
+
+
+def forward_texts(texts: List[str]) -> np.ndarray:
+    """텍스트 목록을 한 번의 forward 로 (N, 512) 텍스트 특징으로 변환합니다."""
+    inputs = clip_registry.processor(text=texts, return_tensors="pt", padding=True, truncation=True)
+    return clip_registry.backend.text_features(inputs['input_ids'], inputs['attention_mask'])
+
+
+def _run_image_batch(pixel_batches: List[torch.Tensor]) -> List[np.ndarray]:
+    return list(forward_images(torch.cat(pixel_batches, dim=0)))
+
+
+def _run_text_batch(texts: List[str]) -> List[np.ndarray]:
+    return list(forward_texts(texts))
+
+
+image_batcher = MicroBatcher('clip-image', _run_image_batch)
+text_batcher = MicroBatcher('clip-text', _run_text_batch)
+
+
+def preprocess_image(image: Image.Image) -> torch.Tensor:
+    """이미지를 CLIP 입력 텐서 (1, 3, 224, 224) 로 변환합니다. 호출자 스레드에서 실행됩니다."""
+    return clip_registry.processor(images=image.convert('RGB'), return_tensors="pt")['pixel_values']
+
+
+def embed_images(images: List[Image.Image]) -> List[np.ndarray]:
+    """이미지들의 CLIP 임베딩을 배치 스케줄러를 통해 계산합니다."""
+    return image_batcher.map([preprocess_image(image) for image in images])
+
+
+def embed_image(image: Image.Image) -> np.ndarray:
+    return image_batcher(preprocess_image(image))
+
+
+def embed_pixels(pixel_values: torch.Tensor) -> np.ndarray:
+    """이미 전처리된 (1, 3, 224, 224) 입력의 임베딩을 계산합니다."""
+    return image_batcher(pixel_values)
+
+
+def embed_pixel_batch(pixel_values: List[torch.Tensor]) -> List[np.ndarray]:
+    """이미 전처리된 (1, 3, 224, 224) 입력들의 임베딩을 배치 스케줄러를 통해 계산합니다."""
+    return image_batcher.map(list(pixel_values))
+
+
+def embed_texts(texts: List[str]) -> List[np.ndarray]:
+    """텍스트들의 CLIP 임베딩을 배치 스케줄러를 통해 계산합니다."""
+    return text_batcher.map(list(texts))
+
+
+def embed_text(text: str) -> np.ndarray:
+    return text_batcher(text)
+
+
+def batcher_stats() -> List[Dict]:
+    return [image_batcher.stats(), text_batcher.stats()]
@@ -0,0 +1,129 @@
+import numpy as np
+from typing import Dict, List, Optional
+import os
+from .ranking import top_k
+
+OUTFIT_BEAM_WIDTH = int(os.environ.get('OUTFIT_BEAM_WIDTH', 8))
+OUTFIT_SLOT_CANDIDATES = int(os.environ.get('OUTFIT_SLOT_CANDIDATES', 12))
+OUTFIT_COMPATIBILITY_WEIGHT = float(os.environ.get('OUTFIT_COMPATIBILITY_WEIGHT', 0.5))
+
+# 코디 슬롯 (OutfitItem.position 값)
+SLOTS = ('아우터', '상의', '하의', '원피스', '신발')
+# 빔 서치로 채우는 슬롯 순서. 원피스는 한 벌로 상의와 하의 자리를 함께 채웁니다.
+SLOT_PLANS = (('아우터', '상의', '하의', '신발'), ('아우터', '원피스', '신발'))
+# 두 자리를 차지하는 슬롯은 상의+하의 조합과 비교할 수 있도록 점수 증가량을 그만큼 곱합니다.
+SLOT_WEIGHTS = {'원피스': 2.0}
+CATEGORY_SLOTS = {
+    '아우터': '아우터', '패딩': '아우터', '코트': '아우터', '자켓': '아우터',
+    '상의': '상의', '니트': '상의', '맨투맨': '상의', '후드티': '상의', '셔츠': '상의',
+    '티셔츠': '상의', '반팔': '상의', '긴팔': '상의', '민소매': '상의',
+    '하의': '하의', '청바지': '하의', '슬랙스': '하의', '반바지': '하의', '치마': '하의',
+    '원피스': '원피스',
+    '신발': '신발', '운동화': '신발', '구두': '신발', '샌들': '신발',
+}
+
+
+def slot_of(category: Optional[str]) -> Optional[str]:
+    return CATEGORY_SLOTS.get(category or '')
+
+
+class OutfitComposer:
+    """슬롯별 후보를 고르고 스타일 유사도 + 아이템 간 호환도로 코디 조합을 빔 서치합니다.
+
+    호환도는 후보들의 결합 임베딩 코사인 유사도 행렬 (한 번의 matmul) 이며,
+    빔 폭과 슬롯별 후보 수로 탐색량이 옷장 크기와 무관하게 제한됩니다.
+    """
+
+    def __init__(self, beam_width: int = OUTFIT_BEAM_WIDTH, candidates_per_slot: int = OUTFIT_SLOT_CANDIDATES,
+                 compatibility_weight: float = OUTFIT_COMPATIBILITY_WEIGHT):
+        self.beam_width = beam_width
+        self.candidates_per_slot = candidates_per_slot
+        self.compatibility_weight = compatibility_weight
+
+    def slot_candidates(self, snapshot, style_scores: np.ndarray, mask: np.ndarray) -> Dict[str, np.ndarray]:
+        """슬롯별 스타일 점수 상위 후보의 스냅샷 인덱스를 반환합니다. 후보가 없는 슬롯은 제외됩니다."""
+        slots = np.array([slot_of(r['metadata']['category']) or '' for r in snapshot.records])
+        candidates = {}
+        for slot in SLOTS:
+            indices, _ = top_k(style_scores, self.candidates_per_slot, mask & snapshot.valid & (slots == slot))
+            if indices.size:
+                candidates[slot] = indices
+        return candidates
+
+    def compose(self, snapshot, style_vector: np.ndarray, mask: Optional[np.ndarray] = None,
+                n_outfits: int = 1) -> List[Dict]:
+        """점수가 높은 순으로 최대 n_outfits 개의 코디를 반환합니다.
+
+        각 코디는 {'items': [{'slot', 'index'}], 'score', 'style_score', 'compatibility'} 이며
+        index 는 snapshot.records 의 인덱스입니다.
+        """
+        if not len(snapshot):
+            return []
+        query = np.asarray(style_vector, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        style_scores = snapshot.matrix @ query
+        mask = np.ones(len(snapshot), dtype=bool) if mask is None else mask
+        candidates = self.slot_candidates(snapshot, style_scores, mask)
+        if not candidates:
+            return []
+
+        # 모든 후보를 한 풀로 모아 (P, P) 호환도 행렬을 한 번에 계산합니다.
+        pool = np.concatenate(list(candidates.values()))
+        embeddings = snapshot.matrix[pool]
+        compatibility = embeddings @ embeddings.T
+        pool_scores = style_scores[pool]
+
+        segments, offset = {}, 0
+        for slot, indices in candidates.items():
+            segments[slot] = np.arange(offset, offset + indices.size)
+            offset += indices.size
+
+        # 슬롯 계획마다 빔 서치한 뒤 점수순으로 합칩니다. 원피스 계획은 원피스 후보가 있을 때만 사용합니다.
+        results = []
+        for plan in SLOT_PLANS:
+            if any(slot in SLOT_WEIGHTS and slot not in segments for slot in plan):
+                continue
+            steps = [slot for slot in plan if slot in segments]
+            if steps:
+                results.append(self._beam_search([segments[slot] for slot in steps],
+                                                 [SLOT_WEIGHTS.get(slot, 1.0) for slot in steps],
+                                                 pool_scores, compatibility))
+        chosen = np.concatenate([rows for rows, _ in results])
+        beam_scores = np.concatenate([scores for _, scores in results])
+        order = np.argsort(-beam_scores, kind='stable')
+        chosen, beam_scores = chosen[order], beam_scores[order]
+
+        outfits = []
+        for row, score in zip(chosen[:n_outfits], beam_scores[:n_outfits]):
+            members = np.flatnonzero(row)
+            pairs = members.size * (members.size - 1) / 2
+            pair_sum = (compatibility[np.ix_(members, members)].sum() - members.size) / 2
+            outfits.append({
+                'items': [{'slot': slot_of(snapshot.records[pool[m]]['metadata']['category']), 'index': int(pool[m])}
+                          for m in members],
+                'score': float(score),
+                'style_score': float(pool_scores[members].mean()),
+                'compatibility': float(pair_sum / pairs) if pairs else 0.0,
+            })
+        return outfits
+
+    def _beam_search(self, steps: List[np.ndarray], weights: List[float], pool_scores: np.ndarray,
+                     compatibility: np.ndarray):
+        """steps 순서로 슬롯당 한 후보씩 골라 (선택 원-핫 행렬 (B, P), 누적 점수 (B,)) 를 반환합니다."""
+        # 빔 상태: 선택된 후보의 원-핫 행렬 (B, P) 과 누적 점수 (B,)
+        chosen = np.zeros((1, pool_scores.size), dtype=np.float32)
+        beam_scores = np.zeros(1, dtype=np.float32)
+        for segment, weight in zip(steps, weights):
+            # 각 빔 상태에 각 후보를 추가했을 때의 점수 증가량 (B, M)
+            gains = pool_scores[segment][None, :] + self.compatibility_weight * (chosen @ compatibility[:, segment])
+            totals = (beam_scores[:, None] + weight * gains).reshape(-1)
+            best, best_scores = top_k(totals, self.beam_width)
+            beams, picks = np.divmod(best, segment.size)
+            chosen = chosen[beams].copy()
+            chosen[np.arange(best.size), segment[picks]] = 1.0
+            beam_scores = best_scores.astype(np.float32)
+        return chosen, beam_scores
+
+
+# 프로세스 단위 코디 구성기
+outfit_composer = OutfitComposer()
@@ -0,0 +1,71 @@
+from typing import List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import and_, or_
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_values(values: List) -> str:
+    """JSON 으로 직렬화 가능한 값 목록을 클라이언트가 해석하지 않는 불투명 문자열로 만듭니다."""
+    payload = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_values(cursor: str) -> List:
+    """encode_values 의 역변환. 형식이 맞지 않으면 ValueError 를 발생시킵니다."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f'잘못된 커서입니다: {cursor}') from e
+    if not isinstance(values, list):
+        raise ValueError(f'잘못된 커서입니다: {cursor}')
+    return values
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """(created_at, id) 커서를 만듭니다."""
+    return encode_values([created_at.isoformat() if created_at else None, row_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        created_at, row_id = decode_values(cursor)
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'잘못된 커서입니다: {cursor}') from e
+
+
+def page_size(value, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    try:
+        return min(max(int(value), 1), maximum)
+    except (TypeError, ValueError):
+        return default
+
+
+def keyset_page(query, created_column, id_column, cursor: Optional[str], limit: int) -> Tuple[List, Optional[str]]:
+    """(created_at DESC, id DESC) 순서로 cursor 다음의 limit 개와 다음 페이지 커서를 반환합니다.
+
+    OFFSET 없이 마지막 행의 (created_at, id) 보다 작은 행만 읽으므로 테이블이 커져도 응답 시간이 일정합니다.
+    created_at 이 NULL 인 행은 MySQL/SQLite 의 DESC 정렬처럼 마지막에 옵니다.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if created_at is None:
+            query = query.filter(created_column.is_(None), id_column < row_id)
+        else:
+            query = query.filter(or_(
+                created_column < created_at,
+                and_(created_column == created_at, id_column < row_id),
+                created_column.is_(None),
+            ))
+    # 다음 페이지 존재 여부를 알기 위해 한 행 더 읽습니다.
+    rows = query.order_by(created_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_column.key), getattr(last, id_column.key))
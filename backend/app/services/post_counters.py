@@ -0,0 +1,71 @@
+from typing import Callable, Dict
+from sqlalchemy import event, func, or_, select, update
+import logging
+import time
+from app.models.models import db, CommunityPost, Comment, Like
+
+# CommunityPost.like_count / comment_count 는 좋아요/댓글 쓰기와 같은 트랜잭션에서 원자적으로 증감합니다.
+# ORM 을 거치지 않은 쓰기 등으로 어긋난 값은 `flask community reconcile-counts` 로 바로잡습니다.
+
+
+def _increment(connection, post_id, column, delta: int):
+    if post_id is None:
+        return
+    connection.execute(update(CommunityPost.__table__).where(CommunityPost.post_id == post_id)
+                       .values({column: column + delta}))
+
+
+@event.listens_for(Like, 'after_insert')
+def _count_like(mapper, connection, target):
+    _increment(connection, target.post_id, CommunityPost.__table__.c.like_count, 1)
+
+
+@event.listens_for(Like, 'after_delete')
+def _uncount_like(mapper, connection, target):
+    _increment(connection, target.post_id, CommunityPost.__table__.c.like_count, -1)
+
+
+@event.listens_for(Comment, 'after_insert')
+def _count_comment(mapper, connection, target):
+    _increment(connection, target.post_id, CommunityPost.__table__.c.comment_count, 1)
+
+
+@event.listens_for(Comment, 'after_delete')
+def _uncount_comment(mapper, connection, target):
+    _increment(connection, target.post_id, CommunityPost.__table__.c.comment_count, -1)
+
+
+def actual_counts():
+    """게시글별 실제 좋아요/댓글 수를 계산하는 상관 서브쿼리."""
+    posts = CommunityPost.__table__
+    likes = select(func.count()).select_from(Like.__table__).where(
+        Like.__table__.c.post_id == posts.c.post_id).scalar_subquery()
+    comments = select(func.count()).select_from(Comment.__table__).where(
+        Comment.__table__.c.post_id == posts.c.post_id).scalar_subquery()
+    return likes, comments
+
+
+def reconcile_counts(batch_size: int = 1000, report: Callable[[str], None] = logging.info) -> Dict:
+    """post_id 구간별로 저장된 카운터를 실제 행 수로 맞추고, 고친 게시글 수를 반환합니다."""
+    started = time.monotonic()
+    posts = CommunityPost.__table__
+    likes, comments = actual_counts()
+    last_id = 0
+    checked = 0
+    repaired = 0
+    while True:
+        ids = db.session.execute(select(posts.c.post_id).where(posts.c.post_id > last_id)
+                                 .order_by(posts.c.post_id).limit(batch_size)).scalars().all()
+        if not ids:
+            break
+        in_batch = (posts.c.post_id > last_id) & (posts.c.post_id <= ids[-1])
+        # 어긋난 행만 갱신하므로 정상인 게시글은 잠그거나 다시 쓰지 않습니다.
+        result = db.session.execute(update(posts).where(
+            in_batch, or_(posts.c.like_count != likes, posts.c.comment_count != comments)
+        ).values(like_count=likes, comment_count=comments).execution_options(synchronize_session=False))
+        db.session.commit()
+        checked += len(ids)
+        repaired += result.rowcount
+        last_id = ids[-1]
+        report(f"게시글 {checked}개 확인, {repaired}개 수정")
+    return {'checked': checked, 'repaired': repaired, 'seconds': time.monotonic() - started}
@@ -0,0 +1,151 @@
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import and_, case, delete, distinct, event, func, insert, literal, or_, select, union_all, Integer
+from sqlalchemy.orm import object_session
+import logging
+import re
+import time
+from app.models.models import db, CommunityPost, Hashtag, PostHashtag, PostToken
+from .pagination import encode_values, decode_values
+from .hashtags import MAX_TAG_LENGTH, post_tags, sync_post_hashtags, remove_post_hashtags, mark_tags_changed
+
+TOKEN_PATTERN = re.compile(r'\w+')
+MAX_TOKEN_LENGTH = MAX_TAG_LENGTH
+MAX_QUERY_TERMS = 8
+# 검색어 하나가 한 게시글에서 얻는 점수. 본문 토큰은 등장 횟수만큼 곱합니다.
+HASHTAG_EXACT_WEIGHT = 3
+HASHTAG_PREFIX_WEIGHT = 2
+TOKEN_EXACT_WEIGHT = 2
+TOKEN_PREFIX_WEIGHT = 1
+
+
+def tokenize(text: Optional[str]) -> Counter:
+    """소문자 단어 토큰과 등장 횟수. 한국어 조사가 붙은 단어는 검색 시 접두어 일치로 찾습니다."""
+    if not text:
+        return Counter()
+    return Counter(token[:MAX_TOKEN_LENGTH] for token in TOKEN_PATTERN.findall(text.lower()))
+
+
+def index_post(connection, post_id: int, description: Optional[str], hashtag: Optional[str],
+               count_usage: bool = True) -> Tuple[List[str], List[str]]:
+    """게시글의 본문 토큰을 다시 쓰고 해시태그 연결을 맞춥니다. (추가된 태그, 제거된 태그) 를 반환합니다.
+
+    count_usage 가 False 이면 새로 만든 연결을 트렌딩 사용 횟수에 더하지 않습니다 (재색인용).
+    """
+    connection.execute(delete(PostToken.__table__).where(PostToken.post_id == post_id))
+    tokens = tokenize(description)
+    if tokens:
+        connection.execute(insert(PostToken.__table__), [
+            {'token': token, 'post_id': post_id, 'term_frequency': count} for token, count in tokens.items()
+        ])
+    return sync_post_hashtags(connection, post_id, post_tags(hashtag), count_usage)
+
+
+@event.listens_for(CommunityPost, 'after_insert')
+def _index_new_post(mapper, connection, target):
+    added, removed = index_post(connection, target.post_id, target.description, target.hashtag)
+    mark_tags_changed(object_session(target), added, removed)
+
+
+@event.listens_for(CommunityPost, 'after_update')
+def _reindex_updated_post(mapper, connection, target):
+    attrs = db.inspect(target).attrs
+    if attrs.description.history.has_changes() or attrs.hashtag.history.has_changes():
+        added, removed = index_post(connection, target.post_id, target.description, target.hashtag)
+        mark_tags_changed(object_session(target), added, removed)
+
+
+@event.listens_for(CommunityPost, 'before_delete')
+def _unindex_deleted_post(mapper, connection, target):
+    connection.execute(delete(PostToken.__table__).where(PostToken.post_id == target.post_id))
+    remove_post_hashtags(connection, target.post_id)
+    # 해시태그 연결은 관계 cascade 로 먼저 지워졌을 수 있으므로 자동완성은 저장된 태그 문자열을 기준으로 되돌립니다.
+    mark_tags_changed(object_session(target), [], post_tags(db.inspect(target).attrs.hashtag.loaded_value))
+
+
+def parse_query(query: str) -> List[Tuple[str, bool]]:
+    """검색어를 (용어, 해시태그 전용 여부) 목록으로 나눕니다. '#태그' 는 해시태그 정확 일치로만 찾습니다."""
+    terms = {}
+    for word in query.split():
+        for token in TOKEN_PATTERN.findall(word.lower()):
+            token = token[:MAX_TOKEN_LENGTH]
+            terms[token] = terms.get(token, True) and word.startswith('#')
+    return list(terms.items())[:MAX_QUERY_TERMS]
+
+
+def _prefix_pattern(term: str) -> str:
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _term_hits(index: int, term: str, tag_only: bool):
+    """용어 하나에 일치하는 (post_id, 용어 번호, 점수) 행들."""
+    pattern = _prefix_pattern(term)
+    tag_match = Hashtag.tag_text == term if tag_only else Hashtag.tag_text.like(pattern, escape='\\')
+    hits = [select(
+        PostHashtag.post_id.label('post_id'),
+        literal(index, Integer).label('term'),
+        case((Hashtag.tag_text == term, HASHTAG_EXACT_WEIGHT), else_=HASHTAG_PREFIX_WEIGHT).label('score'),
+    ).join(Hashtag, Hashtag.hashtag_id == PostHashtag.hashtag_id).where(tag_match)]
+    if not tag_only:
+        hits.append(select(
+            PostToken.post_id.label('post_id'),
+            literal(index, Integer).label('term'),
+            (PostToken.term_frequency * case((PostToken.token == term, TOKEN_EXACT_WEIGHT),
+                                             else_=TOKEN_PREFIX_WEIGHT)).label('score'),
+        ).where(PostToken.token.like(pattern, escape='\\')))
+    return hits
+
+
+def search_posts(query: str, cursor: Optional[str], limit: int) -> Tuple[List[CommunityPost], Dict[int, int], Optional[str]]:
+    """모든 검색어에 일치하는 게시글을 점수 내림차순으로 limit 개 반환합니다.
+
+    (게시글 목록, post_id -> 점수, 다음 페이지 커서) 를 반환하며, 커서는 (점수, post_id) 키셋입니다.
+    잘못된 커서는 ValueError 를 발생시킵니다.
+    """
+    terms = parse_query(query)
+    if not terms:
+        return [], {}, None
+    hits = union_all(*[hit for i, (term, tag_only) in enumerate(terms) for hit in _term_hits(i, term, tag_only)]).subquery()
+    score = func.sum(hits.c.score)
+    ranked = select(hits.c.post_id, score.label('score')).group_by(hits.c.post_id).having(
+        func.count(distinct(hits.c.term)) == len(terms))
+    if cursor:
+        try:
+            last_score, last_id = (int(value) for value in decode_values(cursor))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'잘못된 커서입니다: {cursor}') from e
+        ranked = ranked.having(or_(score < last_score, and_(score == last_score, hits.c.post_id < last_id)))
+    rows = db.session.execute(ranked.order_by(score.desc(), hits.c.post_id.desc()).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_values([int(rows[-1].score), rows[-1].post_id])
+    scores = {row.post_id: int(row.score) for row in rows}
+    posts = CommunityPost.query.filter(CommunityPost.post_id.in_(scores)).all() if scores else []
+    posts.sort(key=lambda post: (-scores[post.post_id], -post.post_id))
+    return posts, scores, next_cursor
+
+
+def reindex_posts(batch_size: int = 500, report: Callable[[str], None] = logging.info) -> Dict:
+    """모든 게시글의 검색 색인과 해시태그 연결을 다시 만듭니다.
+
+    과거 게시글의 태그가 지금 쓰인 것으로 집계되지 않도록 트렌딩 사용 횟수는 건드리지 않습니다.
+    """
+    started = time.monotonic()
+    last_id = 0
+    total = 0
+    while True:
+        rows = db.session.query(CommunityPost.post_id, CommunityPost.description, CommunityPost.hashtag).filter(
+            CommunityPost.post_id > last_id).order_by(CommunityPost.post_id).limit(batch_size).all()
+        if not rows:
+            break
+        connection = db.session.connection()
+        for row in rows:
+            added, removed = index_post(connection, row.post_id, row.description, row.hashtag, count_usage=False)
+            mark_tags_changed(db.session, added, removed)
+        db.session.commit()
+        total += len(rows)
+        last_id = rows[-1].post_id
+        report(f"게시글 {total}개 색인 완료")
+    return {'posts': total, 'seconds': time.monotonic() - started}
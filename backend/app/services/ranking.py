@@ -0,0 +1,66 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+EMBEDDING_DIM = 512
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화. 영벡터 행은 그대로 0 으로 남습니다."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.maximum(norms, 1e-12, out=norms)
+    return matrix / norms
+
+
+def stack_embeddings(vectors: Sequence[Optional[np.ndarray]], dim: int = EMBEDDING_DIM) -> Tuple[np.ndarray, np.ndarray]:
+    """임베딩 목록을 정규화된 (N, dim) 행렬과 유효 마스크로 묶습니다.
+
+    임베딩이 없는 항목은 0 행으로 채워지며 mask 가 False 가 됩니다.
+    """
+    matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+    valid = np.zeros(len(vectors), dtype=bool)
+    for i, vec in enumerate(vectors):
+        if vec is None:
+            continue
+        vec = np.asarray(vec, dtype=np.float32).reshape(-1)
+        if vec.shape[0] != dim:
+            continue
+        matrix[i] = vec
+        valid[i] = True
+    return normalize_rows(matrix), valid
+
+
+def top_k(scores: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """점수 상위 k 개의 인덱스와 점수를 내림차순으로 반환합니다. mask 가 False 인 항목은 제외됩니다."""
+    if mask is not None:
+        candidates = np.flatnonzero(mask)
+        scores = scores[candidates]
+    else:
+        candidates = np.arange(scores.shape[0])
+    if k <= 0 or candidates.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if k < candidates.size:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(candidates.size)
+    order = part[np.argsort(-scores[part], kind='stable')]
+    return candidates[order], scores[order]
+
+
+def rank_top_k(matrix: np.ndarray, query: np.ndarray, k: int,
+               mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """정규화된 행렬과 쿼리 벡터의 코사인 유사도를 한 번의 matmul 로 계산해 상위 k 개를 고릅니다.
+
+    임베딩이 없는(0 행) 항목은 유사도 0 으로 계산되고, mask 로 후보를 제한할 수 있습니다.
+    """
+    query = np.asarray(query, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(query)
+    if norm > 0:
+        query = query / norm
+    scores = matrix @ query
+    return top_k(scores, k, mask)
+
+
+def stack_item_embeddings(items: List[dict], key: str, dim: int = EMBEDDING_DIM) -> Tuple[np.ndarray, np.ndarray]:
+    """dict 목록에서 key 에 해당하는 임베딩을 꺼내 stack_embeddings 로 묶습니다."""
+    return stack_embeddings([item.get(key) for item in items], dim)
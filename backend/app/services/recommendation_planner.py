@@ -0,0 +1,111 @@
+import numpy as np
+from typing import Dict, List, Tuple
+import logging
+import os
+from .ranking import top_k
+from .style_vocabulary import preference_cache
+from .temperature import TEMPERATURE_TOLERANCE
+from .wardrobe_cache import WardrobeSnapshot
+from .weather_client import weather_client, WeatherClient
+from .weather_fallback import climatology, default_climatology
+
+MAX_PLAN_DAYS = int(os.environ.get('RECOMMENDATION_PLAN_MAX_DAYS', 14))
+# 코사인 유사도 범위(-1~1) 보다 큰 값이라, 이미 다른 날 추천된 아이템은 새 아이템보다 항상 뒤로 밀립니다.
+REPEAT_PENALTY = 2.0
+
+
+class RecommendationPlanner:
+    """여러 (날짜, 도시) 의 추천을 한 번에 계산합니다.
+
+    예보는 도시별로 한 번씩 동시에 조회하고, 옷장 행렬과 선호 벡터는 한 번만 불러
+    (일수, 아이템 수) 점수/마스크 행렬로 모든 날을 함께 순위 매깁니다.
+    """
+
+    def __init__(self, client: WeatherClient = weather_client):
+        self.client = client
+
+    def day_weather(self, days: List[Dict]) -> List[Dict]:
+        forecasts = self.client.forecasts(day['city'] for day in days)
+        weather = []
+        for day in days:
+            forecast = (forecasts.get(day['city']) or {}).get(day['date'].isoformat())
+            if forecast is None:
+                # 예보 범위(5일)를 벗어났거나 조회에 실패하면 그 달의 평년 기온을 사용합니다.
+                forecast = (climatology(day['city'], day['date'].month)
+                            or default_climatology(day['city'], day['date'].month))
+            weather.append(forecast)
+        return weather
+
+    def day_masks(self, snapshot: WardrobeSnapshot, temperatures: np.ndarray) -> np.ndarray:
+        """(일수, 아이템 수) 착용 가능 마스크를 브로드캐스트 한 번으로 계산합니다."""
+        temperatures = temperatures[:, None]
+        return ((snapshot.temp_min[None, :] - TEMPERATURE_TOLERANCE <= temperatures)
+                & (temperatures <= snapshot.temp_max[None, :] + TEMPERATURE_TOLERANCE)
+                & snapshot.valid[None, :])
+
+    def _rank(self, scores: np.ndarray, masks: np.ndarray, top_n: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        # 모든 날의 상위 N 개를 행 단위 argpartition 으로 한 번에 고릅니다.
+        day_scores = np.where(masks, scores[None, :], -np.inf)
+        k = min(top_n, day_scores.shape[1])
+        part = np.argpartition(-day_scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(day_scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind='stable')
+        indices = np.take_along_axis(part, order, axis=1)
+        ranked = np.take_along_axis(part_scores, order, axis=1)
+        return [(idx[np.isfinite(row)], row[np.isfinite(row)]) for idx, row in zip(indices, ranked)]
+
+    def _rank_without_repeats(self, scores: np.ndarray, masks: np.ndarray,
+                              top_n: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        # 앞선 날에 추천된 아이템은 점수를 낮춰, 새 아이템이 모자랄 때만 다시 추천합니다.
+        used = np.zeros(scores.shape[0], dtype=bool)
+        picks = []
+        for mask in masks:
+            indices, _ = top_k(scores - REPEAT_PENALTY * used, top_n, mask)
+            picks.append((indices, scores[indices]))
+            used[indices] = True
+        return picks
+
+    def plan(self, user_id: int, snapshot: WardrobeSnapshot, days: List[Dict], top_n: int = 10,
+             avoid_repeats: bool = False) -> List[Dict]:
+        """days 는 {'date': date, 'city': str} 목록입니다. 날짜별로 날씨와 recommend_styles 형식의 추천을 반환합니다."""
+        weather = self.day_weather(days)
+        picks = [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))] * len(days)
+        if len(snapshot) and days:
+            temperatures = np.array([w['temperature'] for w in weather], dtype=np.float32)
+            masks = self.day_masks(snapshot, temperatures)
+            query = np.asarray(preference_cache.get(user_id), dtype=np.float32).reshape(-1)
+            norm = np.linalg.norm(query)
+            if norm > 0:
+                query = query / norm
+            # 선호 벡터는 날짜와 무관하므로 matmul 은 한 번이면 됩니다.
+            scores = snapshot.matrix @ query
+            rank = self._rank_without_repeats if avoid_repeats else self._rank
+            picks = rank(scores, masks, top_n)
+
+        plan = []
+        seen = set()
+        for day, day_weather, (indices, day_scores) in zip(days, weather, picks):
+            recommendations = []
+            for i, score in zip(indices, day_scores):
+                record = snapshot.records[i]
+                recommendations.append({
+                    'item_id': record['id'],
+                    'image_path': record['image_path'],
+                    'metadata': record['metadata'],
+                    'temperature_range': record['temperature_range'],
+                    'similarity_score': float(score),
+                    'repeated': record['id'] in seen,
+                })
+            seen.update(r['item_id'] for r in recommendations)
+            plan.append({
+                'date': day['date'].isoformat(),
+                'city': day['city'],
+                'weather': day_weather,
+                'recommendations': recommendations,
+            })
+        logging.info(f"추천 계획 완료: 사용자 {user_id}, {len(days)}일")
+        return plan
+
+
+# 프로세스 단위 추천 플래너
+recommendation_planner = RecommendationPlanner()
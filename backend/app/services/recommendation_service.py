@@ -1,29 +1,70 @@
 import torch
-from transformers import CLIPProcessor, CLIPModel
 from PIL import Image
 import numpy as np
 from typing import List, Dict
 import requests
 from datetime import datetime
 import os
+from .clip_registry import clip_registry, EMBEDDING_MODEL_VERSION
+from .embedding_codec import encode_embedding, l2_normalize
+from .inference_batcher import embed_pixel_batch, embed_pixels, embed_text
+from .clothing_detector import clothing_detector
+from .image_pipeline import as_tensor, crop_pixels, pixel_tensor
+from .outfit_composer import outfit_composer
+from .style_vocabulary import preference_cache
+
+
+def item_description(name: str, category: str, color: str, brand: str) -> str:
+    """의류 메타데이터로 텍스트 임베딩에 사용할 설명 문장을 만듭니다."""
+    text = " ".join(part for part in (color, brand, name, category) if part)
+    return text or "clothing"
+
+
+def apply_item_embeddings(item, embeddings: Dict[str, np.ndarray]):
+    """계산된 임베딩을 WardrobeItem 의 블롭 컬럼에 기록합니다."""
+    for column, vec in embeddings.items():
+        setattr(item, column, encode_embedding(vec))
+    item.embedding_model = EMBEDDING_MODEL_VERSION
 
 class RecommendationService:
-    def __init__(self):
-        self.model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-        self.processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
+    def __init__(self, registry=clip_registry):
+        # 모델은 프로세스 전역 레지스트리에서 처음 사용할 때 로드됩니다.
+        self.registry = registry
+
+    @property
+    def model(self):
+        return self.registry.model
+
+    @property
+    def processor(self):
+        return self.registry.processor
 
-    def get_image_embedding(self, image_path: str) -> np.ndarray:
-        """이미지의 CLIP 임베딩을 계산합니다."""
-        image = Image.open(image_path)
-        inputs = self.processor(images=image, return_tensors="pt")
-        image_features = self.model.get_image_features(**inputs)
-        return image_features.detach().numpy()
+    @property
+    def device(self):
+        return self.registry.device
+
+    def get_image_embedding(self, image_path: str, bbox=None) -> np.ndarray:
+        """이미지 (bbox 를 주면 그 검출 영역) 의 CLIP 임베딩을 계산합니다."""
+        # 해시 키 전처리 캐시가 있으면 JPEG 디코드 없이 바로 모델에 넣습니다.
+        return embed_pixels(pixel_tensor(image_path, bbox))[np.newaxis, :]
 
     def get_text_embedding(self, text: str) -> np.ndarray:
         """텍스트의 CLIP 임베딩을 계산합니다."""
-        inputs = self.processor(text=[text], return_tensors="pt", padding=True)
-        text_features = self.model.get_text_features(**inputs)
-        return text_features.detach().numpy()
+        return embed_text(text)[np.newaxis, :]
+
+    def get_item_embeddings(self, image_path: str, description: str) -> Dict[str, np.ndarray]:
+        """이미지/텍스트/결합 임베딩을 정규화된 벡터로 계산합니다."""
+        return self.combine_item_embeddings(self.get_image_embedding(image_path), description)
+
+    def combine_item_embeddings(self, image_embedding: np.ndarray, description: str) -> Dict[str, np.ndarray]:
+        """이미 계산된 이미지 임베딩에 설명 텍스트 임베딩을 더해 저장용 임베딩을 만듭니다."""
+        image_vec = l2_normalize(image_embedding)
+        text_vec = l2_normalize(self.get_text_embedding(description))
+        return {
+            'image_embedding': image_vec,
+            'text_embedding': text_vec,
+            'combined_embedding': l2_normalize(image_vec + text_vec),
+        }
 
     def calculate_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
         """두 벡터 간의 코사인 유사도를 계산합니다."""
@@ -44,35 +85,30 @@ class RecommendationService:
                           user_id: int,
                           weather_data: Dict,
                           style_preferences: List[str],
-                          wardrobe_items: List[Dict]) -> Dict:
-        """사용자에게 맞는 코디를 추천합니다."""
+                          snapshot,
+                          n_outfits: int = 1) -> Dict:
+        """사용자에게 맞는 코디를 추천합니다. 슬롯(아우터/상의/하의/신발)별로 한 벌씩 구성합니다."""
         # 날씨 기반 필터링
         weather_tags = self.get_weather_recommendation(weather_data['temperature'])
+        weather_mask = snapshot.temperature_mask(weather_data['temperature'])
 
-        # 스타일 선호도 기반 필터링
-        style_embedding = self.get_text_embedding(" ".join(style_preferences))
-
-        # 의류 아이템 필터링 및 점수 계산
-        scored_items = []
-        for item in wardrobe_items:
-            # 날씨 태그와 일치하는지 확인
-            weather_match = any(tag in item.get('category', '') or tag in item.get('subcategory', '') for tag in weather_tags)
-            if weather_match:
-                # 스타일 유사도 계산
-                item_embedding = np.array(item.get('embedding', np.zeros(512)))
-                style_similarity = self.calculate_similarity(style_embedding.flatten(), item_embedding.flatten())
-                scored_items.append({
-                    'item': item,
-                    'score': style_similarity
-                })
-
-        # 상위 점수 아이템 선택
-        scored_items.sort(key=lambda x: x['score'], reverse=True)
-        top_items = scored_items[:5]  # 상위 5개 아이템 선택
+        # 저장된 Style 임베딩으로 만든 선호 벡터로 점수를 매기고 빔 서치로 조합합니다.
+        style_embedding = preference_cache.get(user_id)
+        composed = outfit_composer.compose(snapshot, style_embedding, weather_mask, n_outfits)
 
         # 코디 구성
         outfit = {
-            'items': [item['item'] for item in top_items],
+            'outfits': [{
+                'items': [{
+                    'position': member['slot'],
+                    'item_id': snapshot.records[member['index']]['id'],
+                    'image_path': snapshot.records[member['index']]['image_path'],
+                    'metadata': snapshot.records[member['index']]['metadata'],
+                } for member in candidate['items']],
+                'score': candidate['score'],
+                'style_score': candidate['style_score'],
+                'compatibility': candidate['compatibility'],
+            } for candidate in composed],
             'weather_tags': weather_tags,
             'style_tags': style_preferences,
             'created_at': datetime.utcnow()
@@ -80,14 +116,24 @@ class RecommendationService:
         return outfit
 
     def detect_clothing_items(self, image_path: str) -> List[Dict]:
-        """YOLO를 사용하여 이미지에서 의류 아이템을 감지합니다."""
-        # TODO: YOLO 모델 로드 및 실행 구현 필요
-        # 현재는 더미 데이터 반환
-        return [
-            {
-                'category': '상의',
-                'subcategory': '티셔츠',
-                'confidence': 0.95,
-                'bbox': [100, 100, 200, 200]
-            }
-        ]
+        """의류 검출 모델로 이미지에서 의류 아이템을 감지합니다."""
+        with Image.open(image_path) as image:
+            return clothing_detector.detect(image.convert('RGB'))
+
+    def analyze_image(self, image_path: str) -> List[Dict]:
+        """이미지를 한 번만 디코드해 의류를 검출하고, 모든 검출 영역의 임베딩을 한 배치로 계산합니다.
+
+        반환되는 각 검출 결과에는 정규화된 'embedding' 이 포함되며, 신뢰도 내림차순으로 정렬됩니다.
+        검출 영역의 전처리 결과는 (이미지, bbox) 키로 캐시되어, 백필이 같은 crop 으로 다시 임베딩합니다.
+        """
+        with Image.open(image_path) as image:
+            image = image.convert('RGB')
+            detections = clothing_detector.detect(image)
+            if not detections:
+                return []
+            pixels = crop_pixels(image_path, image, [d['bbox'] for d in detections])
+        vectors = embed_pixel_batch([as_tensor(p) for p in pixels])
+        for detection, vec in zip(detections, vectors):
+            detection['embedding'] = l2_normalize(vec)
+        detections.sort(key=lambda d: d['confidence'], reverse=True)
+        return detections
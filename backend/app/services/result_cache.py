@@ -0,0 +1,250 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence
+from collections import OrderedDict
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+import threading
+import logging
+import json
+import time
+import os
+from app.models.models import Wardrobe, WardrobeItem, PreferredStyle, Style
+from .temperature import temperature_bucket
+
+RECOMMENDATION_CACHE_URL = os.environ.get('RECOMMENDATION_CACHE_URL')  # redis://... 설정 시 워커 간 공유
+RECOMMENDATION_CACHE_TTL = float(os.environ.get('RECOMMENDATION_CACHE_TTL', 3600))
+RECOMMENDATION_CACHE_MAX_ENTRIES = int(os.environ.get('RECOMMENDATION_CACHE_MAX_ENTRIES', 10000))
+KEY_PREFIX = 'recs'
+
+
+class CacheVersions(NamedTuple):
+    wardrobe: int
+    preferences: int
+    styles: int
+
+
+class LocalCacheBackend:
+    """프로세스 내 LRU 백엔드. 버전 카운터도 프로세스마다 따로 관리됩니다."""
+
+    name = 'local'
+
+    def __init__(self, max_entries: int = RECOMMENDATION_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def counters(self, keys: Sequence[str]) -> List[int]:
+        with self._lock:
+            return [self._counters.get(key, 0) for key in keys]
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisCacheBackend:
+    """모든 워커가 같은 항목과 버전 카운터를 보는 Redis 백엔드."""
+
+    name = 'redis'
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key: str):
+        raw = self.client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value, ttl: float):
+        self.client.set(key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def counters(self, keys: Sequence[str]) -> List[int]:
+        return [int(v) if v is not None else 0 for v in self.client.mget(list(keys))]
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+def build_cache_backend(url: Optional[str] = RECOMMENDATION_CACHE_URL):
+    if url:
+        try:
+            return RedisCacheBackend(url)
+        except ImportError:
+            logging.warning("redis 패키지가 없어 추천 결과 캐시를 프로세스 로컬로 사용합니다.")
+    return LocalCacheBackend()
+
+
+class RecommendationResultCache:
+    """(옷장 버전, 선호 버전, 기온 구간) 을 키로 추천 결과를 캐시합니다.
+
+    쓰기는 항목을 지우는 대신 버전을 올리므로 이전 키는 다시 조회되지 않고 TTL 로 사라집니다.
+    키는 계산 전에 만들어 두어야 계산 도중의 쓰기가 새 버전에 섞이지 않습니다.
+    """
+
+    def __init__(self, backend=None, ttl_seconds: float = RECOMMENDATION_CACHE_TTL):
+        self.backend = backend or build_cache_backend()
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def shared(self) -> bool:
+        """버전 카운터를 다른 워커와 공유하는지 여부.
+
+        공유될 때는 다른 워커의 커밋이 이 프로세스의 로컬 캐시 (옷장 스냅샷, 선호 벡터) 를 무효화하지 못하므로,
+        로컬 캐시 항목을 로드 시점의 버전과 비교해 뒤처진 항목을 다시 로드해야 합니다.
+        """
+        return self.backend.name != 'local'
+
+    def versions(self, user_id) -> Optional[CacheVersions]:
+        """사용자의 (옷장, 선호, 스타일) 버전. 조회에 실패하면 None 을 반환합니다."""
+        user_id = int(user_id)
+        try:
+            return CacheVersions(*self.backend.counters([
+                f'{KEY_PREFIX}:wv:{user_id}', f'{KEY_PREFIX}:pv:{user_id}', f'{KEY_PREFIX}:sv',
+            ]))
+        except Exception as e:
+            self.errors += 1
+            logging.warning(f"추천 캐시 버전 조회 실패: {e}")
+            return None
+
+    def key(self, user_id, temperature: float, top_n: int,
+            versions: Optional[CacheVersions] = None) -> Optional[str]:
+        """versions 를 주지 않으면 새로 조회합니다. 버전을 알 수 없으면 None (캐시 사용 안 함)."""
+        versions = versions or self.versions(user_id)
+        if versions is None:
+            return None
+        return (f'{KEY_PREFIX}:{int(user_id)}:{versions.wardrobe}:{versions.preferences}.{versions.styles}:'
+                f'{temperature_bucket(temperature)}:{top_n}')
+
+    def get(self, key: Optional[str]) -> Optional[List[Dict]]:
+        if key is None:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logging.warning(f"추천 캐시 조회 실패: {e}")
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Optional[str], results: List[Dict]):
+        if key is None:
+            return
+        try:
+            self.backend.set(key, results, self.ttl_seconds)
+        except Exception as e:
+            self.errors += 1
+            logging.warning(f"추천 캐시 저장 실패: {e}")
+
+    def _bump(self, counter: str):
+        try:
+            self.backend.incr(counter)
+        except Exception as e:
+            self.errors += 1
+            logging.warning(f"추천 캐시 버전 갱신 실패 ({counter}): {e}")
+
+    def bump_wardrobe(self, user_id):
+        self._bump(f'{KEY_PREFIX}:wv:{int(user_id)}')
+
+    def bump_preferences(self, user_id):
+        self._bump(f'{KEY_PREFIX}:pv:{int(user_id)}')
+
+    def bump_styles(self):
+        self._bump(f'{KEY_PREFIX}:sv')
+
+    def stats(self) -> Dict:
+        return {'backend': self.backend.name, 'entries': self.backend.size(), 'hits': self.hits,
+                'misses': self.misses, 'errors': self.errors, 'ttl_seconds': self.ttl_seconds}
+
+
+# 프로세스 단위 추천 결과 캐시
+result_cache = RecommendationResultCache()
+
+
+def _pending_bumps(session) -> Dict:
+    return session.info.setdefault('recommendation_cache_bumps', {'wardrobe': set(), 'preferences': set(),
+                                                                  'styles': False})
+
+
+def mark_preferences_changed(session, user_id):
+    """매퍼 이벤트가 발생하지 않는 bulk 쓰기 후 호출합니다. 버전은 커밋 후에 올라갑니다."""
+    _pending_bumps(session)['preferences'].add(int(user_id))
+
+
+# 버전은 커밋된 뒤에 올려야 동시 요청이 커밋 전 데이터를 새 버전 키로 저장하지 않습니다.
+@event.listens_for(WardrobeItem, 'after_insert')
+@event.listens_for(WardrobeItem, 'after_update')
+@event.listens_for(WardrobeItem, 'after_delete')
+def _mark_wardrobe_write(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    user_id = connection.execute(select(Wardrobe.user_id).where(Wardrobe.wardrobe_id == target.wardrobe_id)).scalar()
+    if user_id is not None:
+        _pending_bumps(session)['wardrobe'].add(user_id)
+
+
+@event.listens_for(PreferredStyle, 'after_insert')
+@event.listens_for(PreferredStyle, 'after_delete')
+def _mark_preference_write(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        mark_preferences_changed(session, target.user_id)
+
+
+@event.listens_for(Style, 'after_update')
+def _mark_style_write(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        _pending_bumps(session)['styles'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_bumps(session):
+    bumps = session.info.pop('recommendation_cache_bumps', None)
+    if not bumps:
+        return
+    for user_id in bumps['wardrobe']:
+        result_cache.bump_wardrobe(user_id)
+    for user_id in bumps['preferences']:
+        result_cache.bump_preferences(user_id)
+    if bumps['styles']:
+        result_cache.bump_styles()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_bumps(session):
+    session.info.pop('recommendation_cache_bumps', None)
@@ -1,107 +1,71 @@
-import torch
-from transformers import CLIPProcessor, CLIPModel
-from PIL import Image
 import numpy as np
 from typing import List, Dict, Tuple, Optional
-import requests
-from datetime import datetime
-from pathlib import Path
-from flask import current_app
-from app.models.models import db, User, Wardrobe, WardrobeItem, Style, PreferredStyle, Weather
+from app.models.models import db, Wardrobe, WardrobeItem, Style, PreferredStyle
 import logging
-import os
+from .clip_registry import clip_registry
+from .inference_batcher import embed_text
+from .ranking import rank_top_k
+from .temperature import get_temperature_range, wearable_at, TEMPERATURE_TOLERANCE
+from .style_vocabulary import preference_cache
+from .daily_recommendations import load_precomputed
+from .result_cache import result_cache
+from .weather_client import weather_client, UnknownCity
+from .wardrobe_cache import wardrobe_cache, wardrobe_item_record, WardrobeSnapshot
 
 class StyleRecommendationService:
-    def __init__(self):
-        try:
-            self.model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-            self.processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            self.model.to(self.device)
-            logging.info("CLIP 모델 로드 완료")
-        except Exception as e:
-            logging.error(f"CLIP 모델 로드 실패: {e}")
-            raise
+    def __init__(self, registry=clip_registry):
+        # 모델은 RecommendationService 와 같은 레지스트리 인스턴스를 공유합니다.
+        self.registry = registry
+
+    @property
+    def model(self):
+        return self.registry.model
+
+    @property
+    def processor(self):
+        return self.registry.processor
+
+    @property
+    def device(self):
+        return self.registry.device
     
-    def load_wardrobe_data(self, user_id: int) -> List[Dict]:
+    def _query_wardrobe_records(self, user_id: int, current_temp: Optional[float] = None) -> List[Dict]:
+        query = db.session.query(WardrobeItem).join(Wardrobe).filter(Wardrobe.user_id == user_id)
+        if current_temp is not None:
+            # min_temp/max_temp 인덱스로 착용 가능한 아이템만 로드합니다.
+            query = query.filter(wearable_at(current_temp))
+        wardrobe_items = query.all()
+        # 임베딩이 DB 에 저장되어 있으므로 이미지 파일 존재 여부는 확인하지 않습니다.
+        items_data = [wardrobe_item_record(item) for item in wardrobe_items]
+        logging.info(f"사용자 {user_id}의 옷장 데이터 {len(items_data)}개 로드 완료")
+        return items_data
+
+    def load_wardrobe_data(self, user_id: int, current_temp: Optional[float] = None) -> List[Dict]:
         try:
-            wardrobe_items = db.session.query(WardrobeItem).join(Wardrobe).filter(
-                Wardrobe.user_id == user_id
-            ).all()
-            items_data = []
-            for item in wardrobe_items:
-                image_path = Path(item.image_path) if item.image_path else None
-                if not image_path or not image_path.exists():
-                    logging.warning(f"이미지 파일이 존재하지 않습니다: {image_path}")
-                    continue
-
-                metadata = {
-                    'name': item.name,
-                    'category': item.category,
-                    'color': item.color,
-                    'brand': item.brand,
-                }
-
-                temperature_range = self._get_temperature_range(item.category)
-
-                items_data.append({
-                    'id': item.item_id,
-                    'image_path': str(image_path),
-                    'metadata': metadata,
-                    'temperature_range': temperature_range,
-                    'created_at': item.created_at,
-                    'image_embedding': item.image_embedding,
-                    'text_embedding': item.text_embedding,
-                    'combined_embedding': item.combined_embedding,
-                })
-
-            logging.info(f"사용자 {user_id}의 옷장 데이터 {len(items_data)}개 로드 완료")
-            return items_data
-
+            return self._query_wardrobe_records(user_id, current_temp)
         except Exception as e:
             logging.error(f"옷장 데이터 로드 실패: {e}")
             return []
 
+    def get_wardrobe_snapshot(self, user_id: int, version: Optional[int] = None) -> WardrobeSnapshot:
+        """캐시된 옷장 스냅샷을 반환하고, 없거나 version 보다 오래됐으면 DB 에서 로드합니다."""
+        return wardrobe_cache.get(
+            user_id, lambda uid: WardrobeSnapshot(self._query_wardrobe_records(uid)), version
+        )
+
     def _get_temperature_range(self, category: str) -> Tuple[float, float]:
-        temperature_ranges = {
-            '패딩': (-10, 10), '코트': (0, 15), '자켓': (5, 20), '니트': (5, 25),
-            '맨투맨': (10, 25), '후드티': (10, 25), '셔츠': (15, 30), '티셔츠': (20, 35),
-            '반팔': (25, 40), '민소매': (25, 40), '청바지': (0, 35), '슬랙스': (10, 30),
-            '반바지': (20, 40), '치마': (15, 35), '운동화': (0, 40), '구두': (5, 35), '샌들': (20, 40),
-        }
-        return temperature_ranges.get(category, (10, 30))
-
-    def get_weather_data(self, city_name: str) -> Optional[Dict]:
-        try:
-            api_key = os.environ.get('OPENWEATHER_API_KEY')
-            if not api_key:
-                logging.error("OPENWEATHER_API_KEY 환경변수가 설정되어 있지 않습니다.")
-                return None
-            url = f'http://api.openweathermap.org/data/2.5/weather?q={city_name}&appid={api_key}&units=metric'
-            response = requests.get(url, timeout=10)
-            if response.status_code != 200:
-                logging.error(f"날씨 API 호출 실패: {response.status_code}")
-                return None
-            data = response.json()
-            return {
-                'city': data['name'],
-                'temperature': data['main']['temp'],
-                'weather': data['weather'][0]['main'],
-                'description': data['weather'][0]['description'],
-                'humidity': data['main']['humidity'],
-                'wind_speed': data['wind']['speed'],
-            }
-        except Exception as e:
-            logging.error(f"날씨 데이터 로드 실패: {e}")
-            return None
+        return get_temperature_range(category)
+
+    def get_weather_data(self, city_name: str) -> Dict:
+        # 도시별 TTL 캐시를 공유하는 날씨 클라이언트를 사용합니다.
+        # API 장애 시에는 마지막 관측값이나 평년 기온으로 대체합니다.
+        return weather_client.by_city_or_fallback(city_name)
 
     def filter_by_temperature(self, items: List[Dict], current_temp: float) -> List[Dict]:
-        suitable_items = []
-        for item in items:
-            min_temp, max_temp = item['temperature_range']
-            # 온도 범위 내 혹은 허용 오차 5도 내 포함시 포함
-            if min_temp <= current_temp <= max_temp or abs(current_temp - min_temp) <= 5 or abs(current_temp - max_temp) <= 5:
-                suitable_items.append(item)
+        # 온도 범위 내 혹은 허용 오차 5도 내 포함시 포함 (배열 비교 한 번으로 마스크 계산)
+        ranges = np.array([item['temperature_range'] for item in items], dtype=np.float32).reshape(-1, 2)
+        mask = (ranges[:, 0] - TEMPERATURE_TOLERANCE <= current_temp) & (current_temp <= ranges[:, 1] + TEMPERATURE_TOLERANCE)
+        suitable_items = [item for item, keep in zip(items, mask) if keep]
         logging.info(f"온도 필터링 완료: {len(suitable_items)}/{len(items)}개 아이템 선택")
         return suitable_items
 
@@ -129,51 +93,61 @@ class StyleRecommendationService:
 
     def get_text_embedding(self, text: str) -> np.ndarray:
         try:
-            inputs = self.processor(text=[text], return_tensors="pt", padding=True)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            with torch.no_grad():
-                text_features = self.model.get_text_features(**inputs)
-            return text_features.cpu().numpy().flatten()
+            return embed_text(text).flatten()
         except Exception as e:
             logging.error(f"텍스트 임베딩 생성 실패: {e}")
             return np.zeros(512, dtype=np.float32)
 
     def recommend_styles(self, user_id: int, city_name: str, top_n: int = 10) -> List[Dict]:
         try:
-            wardrobe_items = self.load_wardrobe_data(user_id)
-            if not wardrobe_items:
-                return []
-
             weather_data = self.get_weather_data(city_name)
-            if not weather_data:
-                return []
             current_temp = weather_data['temperature']
 
-            suitable_items = self.filter_by_temperature(wardrobe_items, current_temp)
-            if not suitable_items:
+            # 같은 옷장/선호 버전과 기온 구간의 결과는 캐시에서 바로 반환합니다.
+            versions = result_cache.versions(user_id)
+            cache_key = result_cache.key(user_id, current_temp, top_n, versions)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            # 매일 사전 계산된 순위가 신선하면 그대로 사용합니다.
+            precomputed = load_precomputed(user_id, current_temp, top_n)
+            if precomputed is not None:
+                logging.info(f"사전 계산된 추천 사용: 사용자 {user_id}, {current_temp}°C")
+                result_cache.set(cache_key, precomputed)
+                return precomputed
+
+            # 옷장 전체 스냅샷을 LRU 캐시에서 가져오고 (없으면 로드해 캐시), 기온은 마스크로 거릅니다.
+            # 공유 캐시에서는 다른 워커가 올린 버전보다 오래된 로컬 스냅샷/선호 벡터를 다시 로드해,
+            # 오래된 데이터로 계산한 결과가 새 버전 키로 저장되지 않도록 합니다.
+            shared = versions if result_cache.shared else None
+            snapshot = self.get_wardrobe_snapshot(user_id, shared and shared.wardrobe)
+            if not len(snapshot):
                 return []
 
-            user_styles = self.get_user_style_preferences(user_id)
-            style_text = " ".join(user_styles) if user_styles else "casual style"
-            user_style_embedding = self.get_text_embedding(style_text)
-
-            recommendations = []
-            for item in suitable_items:
-                combined_embedding = item.get('combined_embedding')
-                if combined_embedding is not None:
-                    similarity = self.calculate_cosine_similarity(user_style_embedding, combined_embedding)
-                else:
-                    similarity = 0.0
-                recommendations.append({
-                    'item_id': item['id'],
-                    'image_path': item['image_path'],
-                    'metadata': item['metadata'],
-                    'temperature_range': item['temperature_range'],
-                    'similarity_score': similarity
-                })
-            recommendations.sort(key=lambda x: x['similarity_score'], reverse=True)
-            return recommendations[:top_n]
+            # 임베딩이 아직 없는 (처리 중인) 아이템은 사전 계산과 마찬가지로 제외합니다.
+            suitable_mask = snapshot.temperature_mask(current_temp) & snapshot.valid
+            logging.info(f"온도 필터링 완료: {int(suitable_mask.sum())}/{len(snapshot)}개 아이템 선택")
+            if not suitable_mask.any():
+                return []
 
+            # 저장된 Style 임베딩으로 만든 선호 벡터를 사용하므로 추론 모델을 호출하지 않습니다.
+            user_style_embedding = preference_cache.get(user_id, shared and (shared.preferences, shared.styles))
+
+            # 캐시된 (N, 512) 행렬에 한 번의 matmul 을 적용하고 argpartition 으로 상위 N 개 선택
+            indices, scores = rank_top_k(snapshot.matrix, user_style_embedding, top_n, mask=suitable_mask)
+            results = [{
+                'item_id': snapshot.records[i]['id'],
+                'image_path': snapshot.records[i]['image_path'],
+                'metadata': snapshot.records[i]['metadata'],
+                'temperature_range': snapshot.records[i]['temperature_range'],
+                'similarity_score': float(score)
+            } for i, score in zip(indices, scores)]
+            result_cache.set(cache_key, results)
+            return results
+
+        except UnknownCity:
+            raise
         except Exception as e:
             logging.error(f"추천 실패: {e}")
             return []
@@ -0,0 +1,161 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import event, inspect
+import threading
+import logging
+import struct
+import time
+import os
+from app.models.models import db, Style, PreferredStyle, DailyRecommendation
+from .clip_registry import EMBEDDING_MODEL_VERSION
+from .embedding_codec import encode_embedding, decode_embedding, l2_normalize
+from .inference_batcher import embed_text, embed_texts
+from .result_cache import mark_preferences_changed
+
+DEFAULT_STYLE_TEXT = "casual style"
+PREFERENCE_CACHE_TTL = float(os.environ.get('PREFERENCE_CACHE_TTL', 3600))
+
+
+def _style_is_stale(style: Style) -> bool:
+    return style.embedding is None or style.embedding_model != EMBEDDING_MODEL_VERSION
+
+
+def refresh_style_embeddings(styles: Optional[Iterable[Style]] = None, force: bool = False) -> int:
+    """Style 행의 임베딩을 한 번의 배치로 계산해 저장합니다. 커밋은 호출자가 합니다."""
+    if styles is None:
+        styles = Style.query.all()
+    targets = [s for s in styles if s.name and (force or _style_is_stale(s))]
+    if not targets:
+        return 0
+    vectors = embed_texts([s.name for s in targets])
+    for style, vec in zip(targets, vectors):
+        style.embedding = encode_embedding(l2_normalize(vec))
+        style.embedding_model = EMBEDDING_MODEL_VERSION
+    logging.info(f"스타일 임베딩 {len(targets)}개 갱신")
+    return len(targets)
+
+
+def _style_vector(style: Style) -> Optional[np.ndarray]:
+    """현재 모델 버전으로 저장된 Style 임베딩. 없거나 해석할 수 없으면 None."""
+    if _style_is_stale(style):
+        return None
+    try:
+        return decode_embedding(style.embedding)
+    except (ValueError, struct.error) as e:
+        logging.warning(f"스타일 임베딩 해석 실패 ({style.name}): {e}")
+        return None
+
+
+@event.listens_for(Style, 'before_insert')
+@event.listens_for(Style, 'before_update')
+def _embed_style_on_write(mapper, connection, target):
+    # 스타일은 드물게 추가되므로 저장 시점에 바로 임베딩을 계산합니다.
+    name_changed = inspect(target).attrs.name.history.has_changes()
+    if target.name and (name_changed or _style_is_stale(target)):
+        target.embedding = encode_embedding(l2_normalize(embed_text(target.name)))
+        target.embedding_model = EMBEDDING_MODEL_VERSION
+
+
+class StylePreferenceCache:
+    """사용자별 선호 스타일 벡터(저장된 Style 임베딩의 평균)를 보관하는 캐시."""
+
+    def __init__(self, ttl_seconds: float = PREFERENCE_CACHE_TTL):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._default_vector = None
+        self.hits = 0
+        self.misses = 0
+
+    def default_vector(self) -> np.ndarray:
+        # 선호 스타일이 없는 사용자용 기본 벡터는 프로세스당 한 번만 계산합니다.
+        if self._default_vector is None:
+            self._default_vector = l2_normalize(embed_text(DEFAULT_STYLE_TEXT))
+        return self._default_vector
+
+    def _load(self, user_id: int) -> np.ndarray:
+        styles = db.session.query(Style).join(PreferredStyle).filter(
+            PreferredStyle.user_id == user_id
+        ).all()
+        # 조회 경로에서는 추론이나 커밋을 하지 않습니다. 임베딩은 저장 시점의 flush 훅과
+        # `flask styles refresh-embeddings` 가 채우므로, 비어 있거나 모델 버전이 다른 행은 건너뜁니다.
+        vectors = [vec for vec in (_style_vector(s) for s in styles) if vec is not None]
+        if len(vectors) < len(styles):
+            logging.warning(f"사용자 {user_id}의 선호 스타일 {len(styles) - len(vectors)}개에 사용할 수 있는 임베딩이 없습니다. "
+                            f"`flask styles refresh-embeddings` 를 실행하세요.")
+        if not vectors:
+            return self.default_vector()
+        return l2_normalize(np.mean(np.stack(vectors), axis=0))
+
+    def get(self, user_id, version: Optional[tuple] = None) -> np.ndarray:
+        """version 을 주면 그보다 오래된 (선호, 스타일) 버전에서 계산된 벡터는 다시 계산합니다."""
+        user_id = int(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if (entry is not None and time.monotonic() - entry[1] <= self.ttl_seconds
+                    and (version is None or (entry[2] is not None and entry[2] >= version))):
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        vector = self._load(user_id)
+        with self._lock:
+            self._entries[user_id] = (vector, time.monotonic(), version)
+        return vector
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(int(user_id), None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'ttl_seconds': self.ttl_seconds}
+
+
+# 프로세스 단위 선호 스타일 캐시
+preference_cache = StylePreferenceCache()
+
+
+@event.listens_for(PreferredStyle, 'after_insert')
+@event.listens_for(PreferredStyle, 'after_delete')
+def _invalidate_preference(mapper, connection, target):
+    preference_cache.invalidate(target.user_id)
+
+
+@event.listens_for(Style, 'after_update')
+def _invalidate_all_preferences(mapper, connection, target):
+    preference_cache.invalidate()
+
+
+def get_or_create_styles(names: Iterable[str]) -> List[Style]:
+    """이름 목록에 해당하는 Style 행을 반환하고, 없는 스타일은 새로 만듭니다."""
+    names = list(dict.fromkeys(n.strip() for n in names if n and n.strip()))
+    if not names:
+        return []
+    existing = {s.name: s for s in Style.query.filter(Style.name.in_(names)).all()}
+    styles = []
+    for name in names:
+        style = existing.get(name)
+        if style is None:
+            style = Style(name=name)
+            db.session.add(style)
+        styles.append(style)
+    db.session.flush()
+    return styles
+
+
+def set_user_preferred_styles(user_id, names: Iterable[str]) -> List[str]:
+    """사용자의 선호 스타일을 주어진 이름 목록으로 교체합니다. 커밋은 호출자가 합니다."""
+    user_id = int(user_id)
+    styles = get_or_create_styles(names)
+    PreferredStyle.query.filter_by(user_id=user_id).delete()
+    for style in styles:
+        db.session.add(PreferredStyle(user_id=user_id, style_id=style.style_id))
+    # bulk delete 는 매퍼 이벤트를 발생시키지 않으므로 직접 무효화합니다.
+    preference_cache.invalidate(user_id)
+    DailyRecommendation.query.filter_by(user_id=user_id).delete()
+    mark_preferences_changed(db.session, user_id)
+    return [s.name for s in styles]
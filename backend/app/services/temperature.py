@@ -0,0 +1,77 @@
+from bisect import bisect_right
+from typing import Tuple
+from sqlalchemy import and_, event, inspect
+from app.models.models import WardrobeItem
+
+# 카테고리별 착용 가능 기온 범위 (°C)
+TEMPERATURE_RANGES = {
+    '패딩': (-10, 10), '코트': (0, 15), '자켓': (5, 20), '니트': (5, 25),
+    '맨투맨': (10, 25), '후드티': (10, 25), '셔츠': (15, 30), '티셔츠': (20, 35),
+    '반팔': (25, 40), '민소매': (25, 40), '청바지': (0, 35), '슬랙스': (10, 30),
+    '반바지': (20, 40), '치마': (15, 35), '운동화': (0, 40), '구두': (5, 35), '샌들': (20, 40),
+    # 앱에서 대분류만 입력한 경우
+    '아우터': (-10, 20), '상의': (-10, 40), '하의': (-10, 40), '신발': (-10, 40),
+}
+DEFAULT_TEMPERATURE_RANGE = (10, 30)
+# 범위 밖이더라도 이 값(°C) 이내면 추천 대상에 포함합니다.
+TEMPERATURE_TOLERANCE = 5
+
+
+def get_temperature_range(category: str) -> Tuple[float, float]:
+    return TEMPERATURE_RANGES.get(category, DEFAULT_TEMPERATURE_RANGE)
+
+
+def item_temperature_range(item) -> Tuple[float, float]:
+    """저장된 min_temp/max_temp 를 사용하고, 아직 채워지지 않은 행은 카테고리 표로 계산합니다."""
+    if item.min_temp is None or item.max_temp is None:
+        return get_temperature_range(item.category)
+    return item.min_temp, item.max_temp
+
+
+def wearable_at(temperature: float, tolerance: float = TEMPERATURE_TOLERANCE):
+    """현재 기온에 착용 가능한 WardrobeItem 을 고르는 SQL 조건 (min_temp/max_temp 인덱스 사용)."""
+    return and_(WardrobeItem.min_temp <= temperature + tolerance, WardrobeItem.max_temp >= temperature - tolerance)
+
+
+@event.listens_for(WardrobeItem, 'before_insert')
+@event.listens_for(WardrobeItem, 'before_update')
+def _sync_temperature_range(mapper, connection, target):
+    # 카테고리가 바뀌었거나 아직 범위가 없으면 표에서 다시 채웁니다.
+    if target.min_temp is None or target.max_temp is None or inspect(target).attrs.category.history.has_changes():
+        target.min_temp, target.max_temp = get_temperature_range(target.category)
+
+
+# 착용 범위의 위쪽 경계 (high + 허용 오차) 는 마스크에 포함되므로 (<=), 구간 경계는 그보다 이만큼 위에 둡니다.
+# 관측 기온은 0.01°C 단위이므로 (high + TOL, high + TOL + ε) 사이의 기온은 들어오지 않습니다.
+# float32 로 계산하는 마스크에서도 구분되도록 float32 해상도보다 충분히 큰 값을 사용합니다.
+TEMPERATURE_BUCKET_EPSILON = 1e-3
+
+# 허용 오차를 반영한 범위 경계. 구간은 [경계, 다음 경계) 이며, 같은 구간 안의 기온은 항상
+# 라이브 마스크 (low - TOL <= t <= high + TOL) 와 같은 아이템 집합을 통과시킵니다.
+TEMPERATURE_BUCKET_BOUNDARIES = sorted(
+    {low - TEMPERATURE_TOLERANCE for low, _ in TEMPERATURE_RANGES.values()}
+    | {high + TEMPERATURE_TOLERANCE + TEMPERATURE_BUCKET_EPSILON for _, high in TEMPERATURE_RANGES.values()}
+    | {DEFAULT_TEMPERATURE_RANGE[0] - TEMPERATURE_TOLERANCE,
+       DEFAULT_TEMPERATURE_RANGE[1] + TEMPERATURE_TOLERANCE + TEMPERATURE_BUCKET_EPSILON}
+)
+
+
+def temperature_bucket(temperature: float) -> int:
+    """기온이 속한 구간 번호 (0 ~ len(경계)) 를 반환합니다. 경계값은 위쪽 구간에 속합니다."""
+    return bisect_right(TEMPERATURE_BUCKET_BOUNDARIES, temperature)
+
+
+def bucket_temperature(bucket: int) -> float:
+    """구간을 대표하는 기온을 반환합니다.
+
+    구간의 아래 경계를 사용합니다. 구간은 [high + TOL, high + TOL + ε) 처럼 한 점에 가까울 수 있으므로
+    중앙값은 그 구간의 실제 기온과 다른 아이템 집합을 고를 수 있습니다. 첫 구간은 첫 경계에서 1도 아래입니다.
+    """
+    boundaries = TEMPERATURE_BUCKET_BOUNDARIES
+    if bucket <= 0:
+        return boundaries[0] - 1.0
+    return boundaries[min(bucket, len(boundaries)) - 1]
+
+
+def temperature_buckets() -> range:
+    return range(len(TEMPERATURE_BUCKET_BOUNDARIES) + 1)
@@ -0,0 +1,203 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import and_, or_, update
+import threading
+import logging
+import time
+import uuid
+import os
+from app.models.models import db, UploadJob, WardrobeItem
+from .attribute_tagger import attribute_tagger, apply_tags
+from .image_pipeline import format_bbox
+from .outfit_composer import slot_of
+from .recommendation_service import RecommendationService, item_description, apply_item_embeddings
+from .wardrobe_cache import wardrobe_cache
+
+WARDROBE_UPLOAD_FOLDER = 'uploads/wardrobe'
+UPLOAD_WORKERS = int(os.environ.get('UPLOAD_WORKERS', 2))
+UPLOAD_MAX_ATTEMPTS = int(os.environ.get('UPLOAD_MAX_ATTEMPTS', 3))
+UPLOAD_RETRY_BASE_SECONDS = float(os.environ.get('UPLOAD_RETRY_BASE_SECONDS', 2))
+# processing 상태로 이 시간(초) 이상 갱신되지 않은 작업은 실행하던 프로세스가 중단된 것으로 보고 다시 가져옵니다.
+UPLOAD_LEASE_SECONDS = float(os.environ.get('UPLOAD_LEASE_SECONDS', 600))
+
+
+class NoClothingDetected(Exception):
+    """재시도해도 결과가 바뀌지 않는 실패 (의류 미검출)."""
+
+
+def detected_category(detection: Dict) -> Optional[str]:
+    """검출 결과에서 아이템에 저장할 카테고리를 고릅니다.
+
+    세부 카테고리 (반팔/긴팔/민소매 등) 는 여러 카테고리에 걸쳐 쓰이므로, 코디 슬롯이 검출 카테고리와
+    같을 때만 사용합니다. 예를 들어 반팔 원피스는 '반팔' (상의) 이 아니라 '원피스' 로 저장합니다.
+    """
+    category, subcategory = detection.get('category'), detection.get('subcategory')
+    if subcategory and (category is None or slot_of(subcategory) == slot_of(category)):
+        return subcategory
+    return category
+
+
+class UploadJobRunner:
+    """업로드된 의류 이미지의 감지/임베딩/DB 갱신을 백그라운드에서 처리합니다."""
+
+    def __init__(self, max_workers: int = UPLOAD_WORKERS, max_attempts: int = UPLOAD_MAX_ATTEMPTS,
+                 lease_seconds: float = UPLOAD_LEASE_SECONDS):
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.recommendation_service = RecommendationService()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='upload-job')
+        return self._executor
+
+    def create_job(self, user_id, item: WardrobeItem) -> UploadJob:
+        """아이템에 대한 작업 행을 만듭니다. 커밋 후 submit 을 호출해야 합니다."""
+        job = UploadJob(job_id=str(uuid.uuid4()), user_id=int(user_id), item_id=item.item_id,
+                        status='queued', attempts=0)
+        db.session.add(job)
+        return job
+
+    def submit(self, app, job_id: str, delay: float = 0):
+        """웹 프로세스의 작업 풀에서 실행합니다. 재시도는 같은 프로세스의 타이머로 예약됩니다."""
+        if delay > 0:
+            timer = threading.Timer(delay, self.submit, args=(app, job_id))
+            timer.daemon = True
+            timer.start()
+            return
+        self.executor.submit(self._run_in_pool, app, job_id)
+
+    def _run_in_pool(self, app, job_id: str):
+        delay = self._run(app, job_id)
+        if delay is not None:
+            self.submit(app, job_id, delay=delay)
+
+    def run_now(self, app, job_id: str):
+        """작업을 현재 스레드에서 끝날 때까지 실행합니다. 재시도도 이 스레드에서 기다렸다가 수행합니다 (CLI 용)."""
+        delay = self._run(app, job_id)
+        while delay is not None:
+            time.sleep(delay)
+            delay = self._run(app, job_id)
+
+    def _run(self, app, job_id: str) -> Optional[float]:
+        """작업을 한 번 시도하고, 다시 시도해야 하면 대기 시간(초)을 반환합니다."""
+        with app.app_context():
+            try:
+                self._process(job_id)
+                return None
+            except Exception as e:
+                db.session.rollback()
+                return self._handle_failure(job_id, e)
+            finally:
+                db.session.remove()
+
+    def resumable(self):
+        """대기 중이거나, 처리 중으로 남은 채 임대 시간이 지난 작업을 고르는 조건."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        return or_(UploadJob.status == 'queued',
+                   and_(UploadJob.status == 'processing', UploadJob.updated_at < cutoff))
+
+    def _claim(self, job_id: str) -> bool:
+        """작업을 processing 으로 바꿔 가져옵니다. 다른 프로세스가 이미 처리 중이면 False 를 반환합니다."""
+        result = db.session.execute(update(UploadJob).where(UploadJob.job_id == job_id, self.resumable()).values(
+            status='processing', attempts=UploadJob.attempts + 1, updated_at=datetime.utcnow()
+        ).execution_options(synchronize_session=False))
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _process(self, job_id: str):
+        job = UploadJob.query.get(job_id)
+        if job is None or job.status not in ('queued', 'processing'):
+            return
+        item = WardrobeItem.query.get(job.item_id) if job.item_id else None
+        if item is None:
+            job.status = 'failed'
+            job.error = 'Item no longer exists'
+            db.session.commit()
+            return
+        if not self._claim(job_id):
+            logging.info(f"다른 프로세스가 처리 중인 업로드 작업은 건너뜁니다: {job_id}")
+            return
+
+        # 한 번의 디코드로 검출하고, 검출 영역 임베딩을 한 배치로 계산합니다.
+        detections = self.recommendation_service.analyze_image(self.local_image_path(item.image_path))
+        if not detections:
+            raise NoClothingDetected('No clothing items detected')
+        primary = detections[0]
+        if not item.category:
+            item.category = detected_category(primary)
+        # 비어 있는 카테고리/색상과 옷장 색상/계절 태그는 제로샷 태깅으로 채웁니다.
+        apply_tags(item, attribute_tagger.tag(primary['embedding']))
+
+        embeddings = self.recommendation_service.combine_item_embeddings(
+            primary['embedding'], item_description(item.name, item.category, item.color, item.brand)
+        )
+        apply_item_embeddings(item, embeddings)
+        item.crop_bbox = format_bbox(primary['bbox'])
+        job.status = 'done'
+        job.error = None
+        db.session.commit()
+        wardrobe_cache.patch_item(job.user_id, item)
+        logging.info(f"업로드 작업 완료: {job_id} (item {item.item_id})")
+
+    def _handle_failure(self, job_id: str, error: Exception) -> Optional[float]:
+        job = UploadJob.query.get(job_id)
+        if job is None:
+            return None
+        job.error = str(error)
+        if isinstance(error, NoClothingDetected):
+            # 의류가 없는 이미지는 원래 동작처럼 아이템을 남기지 않습니다.
+            item = WardrobeItem.query.get(job.item_id) if job.item_id else None
+            if item is not None:
+                wardrobe_cache.remove_item(job.user_id, item.item_id)
+                db.session.delete(item)
+            job.item_id = None
+            job.status = 'failed'
+        elif job.attempts < self.max_attempts:
+            job.status = 'queued'
+        else:
+            job.status = 'failed'
+        db.session.commit()
+        if job.status == 'queued':
+            delay = UPLOAD_RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+            logging.warning(f"업로드 작업 실패, {delay:.0f}초 후 재시도: {job_id} ({error})")
+            return delay
+        logging.error(f"업로드 작업 최종 실패: {job_id} ({error})")
+        return None
+
+    def retry(self, app, job: UploadJob):
+        """실패한 작업을 다시 대기열에 넣습니다. 시도 횟수는 초기화됩니다."""
+        job.status = 'queued'
+        job.attempts = 0
+        job.error = None
+        db.session.commit()
+        self.submit(app, job.job_id)
+
+    @staticmethod
+    def local_image_path(image_path: str) -> str:
+        # DB 에는 웹 경로(/uploads/<파일>)가 저장되므로 실제 저장 위치로 변환합니다.
+        return os.path.join(WARDROBE_UPLOAD_FOLDER, os.path.basename(image_path or ''))
+
+    @staticmethod
+    def serialize(job: UploadJob) -> Dict:
+        return {
+            'job_id': job.job_id,
+            'status': job.status,
+            'attempts': job.attempts,
+            'error': job.error,
+            'item_id': job.item_id,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'updated_at': job.updated_at.isoformat() if job.updated_at else None,
+        }
+
+
+# 프로세스 단위 업로드 작업 실행기
+upload_job_runner = UploadJobRunner()
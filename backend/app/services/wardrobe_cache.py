@@ -0,0 +1,185 @@
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from collections import OrderedDict
+import threading
+import logging
+import time
+import os
+from .embedding_codec import decode_embedding
+from .ranking import stack_item_embeddings
+from .temperature import item_temperature_range, TEMPERATURE_TOLERANCE
+
+CACHE_MAX_BYTES = int(float(os.environ.get('WARDROBE_CACHE_MAX_MB', 256)) * 2**20)
+CACHE_TTL_SECONDS = float(os.environ.get('WARDROBE_CACHE_TTL', 600))
+
+
+def wardrobe_item_record(item) -> Dict:
+    """WardrobeItem 행을 추천에 사용하는 dict 로 변환합니다."""
+    return {
+        'id': item.item_id,
+        'image_path': item.image_path,
+        'metadata': {
+            'name': item.name,
+            'category': item.category,
+            'color': item.color,
+            'brand': item.brand,
+        },
+        'temperature_range': item_temperature_range(item),
+        'created_at': item.created_at,
+        'image_embedding': decode_embedding(item.image_embedding),
+        'text_embedding': decode_embedding(item.text_embedding),
+        'combined_embedding': decode_embedding(item.combined_embedding),
+    }
+
+
+class WardrobeSnapshot:
+    """한 사용자의 옷장을 연속된 임베딩 행렬과 메타데이터 배열로 보관합니다.
+
+    스냅샷은 불변으로 취급하며, 변경이 필요하면 새 스냅샷을 만듭니다.
+    """
+
+    def __init__(self, records: List[Dict]):
+        self.records = records
+        self.item_ids = np.array([r['id'] for r in records], dtype=np.int64)
+        self.matrix, self.valid = stack_item_embeddings(records, 'combined_embedding')
+        ranges = np.array([r['temperature_range'] for r in records], dtype=np.float32).reshape(-1, 2)
+        self.temp_min = ranges[:, 0]
+        self.temp_max = ranges[:, 1]
+        self.loaded_at = time.monotonic()
+        # 로드 직전에 읽은 공유 옷장 버전 (result_cache.versions). 버전 없이 로드했으면 None.
+        self.version = None
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def nbytes(self) -> int:
+        # 메타데이터 dict 는 대략 항목당 1KB 로 추정합니다.
+        arrays = (self.item_ids, self.matrix, self.valid, self.temp_min, self.temp_max)
+        return sum(a.nbytes for a in arrays) + len(self.records) * 1024
+
+    def temperature_mask(self, current_temp: float, tolerance: float = TEMPERATURE_TOLERANCE) -> np.ndarray:
+        """현재 기온에 착용 가능한 항목의 불리언 마스크를 반환합니다."""
+        return (self.temp_min - tolerance <= current_temp) & (current_temp <= self.temp_max + tolerance)
+
+    def _derive(self, records: List[Dict]) -> 'WardrobeSnapshot':
+        # 부분 갱신은 TTL 을 연장하지 않도록 원래 로드 시각을 유지합니다.
+        snapshot = WardrobeSnapshot(records)
+        snapshot.loaded_at = self.loaded_at
+        snapshot.version = self.version
+        return snapshot
+
+    def with_record(self, record: Dict) -> 'WardrobeSnapshot':
+        records = [r for r in self.records if r['id'] != record['id']]
+        records.append(record)
+        return self._derive(records)
+
+    def without_item(self, item_id: int) -> 'WardrobeSnapshot':
+        return self._derive([r for r in self.records if r['id'] != item_id])
+
+
+class WardrobeMatrixCache:
+    """사용자별 WardrobeSnapshot 을 보관하는 메모리 예산 기반 LRU 캐시."""
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES, ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, snapshot: WardrobeSnapshot, version: Optional[int] = None) -> bool:
+        if version is not None and (snapshot.version is None or snapshot.version < version):
+            return True
+        return time.monotonic() - snapshot.loaded_at > self.ttl_seconds
+
+    def _drop(self, user_id: int):
+        old = self._entries.pop(user_id, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+
+    def _put(self, user_id: int, snapshot: WardrobeSnapshot):
+        self._drop(user_id)
+        if snapshot.nbytes > self.max_bytes:
+            return
+        self._entries[user_id] = snapshot
+        self._bytes += snapshot.nbytes
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def peek(self, user_id) -> Optional[WardrobeSnapshot]:
+        with self._lock:
+            snapshot = self._entries.get(int(user_id))
+            if snapshot is None or self._expired(snapshot):
+                return None
+            return snapshot
+
+    def get(self, user_id, loader: Callable[[int], WardrobeSnapshot],
+            version: Optional[int] = None) -> WardrobeSnapshot:
+        """version 을 주면 그보다 오래된 버전에서 로드된 스냅샷은 만료된 것으로 보고 다시 로드합니다."""
+        user_id = int(user_id)
+        with self._lock:
+            snapshot = self._entries.get(user_id)
+            if snapshot is not None and not self._expired(snapshot, version):
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+        # DB 조회는 락 밖에서 수행합니다.
+        snapshot = loader(user_id)
+        snapshot.version = version
+        with self._lock:
+            self._put(user_id, snapshot)
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._drop(int(user_id))
+
+    def patch_item(self, user_id, item):
+        """추가/수정된 아이템을 캐시된 스냅샷에 반영합니다. 캐시가 없으면 아무것도 하지 않습니다."""
+        user_id = int(user_id)
+        with self._lock:
+            if user_id not in self._entries:
+                return
+        # 커밋으로 만료된 아이템을 읽으면 DB 조회와 임베딩 디코드가 일어나므로 레코드는 락 밖에서 만듭니다.
+        try:
+            record = wardrobe_item_record(item)
+        except Exception as e:
+            logging.warning(f"옷장 캐시 갱신 실패, 무효화합니다: {e}")
+            self.invalidate(user_id)
+            return
+        with self._lock:
+            snapshot = self._entries.get(user_id)
+            if snapshot is None:
+                return
+            self._put(user_id, snapshot.with_record(record))
+
+    def remove_item(self, user_id, item_id: int):
+        user_id = int(user_id)
+        with self._lock:
+            snapshot = self._entries.get(user_id)
+            if snapshot is None:
+                return
+            self._put(user_id, snapshot.without_item(item_id))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# 프로세스 단위 옷장 캐시
+wardrobe_cache = WardrobeMatrixCache()
@@ -0,0 +1,354 @@
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Iterable, Optional, Tuple
+from datetime import datetime, timezone
+from sqlalchemy import insert
+import threading
+import logging
+import time
+import os
+from app.models.models import db, Weather
+from .circuit_breaker import CircuitBreaker
+from . import weather_fallback
+
+OPENWEATHER_BASE_URL = os.environ.get('OPENWEATHER_BASE_URL', 'https://api.openweathermap.org/data/2.5')
+WEATHER_CACHE_TTL = float(os.environ.get('WEATHER_CACHE_TTL', 600))
+# 5일/3시간 예보는 3시간마다 갱신되므로 현재 날씨보다 길게 캐시합니다.
+WEATHER_FORECAST_TTL = float(os.environ.get('WEATHER_FORECAST_TTL', 3 * 3600))
+# 좌표는 이 간격(도)의 격자 타일로 묶어 캐시합니다. 0.1도 ≈ 11km.
+WEATHER_GRID_DEGREES = float(os.environ.get('WEATHER_GRID_DEGREES', 0.1))
+WEATHER_CONNECT_TIMEOUT = float(os.environ.get('WEATHER_CONNECT_TIMEOUT', 3))
+WEATHER_READ_TIMEOUT = float(os.environ.get('WEATHER_READ_TIMEOUT', 5))
+WEATHER_RETRIES = int(os.environ.get('WEATHER_RETRIES', 2))
+WEATHER_POOL_SIZE = int(os.environ.get('WEATHER_POOL_SIZE', 16))
+# 갱신이 진행 중이면 이 시간(초)까지 만료된 관측값을 대신 반환합니다.
+WEATHER_MAX_STALE = float(os.environ.get('WEATHER_MAX_STALE', 3 * WEATHER_CACHE_TTL))
+# 연속 실패가 이 횟수에 이르면 WEATHER_BREAKER_RESET 초 동안 API 를 호출하지 않습니다.
+WEATHER_BREAKER_THRESHOLD = int(os.environ.get('WEATHER_BREAKER_THRESHOLD', 5))
+WEATHER_BREAKER_RESET = float(os.environ.get('WEATHER_BREAKER_RESET', 30))
+# 캐시 항목(도시/타일/예보)과 키별 락은 이 개수를 넘으면 가장 오래 쓰지 않은 것부터 버립니다.
+WEATHER_CACHE_MAX_ENTRIES = int(os.environ.get('WEATHER_CACHE_MAX_ENTRIES', 10000))
+
+CacheKey = Tuple
+
+
+class UnknownCity(LookupError):
+    """날씨 제공자가 404 로 답한 도시. 장애가 아니므로 대체 날씨로 감추지 않습니다."""
+
+
+def city_key(city_name: str) -> CacheKey:
+    return ('city', city_name.strip().lower())
+
+
+def forecast_key(city_name: str) -> CacheKey:
+    return ('forecast', city_name.strip().lower())
+
+
+def daily_forecast(data: Dict) -> Dict[str, Dict]:
+    """5일/3시간 예보 응답을 현지 날짜별 {'YYYY-MM-DD': {temperature, temp_min, temp_max, weather}} 로 묶습니다."""
+    offset = data.get('city', {}).get('timezone', 0)
+    grouped = {}
+    for entry in data['list']:
+        day = datetime.fromtimestamp(entry['dt'] + offset, timezone.utc).date().isoformat()
+        grouped.setdefault(day, []).append(entry)
+    days = {}
+    for day, entries in grouped.items():
+        temperatures = [entry['main']['temp'] for entry in entries]
+        conditions = Counter(entry['weather'][0]['main'] for entry in entries)
+        days[day] = {
+            'city': data.get('city', {}).get('name'),
+            'temperature': round(sum(temperatures) / len(temperatures), 1),
+            'temp_min': min(entry['main'].get('temp_min', entry['main']['temp']) for entry in entries),
+            'temp_max': max(entry['main'].get('temp_max', entry['main']['temp']) for entry in entries),
+            'weather': conditions.most_common(1)[0][0],
+            'degraded': False,
+            'source': 'forecast',
+        }
+    return days
+
+
+def tile_key(latitude: float, longitude: float, grid: float = WEATHER_GRID_DEGREES) -> CacheKey:
+    return ('tile', round(float(latitude) / grid), round(float(longitude) / grid))
+
+
+class WeatherClient:
+    """OpenWeatherMap 현재 날씨 클라이언트.
+
+    도시 이름 또는 좌표 격자 타일 단위로 TTL 캐시하며, 같은 키의 동시 요청은 한 번만 호출합니다.
+    연결은 재시도/타임아웃이 설정된 requests.Session 으로 재사용하고, 받은 관측값은 Weather 테이블에 기록합니다.
+    API 가 연속으로 실패하면 서킷 브레이커가 열려 호출 없이 바로 None 을 반환합니다.
+    제공자가 도시를 모른다고 (404) 답하면 None 대신 UnknownCity 를 발생시킵니다.
+    """
+
+    def __init__(self, base_url: str = OPENWEATHER_BASE_URL, ttl_seconds: float = WEATHER_CACHE_TTL,
+                 grid_degrees: float = WEATHER_GRID_DEGREES, forecast_ttl_seconds: float = WEATHER_FORECAST_TTL,
+                 max_entries: int = WEATHER_CACHE_MAX_ENTRIES):
+        self.base_url = base_url.rstrip('/')
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.forecast_ttl_seconds = forecast_ttl_seconds
+        self.grid_degrees = grid_degrees
+        self.timeout = (WEATHER_CONNECT_TIMEOUT, WEATHER_READ_TIMEOUT)
+        self.session = requests.Session()
+        retry = Retry(total=WEATHER_RETRIES, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(['GET']), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=WEATHER_POOL_SIZE, pool_maxsize=WEATHER_POOL_SIZE, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.breaker = CircuitBreaker('openweathermap', WEATHER_BREAKER_THRESHOLD, WEATHER_BREAKER_RESET)
+        self.max_stale_seconds = WEATHER_MAX_STALE
+        self._entries: 'OrderedDict[CacheKey, Tuple[Dict, float]]' = OrderedDict()
+        self._key_locks: 'OrderedDict[CacheKey, threading.Lock]' = OrderedDict()
+        # 프리페처가 켜져 있을 때만 최근 요청된 키와 조회 파라미터를 기록합니다.
+        self.track_requests = False
+        self._requested: Dict[CacheKey, Tuple[Dict, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self.upstream_calls = 0
+        self.errors = 0
+        self.degraded_served = 0
+        self.evictions = 0
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return os.environ.get('OPENWEATHER_API_KEY')
+
+    def by_city(self, city_name: str) -> Optional[Dict]:
+        return self._get(city_key(city_name), {'q': city_name})
+
+    def by_coordinates(self, latitude: float, longitude: float) -> Optional[Dict]:
+        key = tile_key(latitude, longitude, self.grid_degrees)
+        # 같은 타일의 요청은 타일 중심 좌표로 조회해 결과가 요청 순서와 무관하게 같도록 합니다.
+        return self._get(key, {'lat': round(key[1] * self.grid_degrees, 4), 'lon': round(key[2] * self.grid_degrees, 4)})
+
+    def forecast_by_city(self, city_name: str) -> Optional[Dict[str, Dict]]:
+        """도시의 날짜별 예보. 같은 도시의 동시 요청은 한 번만 호출하고, 실패하면 None 을 반환합니다."""
+        key = forecast_key(city_name)
+        days = self._fresh(key, self.forecast_ttl_seconds)
+        if days is not None:
+            self.hits += 1
+            return days
+        with self._key_lock(key):
+            days = self._fresh(key, self.forecast_ttl_seconds)
+            if days is not None:
+                self.hits += 1
+                return days
+            self.misses += 1
+            data = self._request('forecast', {'q': city_name})
+            if data is None:
+                return None
+            try:
+                days = daily_forecast(data)
+            except (KeyError, IndexError, TypeError) as e:
+                self.errors += 1
+                logging.error(f"예보 데이터 해석 실패: {e}")
+                return None
+            self._store(key, days)
+            return days
+
+    def forecasts(self, city_names: Iterable[str]) -> Dict[str, Optional[Dict[str, Dict]]]:
+        """여러 도시의 예보를 동시에 조회합니다. 같은 도시는 한 번만 조회합니다."""
+        names = list(dict.fromkeys(city_names))
+        if len(names) <= 1:
+            return {name: self.forecast_by_city(name) for name in names}
+        with ThreadPoolExecutor(max_workers=min(len(names), WEATHER_POOL_SIZE)) as executor:
+            return dict(zip(names, executor.map(self.forecast_by_city, names)))
+
+    def by_city_or_fallback(self, city_name: str) -> Dict:
+        """제공자 장애 (서킷 열림, 5xx, 429, 타임아웃) 로 현재 날씨를 못 받으면
+        마지막 관측값/최근 기록/평년값으로 대체합니다 ('degraded': True). 없는 도시는 UnknownCity 를 발생시킵니다.
+        """
+        observation = self.by_city(city_name)
+        if observation is not None:
+            return observation
+        key = city_key(city_name)
+        self.degraded_served += 1
+        return weather_fallback.fallback_for_city(city_name, self.cached(key), self._age(key))
+
+    def by_coordinates_or_fallback(self, latitude: float, longitude: float) -> Dict:
+        observation = self.by_coordinates(latitude, longitude)
+        if observation is not None:
+            return observation
+        key = tile_key(latitude, longitude, self.grid_degrees)
+        self.degraded_served += 1
+        return weather_fallback.fallback_for_coordinates(latitude, longitude, self.cached(key), self._age(key))
+
+    def _age(self, key: CacheKey) -> float:
+        entry = self.cached(key)
+        return time.monotonic() - entry[1] if entry is not None else float('inf')
+
+    def cached(self, key: CacheKey) -> Optional[Tuple[Dict, float]]:
+        """만료 여부와 관계없이 (관측값, 받아온 시각 monotonic) 을 반환합니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: CacheKey, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _fresh(self, key: CacheKey, ttl_seconds: Optional[float] = None) -> Optional[Dict]:
+        entry = self.cached(key)
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if entry is not None and time.monotonic() - entry[1] <= ttl_seconds:
+            return entry[0]
+        return None
+
+    def _key_lock(self, key: CacheKey) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            self._key_locks.move_to_end(key)
+            if len(self._key_locks) > self.max_entries:
+                # 잡혀 있는 락은 남겨 둡니다. 잡히기 직전의 락이 버려지면 같은 키를 한 번 더 조회할 뿐입니다.
+                excess = len(self._key_locks) - self.max_entries
+                idle = [k for k, held in self._key_locks.items() if k != key and not held.locked()]
+                for old_key in idle[:excess]:
+                    del self._key_locks[old_key]
+            return lock
+
+    def tracked(self) -> Dict[CacheKey, Tuple[Dict, float]]:
+        """최근 요청된 키 -> (조회 파라미터, 마지막 요청 시각 monotonic)."""
+        with self._lock:
+            return dict(self._requested)
+
+    def untrack(self, key: CacheKey):
+        with self._lock:
+            self._requested.pop(key, None)
+
+    def _get(self, key: CacheKey, params: Dict) -> Optional[Dict]:
+        if self.track_requests:
+            with self._lock:
+                self._requested[key] = (params, time.monotonic())
+        observation = self._fresh(key)
+        if observation is not None:
+            self.hits += 1
+            return observation
+        lock = self._key_lock(key)
+        if not lock.acquire(blocking=False):
+            # 다른 요청이나 프리페처가 갱신 중이면 기다리지 않고 직전 값을 반환합니다.
+            entry = self.cached(key)
+            if entry is not None and time.monotonic() - entry[1] <= self.max_stale_seconds:
+                self.stale_served += 1
+                return entry[0]
+            lock.acquire()
+        try:
+            # 같은 키를 기다리던 요청은 앞선 요청의 결과를 그대로 사용합니다.
+            observation = self._fresh(key)
+            if observation is not None:
+                self.hits += 1
+                return observation
+            self.misses += 1
+            return self.refresh(key, params)
+        finally:
+            lock.release()
+
+    def revalidate(self, key: CacheKey, params: Dict) -> Tuple[bool, Optional[Dict]]:
+        """이미 갱신 중인 키가 아니면 다시 조회합니다 (프리페처용). (시도 여부, 관측값) 을 반환합니다."""
+        lock = self._key_lock(key)
+        if not lock.acquire(blocking=False):
+            return False, None
+        try:
+            return True, self.refresh(key, params)
+        finally:
+            lock.release()
+
+    def refresh(self, key: CacheKey, params: Dict) -> Optional[Dict]:
+        """캐시와 관계없이 API 를 호출해 캐시를 갱신합니다. 실패하면 None 을 반환합니다."""
+        observation = self._fetch(params)
+        if observation is None:
+            return None
+        self._store(key, observation)
+        self._record(observation)
+        return observation
+
+    def _request(self, path: str, params: Dict) -> Optional[Dict]:
+        """API 를 호출해 JSON 응답을 반환합니다. 실패하거나 서킷이 열려 있으면 None 을 반환하고,
+        없는 도시 (404) 는 UnknownCity 를 발생시킵니다.
+        """
+        if not self.api_key:
+            logging.error("OPENWEATHER_API_KEY 환경변수가 설정되어 있지 않습니다.")
+            return None
+        if not self.breaker.allow():
+            return None
+        self.upstream_calls += 1
+        try:
+            response = self.session.get(f'{self.base_url}/{path}',
+                                        params={**params, 'appid': self.api_key, 'units': 'metric'},
+                                        timeout=self.timeout)
+            if response.status_code != 200:
+                self.errors += 1
+                logging.error(f"날씨 API 호출 실패: {response.status_code} ({path} {params})")
+                # 없는 도시 등 요청 자체의 오류는 제공자 장애로 세지 않습니다.
+                if response.status_code == 429 or response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if response.status_code == 404:
+                    raise UnknownCity(params.get('q') or f"{params.get('lat')},{params.get('lon')}")
+                return None
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self.errors += 1
+            self.breaker.record_failure()
+            logging.error(f"날씨 데이터 로드 실패: {e}")
+            return None
+        self.breaker.record_success()
+        return data
+
+    def _fetch(self, params: Dict) -> Optional[Dict]:
+        data = self._request('weather', params)
+        if data is None:
+            return None
+        try:
+            return {
+                'city': data['name'],
+                'temperature': data['main']['temp'],
+                'weather': data['weather'][0]['main'],
+                'description': data['weather'][0]['description'],
+                'humidity': data['main']['humidity'],
+                'wind_speed': data.get('wind', {}).get('speed'),
+                'latitude': data.get('coord', {}).get('lat'),
+                'longitude': data.get('coord', {}).get('lon'),
+                'observed_at': datetime.utcnow().isoformat(),
+            }
+        except (KeyError, IndexError, TypeError) as e:
+            self.errors += 1
+            logging.error(f"날씨 데이터 해석 실패: {e}")
+            return None
+
+    def _record(self, observation: Dict):
+        # 요청 중인 세션의 트랜잭션과 섞이지 않도록 별도 연결에서 바로 커밋합니다.
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(Weather.__table__).values(
+                    city_name=observation['city'][:50],
+                    temperature=observation['temperature'],
+                    description=(observation['description'] or '')[:100],
+                    observed_at=datetime.fromisoformat(observation['observed_at']),
+                ))
+        except Exception as e:
+            logging.warning(f"날씨 관측 기록 실패: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = len(self._entries)
+        return {'entries': entries, 'max_entries': self.max_entries, 'evictions': self.evictions, 'hits': self.hits, 'misses': self.misses, 'stale_served': self.stale_served,
+                'upstream_calls': self.upstream_calls, 'errors': self.errors, 'degraded_served': self.degraded_served,
+                'ttl_seconds': self.ttl_seconds, 'breaker': self.breaker.stats()}
+
+
+# 프로세스 단위 날씨 클라이언트
+weather_client = WeatherClient()
@@ -0,0 +1,112 @@
+from typing import Dict, Optional, Tuple
+from datetime import datetime, timedelta
+import math
+import logging
+import os
+from app.models.models import Weather
+
+# 이 시간(초) 이내의 관측값만 '최근 기온' 으로 사용하고, 그보다 오래되면 평년값을 사용합니다.
+WEATHER_FALLBACK_MAX_AGE = float(os.environ.get('WEATHER_FALLBACK_MAX_AGE', 24 * 3600))
+DEFAULT_CLIMATOLOGY_CITY = 'Seoul'
+
+# 도시별 (위도, 경도, 1~12월 평균 기온 °C) - 기상청 평년값(1991~2020) 을 반올림한 값
+CLIMATOLOGY = {
+    'Seoul': (37.57, 126.98, (-2.0, 0.6, 5.8, 12.2, 17.6, 22.1, 24.9, 25.7, 21.2, 14.8, 7.2, 0.4)),
+    'Incheon': (37.46, 126.71, (-1.5, 0.6, 5.4, 11.1, 16.3, 20.6, 24.0, 25.4, 21.4, 15.2, 7.9, 1.0)),
+    'Daejeon': (36.35, 127.38, (-1.0, 1.3, 6.5, 12.7, 18.1, 22.5, 25.4, 25.9, 21.0, 14.3, 7.1, 0.8)),
+    'Daegu': (35.87, 128.60, (0.6, 3.2, 8.3, 14.3, 19.4, 23.3, 26.4, 26.8, 22.0, 15.8, 8.7, 2.3)),
+    'Gwangju': (35.16, 126.85, (0.6, 2.6, 7.4, 13.3, 18.7, 22.9, 26.2, 26.8, 22.5, 16.1, 9.3, 2.8)),
+    'Ulsan': (35.54, 129.31, (2.2, 4.2, 8.4, 13.7, 18.1, 21.5, 25.1, 26.2, 21.9, 16.6, 10.2, 4.2)),
+    'Busan': (35.18, 129.08, (3.6, 5.3, 9.0, 13.7, 17.9, 21.1, 24.6, 26.1, 22.6, 18.1, 11.9, 5.9)),
+    'Jeju': (33.50, 126.53, (6.1, 7.0, 9.9, 14.2, 18.2, 21.6, 25.8, 27.2, 23.9, 19.2, 13.7, 8.6)),
+}
+CITY_ALIASES = {
+    '서울': 'Seoul', '인천': 'Incheon', '대전': 'Daejeon', '대구': 'Daegu', '광주': 'Gwangju',
+    '울산': 'Ulsan', '부산': 'Busan', '제주': 'Jeju', 'jeju city': 'Jeju',
+}
+
+
+def resolve_city(city_name: Optional[str]) -> Optional[str]:
+    if not city_name:
+        return None
+    name = city_name.strip()
+    for candidate in CLIMATOLOGY:
+        if candidate.lower() == name.lower():
+            return candidate
+    return CITY_ALIASES.get(name) or CITY_ALIASES.get(name.lower())
+
+
+def nearest_city(latitude: float, longitude: float) -> str:
+    def distance(city):
+        lat, lon, _ = CLIMATOLOGY[city]
+        return math.hypot(lat - float(latitude), (lon - float(longitude)) * math.cos(math.radians(lat)))
+    return min(CLIMATOLOGY, key=distance)
+
+
+def _degraded(city: str, temperature: float, source: str, description: str) -> Dict:
+    return {
+        'city': city,
+        'temperature': temperature,
+        'weather': None,
+        'description': description,
+        'humidity': None,
+        'wind_speed': None,
+        'degraded': True,
+        'source': source,
+    }
+
+
+def climatology(city_name: Optional[str], month: Optional[int] = None) -> Optional[Dict]:
+    """도시의 월 평년 기온. 평년값 표에 없는 도시는 None 을 반환합니다."""
+    city = resolve_city(city_name)
+    if city is None:
+        return None
+    month = month or datetime.now().month
+    return _degraded(city_name, CLIMATOLOGY[city][2][month - 1], 'climatology', 'seasonal average')
+
+
+def default_climatology(city_name: Optional[str], month: Optional[int] = None) -> Dict:
+    """평년값 표에 없는 (제공자는 아는) 도시용 마지막 대체값. DEFAULT_CLIMATOLOGY_CITY 의 평년 기온이며
+    source 가 'default_climatology' 로 구분됩니다."""
+    month = month or datetime.now().month
+    return _degraded(city_name or DEFAULT_CLIMATOLOGY_CITY, CLIMATOLOGY[DEFAULT_CLIMATOLOGY_CITY][2][month - 1],
+                     'default_climatology', 'seasonal average (default city)')
+
+
+def last_recorded(city_name: str, max_age_seconds: float = WEATHER_FALLBACK_MAX_AGE) -> Optional[Dict]:
+    """Weather 테이블에 기록된 해당 도시의 최근 관측값."""
+    try:
+        row = Weather.query.filter(
+            Weather.city_name == city_name,
+            Weather.observed_at >= datetime.utcnow() - timedelta(seconds=max_age_seconds),
+        ).order_by(Weather.observed_at.desc()).first()
+    except Exception as e:
+        logging.warning(f"최근 날씨 기록 조회 실패: {e}")
+        return None
+    if row is None:
+        return None
+    return _degraded(row.city_name, row.temperature, 'history', row.description)
+
+
+def from_cache_entry(entry: Optional[Tuple[Dict, float]], age_seconds: float,
+                     max_age_seconds: float = WEATHER_FALLBACK_MAX_AGE) -> Optional[Dict]:
+    if entry is None or age_seconds > max_age_seconds:
+        return None
+    observation = dict(entry[0])
+    observation.update({'degraded': True, 'source': 'last_known'})
+    return observation
+
+
+def fallback_for_city(city_name: str, entry: Optional[Tuple[Dict, float]], age_seconds: float) -> Dict:
+    """마지막 관측값 -> Weather 테이블 기록 -> 평년값 -> 기본 도시 평년값 순으로 대체 날씨를 만듭니다."""
+    return (from_cache_entry(entry, age_seconds)
+            or last_recorded(city_name)
+            or last_recorded(resolve_city(city_name) or city_name)
+            or climatology(city_name)
+            or default_climatology(city_name))
+
+
+def fallback_for_coordinates(latitude: float, longitude: float, entry: Optional[Tuple[Dict, float]],
+                             age_seconds: float) -> Dict:
+    city = nearest_city(latitude, longitude)
+    return from_cache_entry(entry, age_seconds) or last_recorded(city) or climatology(city)
@@ -0,0 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import deque
+from typing import Dict, Optional
+import numpy as np
+import threading
+import logging
+import time
+import os
+from .weather_client import weather_client, WeatherClient, CacheKey, UnknownCity
+
+WEATHER_PREFETCH_INTERVAL = float(os.environ.get('WEATHER_PREFETCH_INTERVAL', 15))
+# TTL 의 이 비율만큼 지난 항목을 만료 전에 미리 갱신합니다.
+WEATHER_PREFETCH_AHEAD_RATIO = float(os.environ.get('WEATHER_PREFETCH_AHEAD_RATIO', 0.8))
+# 이 시간(초) 동안 요청되지 않은 도시/타일은 더 이상 갱신하지 않습니다.
+WEATHER_PREFETCH_ACTIVE_WINDOW = float(os.environ.get('WEATHER_PREFETCH_ACTIVE_WINDOW', 3600))
+WEATHER_PREFETCH_WORKERS = int(os.environ.get('WEATHER_PREFETCH_WORKERS', 8))
+
+
+class WeatherPrefetcher:
+    """최근 요청된 도시/격자 타일의 날씨를 만료 전에 백그라운드에서 갱신합니다.
+
+    갱신 지연(lag)은 (갱신 완료 시각 - 이전 관측값 만료 시각) 으로, 음수면 만료 전에 갱신된 것입니다.
+    """
+
+    def __init__(self, client: WeatherClient = weather_client, interval: float = WEATHER_PREFETCH_INTERVAL,
+                 ahead_ratio: float = WEATHER_PREFETCH_AHEAD_RATIO,
+                 active_window: float = WEATHER_PREFETCH_ACTIVE_WINDOW, workers: int = WEATHER_PREFETCH_WORKERS):
+        self.client = client
+        self.interval = interval
+        self.ahead_ratio = ahead_ratio
+        self.active_window = active_window
+        self.workers = workers
+        self._app = None
+        self._thread = None
+        self._pid = None
+        self._executor = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._lags = deque(maxlen=500)
+        self.ticks = 0
+        self.refreshes = 0
+        self.failures = 0
+        self.last_tick_at = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    def start(self, app):
+        """프리페치 스레드를 시작합니다. fork 된 워커에서는 스레드를 새로 띄웁니다."""
+        with self._lock:
+            if self.running:
+                return
+            self._app = app
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='weather-prefetch')
+            self.client.track_requests = True
+            self._thread = threading.Thread(target=self._run, name='weather-prefetcher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self.client.track_requests = False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                logging.error(f"날씨 프리페치 실패: {e}")
+
+    def due_keys(self) -> Dict[CacheKey, Dict]:
+        """곧 만료되거나 이미 만료된, 최근 요청된 키와 조회 파라미터."""
+        now = time.monotonic()
+        refresh_after = self.client.ttl_seconds * self.ahead_ratio
+        due = {}
+        for key, (params, last_requested) in self.client.tracked().items():
+            if now - last_requested > self.active_window:
+                self.client.untrack(key)
+                continue
+            entry = self.client.cached(key)
+            if entry is None or now - entry[1] >= refresh_after:
+                due[key] = params
+        return due
+
+    def tick(self, timeout: Optional[float] = None) -> int:
+        """갱신 대상 키를 동시에 다시 조회하고, 갱신한 키 수를 반환합니다."""
+        due = self.due_keys()
+        self.ticks += 1
+        self.last_tick_at = time.time()
+        if not due:
+            return 0
+        executor = self._executor or ThreadPoolExecutor(max_workers=self.workers)
+        futures = [executor.submit(self._refresh, key, params) for key, params in due.items()]
+        done, _ = wait(futures, timeout=timeout)
+        if executor is not self._executor:
+            executor.shutdown(wait=False)
+        return sum(1 for f in done if f.result())
+
+    def _refresh(self, key: CacheKey, params: Dict) -> bool:
+        previous = self.client.cached(key)
+        with self._app.app_context():
+            try:
+                attempted, observation = self.client.revalidate(key, params)
+            except UnknownCity:
+                # 없는 도시는 다시 조회해도 같은 결과이므로 추적을 멈춥니다.
+                self.client.untrack(key)
+                return False
+        if observation is None:
+            # 요청 스레드가 이미 갱신 중인 키는 실패로 세지 않습니다.
+            if attempted:
+                self.failures += 1
+            return False
+        self.refreshes += 1
+        if previous is not None:
+            with self._lock:
+                self._lags.append(time.monotonic() - (previous[1] + self.client.ttl_seconds))
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lags = np.array(self._lags, dtype=np.float64)
+        return {
+            'running': self.running,
+            'tracked': len(self.client.tracked()),
+            'ticks': self.ticks,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'last_tick_at': self.last_tick_at,
+            'lag_seconds': {
+                'last': float(lags[-1]) if lags.size else None,
+                'p50': float(np.percentile(lags, 50)) if lags.size else None,
+                'p95': float(np.percentile(lags, 95)) if lags.size else None,
+                'max': float(lags.max()) if lags.size else None,
+                'late': int((lags > 0).sum()),
+            },
+        }
+
+
+# 프로세스 단위 날씨 프리페처
+weather_prefetcher = WeatherPrefetcher()
@@ -0,0 +1,32 @@
+"""add embeddings to wardrobe_item
+
+Revision ID: 3a7c1e9d52f4
+Revises: 140c8235b57a
+Create Date: 2026-10-18 10:12:41.208315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7c1e9d52f4'
+down_revision = '140c8235b57a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('wardrobe_item', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_embedding', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('text_embedding', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('combined_embedding', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('embedding_model', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('wardrobe_item', schema=None) as batch_op:
+        batch_op.drop_column('embedding_model')
+        batch_op.drop_column('combined_embedding')
+        batch_op.drop_column('text_embedding')
+        batch_op.drop_column('image_embedding')
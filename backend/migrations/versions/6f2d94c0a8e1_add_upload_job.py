@@ -0,0 +1,41 @@
+"""add upload_job
+
+Revision ID: 6f2d94c0a8e1
+Revises: b5e08d3f61a2
+Create Date: 2026-10-18 11:48:52.731046
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f2d94c0a8e1'
+down_revision = 'b5e08d3f61a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upload_job',
+    sa.Column('job_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['wardrobe_item.item_id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+    with op.batch_alter_table('upload_job', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_upload_job_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('upload_job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_upload_job_status'))
+
+    op.drop_table('upload_job')
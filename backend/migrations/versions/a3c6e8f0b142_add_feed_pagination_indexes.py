@@ -0,0 +1,28 @@
+"""add feed pagination indexes
+
+Revision ID: a3c6e8f0b142
+Revises: f5b1d8e4a627
+Create Date: 2026-10-18 19:02:47.581330
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c6e8f0b142'
+down_revision = 'f5b1d8e4a627'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('community_post', schema=None) as batch_op:
+        batch_op.create_index('ix_community_post_created_at_post_id', ['created_at', 'post_id'], unique=False)
+        batch_op.create_index('ix_community_post_user_created_at', ['user_id', 'created_at', 'post_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('community_post', schema=None) as batch_op:
+        batch_op.drop_index('ix_community_post_user_created_at')
+        batch_op.drop_index('ix_community_post_created_at_post_id')
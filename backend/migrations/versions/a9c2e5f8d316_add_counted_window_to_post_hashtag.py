@@ -0,0 +1,27 @@
+"""add counted window to post hashtag
+
+Revision ID: a9c2e5f8d316
+Revises: f3a7d1c9e284
+Create Date: 2026-10-18 22:31:07.264815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c2e5f8d316'
+down_revision = 'f3a7d1c9e284'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 기존 연결은 NULL 로 두어 삭제/수정 시 현재 트렌딩 점수에서 빼지 않습니다.
+    with op.batch_alter_table('post_hashtag', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('counted_window', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('post_hashtag', schema=None) as batch_op:
+        batch_op.drop_column('counted_window')
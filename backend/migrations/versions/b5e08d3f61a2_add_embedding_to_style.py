@@ -0,0 +1,28 @@
+"""add embedding to style
+
+Revision ID: b5e08d3f61a2
+Revises: 3a7c1e9d52f4
+Create Date: 2026-10-18 11:03:17.554902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e08d3f61a2'
+down_revision = '3a7c1e9d52f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('style', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('embedding', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('embedding_model', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('style', schema=None) as batch_op:
+        batch_op.drop_column('embedding_model')
+        batch_op.drop_column('embedding')
@@ -0,0 +1,43 @@
+"""add post search index
+
+Revision ID: b7d2f4a9c615
+Revises: a3c6e8f0b142
+Create Date: 2026-10-18 19:48:12.407356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2f4a9c615'
+down_revision = 'a3c6e8f0b142'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('post_token',
+    sa.Column('token', sa.String(length=50), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('term_frequency', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['community_post.post_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('token', 'post_id')
+    )
+    with op.batch_alter_table('post_token', schema=None) as batch_op:
+        batch_op.create_index('ix_post_token_post_id', ['post_id'], unique=False)
+
+    with op.batch_alter_table('post_hashtag', schema=None) as batch_op:
+        batch_op.create_index('ix_post_hashtag_hashtag_id', ['hashtag_id', 'post_id'], unique=False)
+
+    # 기존 게시글은 `flask community reindex` 로 색인합니다.
+
+
+def downgrade():
+    with op.batch_alter_table('post_hashtag', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_hashtag_hashtag_id')
+
+    with op.batch_alter_table('post_token', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_token_post_id')
+
+    op.drop_table('post_token')
@@ -0,0 +1,27 @@
+"""add crop bbox to wardrobe item
+
+Revision ID: c1d4e7a9b352
+Revises: a9c2e5f8d316
+Create Date: 2026-10-18 23:12:44.518302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1d4e7a9b352'
+down_revision = 'a9c2e5f8d316'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 기존 행은 NULL (이미지 전체) 로 두며, 다음 업로드 처리나 재시도 때 검출 영역이 기록됩니다.
+    with op.batch_alter_table('wardrobe_item', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('crop_bbox', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('wardrobe_item', schema=None) as batch_op:
+        batch_op.drop_column('crop_bbox')
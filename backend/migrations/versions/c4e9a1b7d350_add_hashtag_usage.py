@@ -0,0 +1,35 @@
+"""add hashtag usage
+
+Revision ID: c4e9a1b7d350
+Revises: b7d2f4a9c615
+Create Date: 2026-10-18 20:31:05.913642
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e9a1b7d350'
+down_revision = 'b7d2f4a9c615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('hashtag_usage',
+    sa.Column('hashtag_id', sa.Integer(), nullable=False),
+    sa.Column('window_start', sa.DateTime(), nullable=False),
+    sa.Column('use_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['hashtag_id'], ['hashtag.hashtag_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('hashtag_id', 'window_start')
+    )
+    with op.batch_alter_table('hashtag_usage', schema=None) as batch_op:
+        batch_op.create_index('ix_hashtag_usage_window_start', ['window_start'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('hashtag_usage', schema=None) as batch_op:
+        batch_op.drop_index('ix_hashtag_usage_window_start')
+
+    op.drop_table('hashtag_usage')
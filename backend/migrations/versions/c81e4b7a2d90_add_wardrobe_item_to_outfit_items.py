@@ -0,0 +1,35 @@
+"""add wardrobe_item_id to outfit_items
+
+Revision ID: c81e4b7a2d90
+Revises: 6f2d94c0a8e1
+Create Date: 2026-10-18 14:02:17.415836
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81e4b7a2d90'
+down_revision = '6f2d94c0a8e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('outfit_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('wardrobe_item_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_outfit_items_wardrobe_item_id', 'wardrobe_item',
+                                    ['wardrobe_item_id'], ['item_id'], ondelete='CASCADE')
+        batch_op.alter_column('clothing_id',
+               existing_type=sa.Integer(),
+               nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('outfit_items', schema=None) as batch_op:
+        batch_op.alter_column('clothing_id',
+               existing_type=sa.Integer(),
+               nullable=False)
+        batch_op.drop_constraint('fk_outfit_items_wardrobe_item_id', type_='foreignkey')
+        batch_op.drop_column('wardrobe_item_id')
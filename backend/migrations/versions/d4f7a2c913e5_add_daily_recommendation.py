@@ -0,0 +1,38 @@
+"""add daily_recommendation
+
+Revision ID: d4f7a2c913e5
+Revises: c81e4b7a2d90
+Create Date: 2026-10-18 15:26:40.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f7a2c913e5'
+down_revision = 'c81e4b7a2d90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_recommendation',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('temp_bucket', sa.Integer(), nullable=False),
+    sa.Column('item_ids', sa.LargeBinary(), nullable=False),
+    sa.Column('scores', sa.LargeBinary(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'temp_bucket')
+    )
+    with op.batch_alter_table('daily_recommendation', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_daily_recommendation_computed_at'), ['computed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('daily_recommendation', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_daily_recommendation_computed_at'))
+
+    op.drop_table('daily_recommendation')
@@ -0,0 +1,42 @@
+"""add like/comment counters to community post
+
+Revision ID: d8f3b6c2e471
+Revises: c4e9a1b7d350
+Create Date: 2026-10-18 21:14:38.720915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f3b6c2e471'
+down_revision = 'c4e9a1b7d350'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('community_post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    # 기존 게시글은 상관 서브쿼리 UPDATE 한 번으로 채웁니다.
+    community_post = sa.table('community_post',
+                              sa.column('post_id', sa.Integer),
+                              sa.column('like_count', sa.Integer),
+                              sa.column('comment_count', sa.Integer))
+    like = sa.table('like', sa.column('post_id', sa.Integer))
+    comment = sa.table('comment', sa.column('post_id', sa.Integer))
+    op.get_bind().execute(community_post.update().values(
+        like_count=sa.select(sa.func.count()).select_from(like)
+        .where(like.c.post_id == community_post.c.post_id).scalar_subquery(),
+        comment_count=sa.select(sa.func.count()).select_from(comment)
+        .where(comment.c.post_id == community_post.c.post_id).scalar_subquery(),
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('community_post', schema=None) as batch_op:
+        batch_op.drop_column('comment_count')
+        batch_op.drop_column('like_count')
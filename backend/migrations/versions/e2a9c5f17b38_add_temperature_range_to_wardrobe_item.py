@@ -0,0 +1,53 @@
+"""add temperature range to wardrobe_item
+
+Revision ID: e2a9c5f17b38
+Revises: d4f7a2c913e5
+Create Date: 2026-10-18 16:40:05.902713
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9c5f17b38'
+down_revision = 'd4f7a2c913e5'
+branch_labels = None
+depends_on = None
+
+# 이 마이그레이션 시점의 카테고리별 착용 기온 범위 (°C).
+# 이후 app.services.temperature 의 표가 바뀌어도 이 마이그레이션의 결과는 달라지지 않도록 고정해 둡니다.
+TEMPERATURE_RANGES = {
+    '패딩': (-10, 10), '코트': (0, 15), '자켓': (5, 20), '니트': (5, 25),
+    '맨투맨': (10, 25), '후드티': (10, 25), '셔츠': (15, 30), '티셔츠': (20, 35),
+    '반팔': (25, 40), '민소매': (25, 40), '청바지': (0, 35), '슬랙스': (10, 30),
+    '반바지': (20, 40), '치마': (15, 35), '운동화': (0, 40), '구두': (5, 35), '샌들': (20, 40),
+    '아우터': (-10, 20), '상의': (-10, 40), '하의': (-10, 40), '신발': (-10, 40),
+}
+DEFAULT_TEMPERATURE_RANGE = (10, 30)
+
+
+def upgrade():
+    with op.batch_alter_table('wardrobe_item', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('min_temp', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('max_temp', sa.Float(), nullable=True))
+        batch_op.create_index('ix_wardrobe_item_temperature', ['wardrobe_id', 'min_temp', 'max_temp'], unique=False)
+
+    # 기존 아이템은 카테고리별로 한 번씩 UPDATE 해서 채웁니다.
+    wardrobe_item = sa.table('wardrobe_item',
+                             sa.column('category', sa.String),
+                             sa.column('min_temp', sa.Float),
+                             sa.column('max_temp', sa.Float))
+    connection = op.get_bind()
+    categories = [row[0] for row in connection.execute(sa.select(wardrobe_item.c.category).distinct())]
+    for category in categories:
+        min_temp, max_temp = TEMPERATURE_RANGES.get(category, DEFAULT_TEMPERATURE_RANGE)
+        condition = wardrobe_item.c.category.is_(None) if category is None else wardrobe_item.c.category == category
+        connection.execute(wardrobe_item.update().where(condition).values(min_temp=min_temp, max_temp=max_temp))
+
+
+def downgrade():
+    with op.batch_alter_table('wardrobe_item', schema=None) as batch_op:
+        batch_op.drop_index('ix_wardrobe_item_temperature')
+        batch_op.drop_column('max_temp')
+        batch_op.drop_column('min_temp')
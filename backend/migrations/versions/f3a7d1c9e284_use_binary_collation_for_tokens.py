@@ -0,0 +1,37 @@
+"""use binary collation for post tokens and hashtags
+
+Revision ID: f3a7d1c9e284
+Revises: d8f3b6c2e471
+Create Date: 2026-10-18 22:05:51.318640
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a7d1c9e284'
+down_revision = 'd8f3b6c2e471'
+branch_labels = None
+depends_on = None
+
+
+# 기본 collation 은 대소문자/악센트를 구분하지 않아 'café' 와 'cafe' 같은 서로 다른 토큰이
+# 기본 키에서 충돌하므로, 토큰과 해시태그 문자열을 바이너리로 비교합니다. MySQL 에만 해당합니다.
+def upgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.alter_column('post_token', 'token', existing_type=sa.String(length=50),
+                    type_=mysql.VARCHAR(50, collation='utf8mb4_bin'), existing_nullable=False)
+    op.alter_column('hashtag', 'tag_text', existing_type=sa.String(length=50),
+                    type_=mysql.VARCHAR(50, collation='utf8mb4_bin'), existing_nullable=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.alter_column('hashtag', 'tag_text', existing_type=mysql.VARCHAR(50, collation='utf8mb4_bin'),
+                    type_=sa.String(length=50), existing_nullable=True)
+    op.alter_column('post_token', 'token', existing_type=mysql.VARCHAR(50, collation='utf8mb4_bin'),
+                    type_=sa.String(length=50), existing_nullable=False)
@@ -0,0 +1,28 @@
+"""add observed_at to weather
+
+Revision ID: f5b1d8e4a627
+Revises: e2a9c5f17b38
+Create Date: 2026-10-18 17:55:31.264019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5b1d8e4a627'
+down_revision = 'e2a9c5f17b38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('weather', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('observed_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_weather_city_observed_at', ['city_name', 'observed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('weather', schema=None) as batch_op:
+        batch_op.drop_index('ix_weather_city_observed_at')
+        batch_op.drop_column('observed_at')
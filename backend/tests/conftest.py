@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from sqlalchemy import event
+import json
+import threading
+import pytest
+from app.models.models import db
+from app.routes.community import community_bp
+from app.services.weather_client import WeatherClient
+
+
+@pytest.fixture
+def app():
+    """커뮤니티 블루프린트만 등록한 in-memory SQLite 앱."""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SECRET_KEY='test',
+        JWT_SECRET_KEY='test-jwt-secret-key-for-community-tests',
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    JWTManager(app)
+    db.init_app(app)
+    app.register_blueprint(community_bp, url_prefix='/api/community')
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    def make(user_id):
+        with app.app_context():
+            return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    return make
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+@pytest.fixture
+def count_queries(app):
+    """with count_queries() as counter: 블록 안에서 실행된 SQL 문 수를 셉니다."""
+    @contextmanager
+    def counting():
+        counter = QueryCounter()
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', counter)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, 'before_cursor_execute', counter)
+    return counting
+
+
+class FakeWeatherServer(ThreadingHTTPServer):
+    """/weather 요청 수를 세고 temperatures 의 기온을 돌려주는 OpenWeatherMap 대역.
+
+    statuses 에 도시 (좌표 조회는 "lat,lon") 별 HTTP 상태 코드를 넣으면 그 코드로 실패합니다.
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeWeatherHandler)
+        self.calls = 0
+        self.temperatures = {}
+        self.statuses = {}
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_port}'
+
+
+class FakeWeatherHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.calls += 1
+        query = parse_qs(urlparse(self.path).query)
+        city = query['q'][0] if 'q' in query else f"{query['lat'][0]},{query['lon'][0]}"
+        status = self.server.statuses.get(city, 200)
+        if status != 200:
+            body = json.dumps({'cod': str(status), 'message': 'error'}).encode()
+        else:
+            body = json.dumps({
+                'name': city,
+                'main': {'temp': self.server.temperatures.get(city, 20.0), 'humidity': 40},
+                'weather': [{'main': 'Clear', 'description': 'clear sky'}],
+                'wind': {'speed': 1.0},
+            }).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def weather_server():
+    server = FakeWeatherServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def weather_client(weather_server, monkeypatch):
+    monkeypatch.setenv('OPENWEATHER_API_KEY', 'test-key')
+    return WeatherClient(base_url=weather_server.url, ttl_seconds=600)
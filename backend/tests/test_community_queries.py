@@ -0,0 +1,59 @@
+import pytest
+from app.models.models import db, User, CommunityPost, Comment, Like
+
+# 커뮤니티 조회 API 의 SQL 문 수가 페이지 크기와 행 수에 관계없이 일정한지 확인합니다.
+FEED_QUERIES = 2  # 게시글 페이지 + 작성자 이름 IN 조회
+LIST_QUERIES = 1  # 조인 한 번
+
+
+def seed(app, post_count):
+    """사용자 1 이 post_count 개의 글을 쓰고, 모든 글에 다른 사용자와 함께 좋아요/댓글을 남깁니다."""
+    with app.app_context():
+        owner = User(username='owner', password='x')
+        others = [User(username=f'user{i}', password='x') for i in range(post_count)]
+        db.session.add_all([owner, *others])
+        db.session.flush()
+        for i, other in enumerate(others):
+            post = CommunityPost(user_id=owner.id if i % 2 == 0 else other.id,
+                                 description=f'post {i}', hashtag='ootd,daily')
+            db.session.add(post)
+            db.session.flush()
+            db.session.add_all([
+                Like(user_id=owner.id, post_id=post.post_id),
+                Like(user_id=other.id, post_id=post.post_id),
+                Comment(user_id=owner.id, post_id=post.post_id, content='nice'),
+                Comment(user_id=other.id, post_id=post.post_id, content='thanks'),
+            ])
+        db.session.commit()
+        first_post_id = db.session.query(db.func.min(CommunityPost.post_id)).scalar()
+        return owner.id, first_post_id
+
+
+@pytest.mark.parametrize('path', ['/posts', '/my_posts', '/my_likes'])
+@pytest.mark.parametrize('limit', [5, 25])
+def test_feed_query_count_is_constant(app, client, auth_headers, count_queries, path, limit):
+    owner_id, _ = seed(app, 60)
+    with count_queries() as counter:
+        response = client.get(f'/api/community{path}?limit={limit}', headers=auth_headers(owner_id))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['posts']) == limit
+    assert body['next_cursor']
+    assert counter.count == FEED_QUERIES
+
+
+@pytest.mark.parametrize('rows', [3, 30])
+def test_comment_and_like_lists_query_count_is_constant(app, client, auth_headers, count_queries, rows):
+    owner_id, first_post_id = seed(app, rows)
+    headers = auth_headers(owner_id)
+    expected = {
+        f'/comments/{first_post_id}': ('comments', 2),
+        '/my_comments': ('comments', rows),
+        '/my_like_details': ('like_details', 2 * ((rows + 1) // 2)),
+    }
+    for path, (key, size) in expected.items():
+        with count_queries() as counter:
+            response = client.get(f'/api/community{path}', headers=headers)
+        assert response.status_code == 200, path
+        assert len(response.get_json()[key]) == size, path
+        assert counter.count == LIST_QUERIES, path
@@ -0,0 +1,23 @@
+import pytest
+from app.services.inference_batcher import MicroBatcher
+
+
+def test_results_are_returned_in_order():
+    batcher = MicroBatcher('double', lambda payloads: [p * 2 for p in payloads], max_wait_ms=20, result_timeout=5)
+    assert batcher.map([1, 2, 3]) == [2, 4, 6]
+
+
+def test_short_result_list_fails_every_request():
+    batcher = MicroBatcher('short', lambda payloads: payloads[:-1], max_wait_ms=50, result_timeout=5)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match='결과 수 불일치'):
+            future.result(timeout=5)
+
+
+def test_failed_batch_fails_every_request():
+    def fail(payloads):
+        raise ValueError('model crashed')
+    batcher = MicroBatcher('fail', fail, result_timeout=5)
+    with pytest.raises(ValueError, match='model crashed'):
+        batcher(1)
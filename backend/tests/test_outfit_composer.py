@@ -0,0 +1,45 @@
+import numpy as np
+from app.services.outfit_composer import OutfitComposer
+from app.services.ranking import EMBEDDING_DIM
+from app.services.wardrobe_cache import WardrobeSnapshot
+
+
+def unit(*weights):
+    vec = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    vec[:len(weights)] = weights
+    return vec / np.linalg.norm(vec)
+
+
+def record(item_id, category, embedding):
+    return {'id': item_id, 'image_path': None, 'metadata': {'category': category},
+            'temperature_range': (-10, 40), 'created_at': None, 'combined_embedding': embedding}
+
+
+def wardrobe(dress_weight):
+    return WardrobeSnapshot([
+        record(1, '티셔츠', unit(1, 0, 0)),
+        record(2, '청바지', unit(1, 0.2, 0)),
+        record(3, '원피스', unit(dress_weight, 1, 0)),
+        record(4, '운동화', unit(1, 0.5, 0.5)),
+    ])
+
+
+def slots(outfit, snapshot):
+    return {item['slot']: snapshot.records[item['index']]['id'] for item in outfit['items']}
+
+
+def test_dress_replaces_top_and_bottom():
+    snapshot = wardrobe(dress_weight=0)
+    outfits = OutfitComposer().compose(snapshot, unit(0, 1, 0), n_outfits=5)
+    best = slots(outfits[0], snapshot)
+    assert best == {'원피스': 3, '신발': 4}
+    for outfit in outfits:
+        chosen = slots(outfit, snapshot)
+        assert not ('원피스' in chosen and ({'상의', '하의'} & chosen.keys()))
+
+
+def test_top_and_bottom_win_when_closer_to_style():
+    snapshot = wardrobe(dress_weight=0)
+    outfits = OutfitComposer().compose(snapshot, unit(1, 0, 0), n_outfits=5)
+    assert slots(outfits[0], snapshot) == {'상의': 1, '하의': 2, '신발': 4}
+    assert any('원피스' in slots(outfit, snapshot) for outfit in outfits)
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from app.services.temperature import (TEMPERATURE_RANGES, DEFAULT_TEMPERATURE_RANGE, TEMPERATURE_TOLERANCE,
+                                      temperature_bucket, bucket_temperature)
+
+RANGES = np.array(list(TEMPERATURE_RANGES.values()) + [DEFAULT_TEMPERATURE_RANGE], dtype=np.float32)
+
+
+def live_mask(temperature):
+    # WardrobeSnapshot.temperature_mask 와 같은 float32 비교
+    temperature = np.float32(temperature)
+    return (RANGES[:, 0] - TEMPERATURE_TOLERANCE <= temperature) & (temperature <= RANGES[:, 1] + TEMPERATURE_TOLERANCE)
+
+
+def test_bucket_representative_matches_live_mask():
+    # 관측 기온 해상도 (0.01°C) 로 전체 범위를 훑습니다.
+    for temperature in np.round(np.arange(-30, 60, 0.01), 2):
+        representative = bucket_temperature(temperature_bucket(float(temperature)))
+        assert (live_mask(temperature) == live_mask(representative)).all(), temperature
+
+
+@pytest.mark.parametrize('low, high', [(20, 35), (10, 30), (-10, 10)])
+def test_inclusive_edges_share_bucket_with_range(low, high):
+    upper = high + TEMPERATURE_TOLERANCE
+    lower = low - TEMPERATURE_TOLERANCE
+    # 경계 기온의 구간 대표값도 그 경계를 가진 아이템을 포함해야 합니다.
+    assert live_mask(bucket_temperature(temperature_bucket(upper)))[RANGES[:, 1] == high].all()
+    assert live_mask(bucket_temperature(temperature_bucket(lower)))[RANGES[:, 0] == low].all()
+    assert not live_mask(bucket_temperature(temperature_bucket(upper + 0.01)))[RANGES[:, 1] == high].any()
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from app.models.models import db, User, Wardrobe, WardrobeItem, UploadJob
+from app.services import upload_jobs
+from app.services.upload_jobs import UploadJobRunner, detected_category
+
+VECTOR = np.ones(512, dtype=np.float32) / np.sqrt(512)
+
+
+class FakeRecommendationService:
+    def __init__(self, detection):
+        self.detection = detection
+
+    def analyze_image(self, path):
+        return [{**self.detection, 'confidence': 0.9, 'bbox': [0, 0, 10, 10], 'embedding': VECTOR}]
+
+    def combine_item_embeddings(self, image_embedding, description):
+        return {'image_embedding': VECTOR, 'text_embedding': VECTOR, 'combined_embedding': VECTOR}
+
+
+@pytest.fixture
+def upload(app, monkeypatch):
+    monkeypatch.setattr(upload_jobs.attribute_tagger, 'tag',
+                        lambda embedding: {'category': '상의', 'color': 'black', 'seasons': ['여름']})
+
+    def run(detection):
+        runner = UploadJobRunner()
+        runner.recommendation_service = FakeRecommendationService(detection)
+        with app.app_context():
+            user = User(username='uploader', password='x')
+            db.session.add(user)
+            db.session.flush()
+            wardrobe = Wardrobe(user_id=user.id)
+            db.session.add(wardrobe)
+            db.session.flush()
+            item = WardrobeItem(wardrobe_id=wardrobe.wardrobe_id, name='new item', image_path='/uploads/x.jpg')
+            db.session.add(item)
+            db.session.flush()
+            job = runner.create_job(user.id, item)
+            db.session.commit()
+            item_id, job_id = item.item_id, job.job_id
+        runner.run_now(app, job_id)
+        with app.app_context():
+            return db.session.get(UploadJob, job_id).status, db.session.get(WardrobeItem, item_id)
+    return run
+
+
+def test_dress_detection_is_stored_as_dress(upload):
+    status, item = upload({'category': '원피스', 'subcategory': '반팔', 'label': 'short_sleeved_dress'})
+    assert status == 'done'
+    assert item.category == '원피스'
+    assert item.crop_bbox == '0,0,10,10'
+
+
+def test_detected_category_keeps_subcategory_within_the_same_slot():
+    assert detected_category({'category': '아우터', 'subcategory': '자켓'}) == '자켓'
+    assert detected_category({'category': '상의', 'subcategory': '반팔'}) == '반팔'
+    assert detected_category({'category': '원피스', 'subcategory': '민소매'}) == '원피스'
+    assert detected_category({'category': None, 'subcategory': None}) is None
@@ -0,0 +1,47 @@
+import pytest
+from app.services.weather_client import UnknownCity
+
+
+def test_unknown_city_is_not_degraded(app, weather_server, weather_client):
+    weather_server.statuses['Atlantis'] = 404
+    with app.app_context():
+        with pytest.raises(UnknownCity):
+            weather_client.by_city_or_fallback('Atlantis')
+    assert weather_client.degraded_served == 0
+    assert weather_client.breaker.stats()['state'] == 'closed'
+
+
+def test_provider_failure_falls_back_to_climatology(app, weather_server, weather_client):
+    weather_server.statuses['Seoul'] = 503
+    with app.app_context():
+        observation = weather_client.by_city_or_fallback('Seoul')
+    assert observation['degraded'] is True
+    assert observation['source'] == 'climatology'
+    assert weather_client.degraded_served == 1
+
+
+def test_provider_failure_for_city_without_climatology_is_marked_default(app, weather_server, weather_client):
+    weather_server.statuses['Lisbon'] = 503
+    with app.app_context():
+        observation = weather_client.by_city_or_fallback('Lisbon')
+    assert observation['city'] == 'Lisbon'
+    assert observation['source'] == 'default_climatology'
+
+
+def test_outfit_recommend_returns_404_for_unknown_location(app, client, auth_headers, weather_server, weather_client,
+                                                            monkeypatch):
+    from app.models.models import db, User
+    from app.routes import outfit
+    monkeypatch.setattr(outfit, 'weather_client', weather_client)
+    app.register_blueprint(outfit.outfit_bp, url_prefix='/api/outfit')
+    with app.app_context():
+        user = User(username='traveler', password='x')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    weather_server.statuses['37.5,127.0'] = 404
+
+    response = client.post('/api/outfit/recommend', json={'latitude': 37.5, 'longitude': 127.0},
+                           headers=auth_headers(user_id))
+    assert response.status_code == 404
+    assert weather_client.degraded_served == 0
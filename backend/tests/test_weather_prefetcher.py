@@ -0,0 +1,38 @@
+from app.services.weather_client import city_key
+from app.services.weather_prefetcher import WeatherPrefetcher
+
+
+def test_prefetch_refreshes_tracked_city_before_next_request(app, weather_server, weather_client):
+    # ahead_ratio=0 이면 추적 중인 키는 매 주기 갱신 대상입니다.
+    prefetcher = WeatherPrefetcher(weather_client, interval=60, ahead_ratio=0.0, workers=2)
+    prefetcher.start(app)
+    try:
+        with app.app_context():
+            assert weather_client.by_city('Seoul')['temperature'] == 20.0
+        assert weather_server.calls == 1
+
+        weather_server.temperatures['Seoul'] = 3.5
+        assert prefetcher.tick(timeout=5) == 1
+        assert weather_server.calls == 2
+        assert weather_client.cached(city_key('Seoul'))[0]['temperature'] == 3.5
+
+        with app.app_context():
+            observation = weather_client.by_city('Seoul')
+        assert observation['temperature'] == 3.5
+        assert weather_server.calls == 2
+        assert weather_client.upstream_calls == 2
+        assert prefetcher.stats()['refreshes'] == 1
+    finally:
+        prefetcher.stop()
+
+
+def test_prefetch_skips_keys_that_are_not_due(app, weather_server, weather_client):
+    prefetcher = WeatherPrefetcher(weather_client, interval=60, ahead_ratio=0.8, workers=2)
+    prefetcher.start(app)
+    try:
+        with app.app_context():
+            weather_client.by_city('Busan')
+        assert prefetcher.tick(timeout=5) == 0
+        assert weather_server.calls == 1
+    finally:
+        prefetcher.stop()
@@ -508,7 +508,7 @@ class _AddClothingStep3State extends State<AddClothingStep3> {
       print('응답 상태 코드: ${response.statusCode}');
       print('응답 데이터: $responseData');
 
-      if (response.statusCode == 201) {
+      if (response.statusCode == 201 || response.statusCode == 202) {
         if (mounted) {
           Navigator.popUntil(context, (route) => route.isFirst);
           ScaffoldMessenger.of(context).showSnackBar(
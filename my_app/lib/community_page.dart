@@ -15,23 +15,42 @@ class CommunityPage extends StatefulWidget {
 
 class _CommunityPageState extends State<CommunityPage> {
   final TextEditingController _searchController = TextEditingController();
+  final ScrollController _scrollController = ScrollController();
   List<Map<String, dynamic>> posts = [];
   bool isLoading = false;
+  bool isLoadingMore = false;
+  String? nextCursor; // 다음 페이지 커서 (null 이면 마지막 페이지)
+  String? currentQuery;
 
   @override
   void initState() {
     super.initState();
+    _scrollController.addListener(() {
+      // 목록 끝에 가까워지면 다음 페이지를 불러옵니다.
+      if (_scrollController.position.extentAfter < 500) {
+        fetchMorePosts();
+      }
+    });
     fetchPosts();
   }
 
+  @override
+  void dispose() {
+    _scrollController.dispose();
+    super.dispose();
+  }
+
+  Uri _postsUri({String? cursor}) {
+    final params = <String, String>{};
+    if (currentQuery != null && currentQuery!.isNotEmpty) params['query'] = currentQuery!;
+    if (cursor != null) params['cursor'] = cursor;
+    return Uri.parse('http://127.0.0.1:5000/api/community/posts').replace(queryParameters: params.isEmpty ? null : params);
+  }
+
   Future<void> fetchPosts({String? query}) async {
     setState(() { isLoading = true; });
-    String url = 'http://127.0.0.1:5000/api/community/posts';
-    if (query != null && query.trim().isNotEmpty) {
-      url += '?query=${Uri.encodeComponent(query.trim())}';
-    }
-    final uri = Uri.parse(url);
-    final response = await http.get(uri, headers: {
+    currentQuery = query?.trim();
+    final response = await http.get(_postsUri(), headers: {
       'Authorization': 'Bearer ${widget.token}',
     });
     if (response.statusCode == 200) {
@@ -39,6 +58,7 @@ class _CommunityPageState extends State<CommunityPage> {
       final decoded = data.isNotEmpty ? Map<String, dynamic>.from(jsonDecode(data)) : {};
       setState(() {
         posts = List<Map<String, dynamic>>.from(decoded['posts'] ?? []);
+        nextCursor = decoded['next_cursor'];
         isLoading = false;
       });
     } else {
@@ -46,6 +66,24 @@ class _CommunityPageState extends State<CommunityPage> {
     }
   }
 
+  Future<void> fetchMorePosts() async {
+    if (isLoading || isLoadingMore || nextCursor == null) return;
+    setState(() { isLoadingMore = true; });
+    final response = await http.get(_postsUri(cursor: nextCursor), headers: {
+      'Authorization': 'Bearer ${widget.token}',
+    });
+    if (response.statusCode == 200) {
+      final decoded = Map<String, dynamic>.from(jsonDecode(response.body));
+      setState(() {
+        posts.addAll(List<Map<String, dynamic>>.from(decoded['posts'] ?? []));
+        nextCursor = decoded['next_cursor'];
+        isLoadingMore = false;
+      });
+    } else {
+      setState(() { isLoadingMore = false; });
+    }
+  }
+
   // 삭제 API 함수 추가
   Future<void> _deletePost(int postId) async {
     final uri = Uri.parse('http://127.0.0.1:5000/api/community/post/$postId');
@@ -168,10 +206,17 @@ class _CommunityPageState extends State<CommunityPage> {
       body: isLoading
           ? const Center(child: CircularProgressIndicator())
           : RefreshIndicator(
-              onRefresh: fetchPosts,
+              onRefresh: () => fetchPosts(query: currentQuery),
               child: ListView.builder(
-                itemCount: posts.length,
+                controller: _scrollController,
+                itemCount: posts.length + (isLoadingMore ? 1 : 0),
                 itemBuilder: (context, idx) {
+                  if (idx == posts.length) {
+                    return const Padding(
+                      padding: EdgeInsets.all(16),
+                      child: Center(child: CircularProgressIndicator()),
+                    );
+                  }
                   final post = posts[idx];
                   final isMine = post['user_id'] == widget.userId;
                   return Column(
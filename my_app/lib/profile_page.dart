@@ -406,21 +406,41 @@ class DummyListPage extends StatefulWidget {
 }
 
 class _DummyListPageState extends State<DummyListPage> {
+  final ScrollController _scrollController = ScrollController();
   List<dynamic> items = [];
   bool isLoading = false;
+  bool isLoadingMore = false;
+  String? nextCursor; // 게시물 목록의 다음 페이지 커서 (null 이면 마지막 페이지)
   int likeCount = 0;
 
   @override
   void initState() {
     super.initState();
+    _scrollController.addListener(() {
+      // 목록 끝에 가까워지면 다음 페이지를 불러옵니다.
+      if (_scrollController.position.extentAfter < 500) {
+        fetchMore();
+      }
+    });
     fetchList();
   }
 
+  @override
+  void dispose() {
+    _scrollController.dispose();
+    super.dispose();
+  }
+
+  Uri _myPostsUri({String? cursor}) {
+    return Uri.parse('http://127.0.0.1:5000/api/community/my_posts')
+        .replace(queryParameters: cursor == null ? null : {'cursor': cursor});
+  }
+
   Future<void> fetchList() async {
     setState(() { isLoading = true; });
     String url = '';
     if (widget.title == '게시물') {
-      url = 'http://127.0.0.1:5000/api/community/my_posts';
+      url = _myPostsUri().toString();
     } else if (widget.title == '좋아요') {
       url = 'http://127.0.0.1:5000/api/community/my_like_details';
     } else if (widget.title == '내 아이템') {
@@ -444,6 +464,7 @@ class _DummyListPageState extends State<DummyListPage> {
           items = data['comments'] ?? [];
         } else {
           items = data['posts'] ?? [];
+          nextCursor = data['next_cursor'];
         }
         isLoading = false;
       });
@@ -452,6 +473,25 @@ class _DummyListPageState extends State<DummyListPage> {
     }
   }
 
+  // 게시물 목록은 페이지 단위로 내려오므로 next_cursor 를 따라 이어서 불러옵니다.
+  Future<void> fetchMore() async {
+    if (widget.title != '게시물' || isLoading || isLoadingMore || nextCursor == null) return;
+    setState(() { isLoadingMore = true; });
+    final response = await http.get(_myPostsUri(cursor: nextCursor), headers: {
+      'Authorization': 'Bearer ${widget.token}',
+    });
+    if (response.statusCode == 200) {
+      final data = jsonDecode(response.body);
+      setState(() {
+        items.addAll(data['posts'] ?? []);
+        nextCursor = data['next_cursor'];
+        isLoadingMore = false;
+      });
+    } else {
+      setState(() { isLoadingMore = false; });
+    }
+  }
+
   @override
   Widget build(BuildContext context) {
     return Scaffold(
@@ -514,8 +554,15 @@ class _DummyListPageState extends State<DummyListPage> {
                       ],
                     )
                   : ListView.builder(
-                      itemCount: items.length,
+                      controller: _scrollController,
+                      itemCount: items.length + (isLoadingMore ? 1 : 0),
                       itemBuilder: (context, idx) {
+                        if (idx >= items.length) {
+                          return const Padding(
+                            padding: EdgeInsets.symmetric(vertical: 16),
+                            child: Center(child: CircularProgressIndicator()),
+                          );
+                        }
                         final item = items[idx];
                         if (widget.title == '내 댓글') {
                           return ListTile(